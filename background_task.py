@@ -0,0 +1,103 @@
+import queue
+import threading
+import time
+
+PROGRESS_SECONDS = 0.1  # Minimum time between progress updates handed to the Tk loop
+
+
+class TaskCancelled(Exception):
+    """
+    Raised inside a BackgroundTask's target when it reports progress after cancel().
+    """
+
+
+class BackgroundTask:
+    """
+    Runs a function on a worker thread and hands its progress and result back
+    to the Tk main loop by polling a queue with root.after(), so widgets are
+    only ever touched from the main thread.
+
+    The target is called as target(report, *args, **kwargs), where
+    report(done, total) may be called any number of times to publish progress;
+    total may be None when it is not known in advance. Cancellation is
+    cooperative: after cancel(), the target's next report() raises TaskCancelled,
+    so work is abandoned at the target's own checkpoints. report() is cheap enough
+    to call every few rows: it always checks for cancellation, but only passes
+    progress on to the Tk loop every PROGRESS_SECONDS.
+    """
+
+    def __init__(self, target, *args, **kwargs):
+        self._target = target
+        self._args = args
+        self._kwargs = kwargs
+        self._messages = queue.Queue()
+        self._cancel = threading.Event()
+        self._last_progress = None  # monotonic time progress was last queued
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def cancel(self):
+        """
+        Asks the target to stop at its next progress report. Safe to call from any thread.
+        """
+        self._cancel.set()
+
+    @property
+    def cancelled(self):
+        return self._cancel.is_set()
+
+    def is_running(self):
+        return self._thread.is_alive()
+
+    def _report(self, done, total):
+        if self._cancel.is_set():
+            raise TaskCancelled()
+        now = time.monotonic()
+        if self._last_progress is None or now - self._last_progress >= PROGRESS_SECONDS or done == total:
+            self._last_progress = now
+            self._messages.put(("progress", (done, total)))
+
+    def _run(self):
+        try:
+            result = self._target(self._report, *self._args, **self._kwargs)
+        except TaskCancelled:
+            self._messages.put(("cancelled", None))
+        except Exception as e:
+            self._messages.put(("error", e))
+        else:
+            self._messages.put(("done", result))
+
+    def start(self, root, on_done=None, on_error=None, on_progress=None, on_cancel=None, interval=100):
+        """
+        Starts the worker thread and begins polling it from the Tk loop.
+
+        Parameters:
+        - root (Tk): Any widget whose after() can be used for polling.
+        - on_done (callable, optional): Called with the target's return value.
+        - on_error (callable, optional): Called with the exception the target raised.
+        - on_progress (callable, optional): Called with (done, total) for each report.
+        - on_cancel (callable, optional): Called with no arguments if the target stopped after cancel().
+        - interval (int): Polling interval in milliseconds.
+        """
+        self._thread.start()
+        handlers = {"done": on_done, "error": on_error, "progress": on_progress, "cancelled": on_cancel}
+        root.after(interval, self._poll, root, handlers, interval)
+        return self
+
+    def _poll(self, root, handlers, interval):
+        while True:
+            try:
+                kind, value = self._messages.get_nowait()
+            except queue.Empty:
+                break
+            handler = handlers[kind]
+            if kind == "progress":
+                if handler:
+                    handler(*value)
+                continue
+            if handler:
+                if kind == "cancelled":
+                    handler()
+                else:
+                    handler(value)
+            return
+        root.after(interval, self._poll, root, handlers, interval)
@@ -0,0 +1,230 @@
+from datetime import date
+
+import numpy as np
+
+import utils
+from instrumentation import instrumented
+
+
+def entries_to_columns(work_entries):
+    """
+    Converts a list of entry dicts into columnar hours and rate arrays.
+
+    Parameters:
+    - work_entries (list of dict): List containing daily entries with 'hours' and 'rate'.
+
+    Returns:
+    - tuple: (hours, rates) as float64 NumPy arrays.
+    """
+    count = len(work_entries)
+    hours = np.fromiter((entry.get("hours", 0) for entry in work_entries), dtype=np.float64, count=count)
+    rates = np.fromiter((entry.get("rate", 0) for entry in work_entries), dtype=np.float64, count=count)
+    return hours, rates
+
+
+def _as_columns(hours, rates):
+    hours = np.asarray(hours, dtype=np.float64)
+    rates = np.broadcast_to(np.asarray(rates, dtype=np.float64), hours.shape)
+    return hours, rates
+
+
+def calculate_gross_pay_batch(hours, rates):
+    """
+    Vectorized counterpart of utils.calculate_gross_pay.
+
+    Parameters:
+    - hours (array-like): Hours worked per entry.
+    - rates (array-like or float): Hourly rate per entry, or one rate for all entries.
+
+    Returns:
+    - dict: Arrays of regular, overtime and gross pay per entry.
+    """
+    hours, rates = _as_columns(hours, rates)
+    regular_hours = np.minimum(hours, utils.OVERTIME_THRESHOLD)
+    overtime_hours = np.maximum(hours - utils.OVERTIME_THRESHOLD, 0)
+    regular_pay = regular_hours * rates
+    overtime_pay = overtime_hours * rates * utils.OVERTIME_RATE_MULTIPLIER
+    gross_pay = regular_pay + overtime_pay
+    return {"regular_pay": regular_pay, "overtime_pay": overtime_pay, "gross": gross_pay}
+
+
+def calculate_tax_batch(gross_pay, tax_year=None):
+    """
+    Vectorized counterpart of utils.calculate_tax.
+    Looks every amount up in the same precompiled tax table with searchsorted.
+
+    Parameters:
+    - gross_pay (array-like): Gross pay per entry.
+    - tax_year (int or TaxTable, optional): Tax year to apply; defaults to the utils constants.
+
+    Returns:
+    - ndarray: Total tax deducted from each gross amount.
+    """
+    gross_pay = np.asarray(gross_pay, dtype=np.float64)
+    table = utils.resolve_tax_table(tax_year)
+    edges, cumulative, marginal = table.arrays()
+    index = np.maximum(np.searchsorted(edges, gross_pay, side="right") - 1, 0)
+    gross_tax = cumulative[index] + (gross_pay - edges[index]) * marginal[index]
+
+    # Apply tax credits
+    return np.maximum(gross_tax - table.credits, 0)
+
+
+def holiday_mask(dates, holidays):
+    """
+    Flags the entries whose date ordinal is a holiday.
+
+    Parameters:
+    - dates (array-like): Date ordinals per entry, e.g. from EntryStore.columns().
+    - holidays (HolidayCalendar): The holiday calendar.
+
+    Returns:
+    - ndarray: Boolean mask, True for holiday entries.
+    """
+    return np.isin(np.asarray(dates), holidays.array())
+
+
+@instrumented("calculate_net_pay_batch", input_rows=True)
+def calculate_net_pay_batch(hours, rates, tax_year=None, holidays=None):
+    """
+    Vectorized counterpart of utils.calculate_net_pay.
+
+    Parameters:
+    - hours (array-like): Hours worked per entry.
+    - rates (array-like or float): Hourly rate per entry, or one rate for all entries.
+    - tax_year (int or TaxTable, optional): Tax year to apply; defaults to the utils constants.
+    - holidays (array-like of bool, optional): Mask of entries that earn holiday pay.
+
+    Returns:
+    - dict: Arrays with the same keys as utils.calculate_net_pay.
+    """
+    hours, rates = _as_columns(hours, rates)
+    gross_info = calculate_gross_pay_batch(hours, rates)
+    if holidays is None:
+        holiday_pay = np.zeros_like(hours)
+    else:
+        holiday_pay = np.where(holidays, utils.holiday_premium(hours, rates), 0.0)
+    gross_pay = gross_info["gross"] + holiday_pay
+    total_tax = calculate_tax_batch(gross_pay, tax_year)
+
+    return {
+        "regular_hours": np.minimum(hours, utils.OVERTIME_THRESHOLD),
+        "overtime_hours": np.maximum(hours - utils.OVERTIME_THRESHOLD, 0),
+        "regular_pay": gross_info["regular_pay"],
+        "overtime_pay": gross_info["overtime_pay"],
+        "holiday_pay": holiday_pay,
+        "gross": gross_pay,
+        "income_tax": total_tax,
+        "net": gross_pay - total_tax
+    }
+
+
+def _segment_starts(keys):
+    # Positions where a run of equal keys begins in a sorted array
+    if not len(keys):
+        return np.zeros(0, dtype=np.int64)
+    return np.flatnonzero(np.concatenate(([True], keys[1:] != keys[:-1])))
+
+
+@instrumented("payroll_ledger_batch", input_rows=True)
+def payroll_ledger_batch(dates, hours, rates, holidays=None):
+    """
+    Vectorized counterpart of payroll_periods.PayrollLedger: weekly overtime in
+    date order and cumulative year-to-date tax per weekly pay period, computed
+    with whole-column operations instead of a Python loop per entry.
+
+    Parameters:
+    - dates (array-like): Date ordinals per entry, in any order.
+    - hours (array-like): Hours worked per entry.
+    - rates (array-like or float): Hourly rate per entry, or one rate for all entries.
+    - holidays (HolidayCalendar, optional): Entries on these dates earn holiday pay.
+
+    Returns:
+    - dict: One array per ledger week column ('week_start' as ordinals, 'tax_year',
+      'period' and the payroll_periods.TOTAL_KEYS amounts, plus 'ytd_gross' and 'ytd_tax').
+    """
+    from payroll_periods import WEEKS_PER_TAX_YEAR, tax_table_for
+
+    dates = np.asarray(dates, dtype=np.int64)
+    hours, rates = _as_columns(hours, rates)
+    order = np.argsort(dates, kind="stable")  # Same tie order as the ledger's sorted()
+    dates, hours, rates = dates[order], hours[order], rates[order]
+
+    # Ordinal 1 (0001-01-01) is a Monday
+    mondays = dates - (dates - 1) % 7
+    starts = _segment_starts(mondays)
+    counts = np.diff(np.append(starts, len(dates)))
+
+    # The first OVERTIME_THRESHOLD hours of each week, in date order, are regular
+    worked_before = np.cumsum(hours) - hours
+    if len(starts):
+        worked_before -= np.repeat(worked_before[starts], counts)
+    regular = np.minimum(hours, np.maximum(utils.OVERTIME_THRESHOLD - worked_before, 0))
+    overtime = hours - regular
+    is_holiday = holiday_mask(dates, holidays) if holidays is not None else np.zeros(len(dates), dtype=bool)
+    holiday_pay = np.where(is_holiday, utils.holiday_premium(hours, rates), 0.0)
+
+    def weekly(column):
+        return np.add.reduceat(column, starts) if len(column) else np.zeros(0)
+
+    week = {
+        "week_start": mondays[starts],
+        "total_hours": weekly(hours),
+        "regular_hours": weekly(regular),
+        "overtime_hours": weekly(overtime),
+        "total_holiday_hours": weekly(np.where(is_holiday, hours, 0.0)),
+        "entries": counts,
+        "total_regular_pay": weekly(regular * rates),
+        "total_overtime_pay": weekly(overtime * rates * utils.OVERTIME_RATE_MULTIPLIER),
+        "total_holiday_pay": weekly(holiday_pay),
+    }
+    week["total_gross"] = week["total_regular_pay"] + week["total_overtime_pay"] + week["total_holiday_pay"]
+
+    # Each week is paid on its Sunday, which decides the tax year and the PAYE week number
+    sundays = (week["week_start"] + 6 - date(1970, 1, 1).toordinal()).astype("datetime64[D]")
+    years = sundays.astype("datetime64[Y]")
+    week["tax_year"] = years.astype(np.int64) + 1970
+    day_of_year = (sundays - years.astype("datetime64[D]")).astype(np.int64)
+    week["period"] = np.minimum(day_of_year // 7 + 1, WEEKS_PER_TAX_YEAR)
+
+    ytd_gross = np.zeros(len(starts))
+    ytd_tax = np.zeros(len(starts))
+    income_tax = np.zeros(len(starts))
+    year_starts = _segment_starts(week["tax_year"])
+    for first, last in zip(year_starts, np.append(year_starts[1:], len(starts))):
+        gross = np.cumsum(week["total_gross"][first:last])
+        fraction = week["period"][first:last] / WEEKS_PER_TAX_YEAR
+        table = tax_table_for(int(week["tax_year"][first]))
+        tax = fraction * calculate_tax_batch(gross / fraction, table)
+        ytd_gross[first:last] = gross
+        ytd_tax[first:last] = tax
+        income_tax[first:last] = np.diff(tax, prepend=0.0)
+    week["income_tax"] = income_tax
+    week["total_deductions"] = income_tax
+    week["total_net"] = week["total_gross"] - income_tax
+    week["ytd_gross"] = ytd_gross
+    week["ytd_tax"] = ytd_tax
+    return week
+
+
+def calculate_weekly_totals_batch(hours, rates, dates, holidays=None, start=None):
+    """
+    Vectorized counterpart of utils.calculate_weekly_totals working on columns,
+    with the same weekly overtime and cumulative tax as the ledger.
+
+    Parameters:
+    - hours (array-like): Hours worked per entry.
+    - rates (array-like or float): Hourly rate per entry, or one rate for all entries.
+    - dates (array-like): Date ordinals per entry.
+    - holidays (HolidayCalendar, optional): Entries on these dates earn holiday pay.
+    - start (str or date, optional): Only total the weeks from the one containing start;
+      earlier entries then only count towards year-to-date tax.
+
+    Returns:
+    - dict: Same keys as utils.calculate_weekly_totals, as plain numbers.
+    """
+    from payroll_periods import TOTAL_KEYS, week_start
+
+    weeks = payroll_ledger_batch(dates, hours, rates, holidays)
+    selected = weeks["week_start"] >= week_start(start) if start is not None else slice(None)
+    return {key: weeks[key][selected].sum().item() for key in TOTAL_KEYS}
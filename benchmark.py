@@ -0,0 +1,314 @@
+"""
+Reproducible benchmarks for the load, save and calculation hot paths.
+
+Synthetic hour files are generated from a fixed seed, each path is timed
+(best of --repeat runs) and its peak traced memory is measured in a separate
+run. Results are written as JSON; when a baseline is given, any benchmark that
+got slower than the threshold makes the run exit with status 1.
+
+Examples:
+    python benchmark.py --output baseline.json
+    python benchmark.py --rows 10000 100000 1000000 10000000 --repeat 1
+    python benchmark.py --baseline baseline.json --threshold 0.25
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import date, datetime
+
+import data_handler
+import utils
+from holiday_calendar import default_calendar
+from snapshot import write_snapshot
+
+DEFAULT_ROWS = (10_000, 100_000, 1_000_000)
+DEFAULT_REPEAT = 3
+DEFAULT_THRESHOLD = 0.20  # Allowed slowdown against the baseline (0.20 = 20% slower)
+SAVE_DATA_CALLS = 200  # Single-row save_data calls timed per size; each one fsyncs
+SEED = 2024
+START_DATE = date(2024, 1, 1)
+MAX_DAYS = 3650  # Rows are spread over at most ten years of dates
+WRITE_CHUNK = 100_000
+
+
+def generate_hours_file(path, rows, seed=SEED):
+    """
+    Writes a synthetic hours CSV in the DATA_FILE layout.
+    The same rows and seed always produce the same file.
+
+    Parameters:
+    - path (str): The file to create (overwritten if it exists).
+    - rows (int): Number of entries to write.
+    - seed (int): Random seed for hours and rates.
+
+    Returns:
+    - str: The file written.
+    """
+    import numpy as np
+
+    rng = np.random.default_rng(seed)
+    days = max(min(rows, MAX_DAYS), 1)
+    first = START_DATE.toordinal()
+    labels = [date.fromordinal(first + day).isoformat() for day in range(days)]
+    rates = (11.0, 12.5, 15.0)
+
+    with open(path, mode='w', newline='') as file:
+        file.write("Date,Hours Worked,Hourly Rate\n")
+        for begin in range(0, rows, WRITE_CHUNK):
+            count = min(WRITE_CHUNK, rows - begin)
+            # Dates stay in file order, like an append-only history
+            day_index = (np.arange(begin, begin + count) * days) // rows
+            hours = rng.integers(2, 25, count) / 2  # 1.0 to 12.0 in half hours
+            rate_index = rng.integers(0, len(rates), count)
+            file.write("".join(
+                f"{labels[day]},{hour},{rates[rate]}\n"
+                for day, hour, rate in zip(day_index.tolist(), hours.tolist(), rate_index.tolist())
+            ))
+    return path
+
+
+@contextlib.contextmanager
+def _quiet():
+    # The data layer reports through print(); keep it out of the timings and the output
+    with contextlib.redirect_stdout(io.StringIO()):
+        yield
+
+
+def _measure(run, setup=None, repeat=DEFAULT_REPEAT, memory=True):
+    """
+    Times run() and optionally measures its peak traced allocation.
+
+    Parameters:
+    - run (callable): The code under test.
+    - setup (callable, optional): Called before every run, outside the timing.
+    - repeat (int): Timed runs; the fastest is reported.
+    - memory (bool): Also do one run under tracemalloc.
+
+    Returns:
+    - dict: 'seconds' (best time) and 'peak_bytes' (None when memory is off).
+    """
+    best = None
+    for _ in range(max(repeat, 1)):
+        if setup:
+            setup()
+        with _quiet():
+            started = time.perf_counter()
+            run()
+            elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+
+    peak = None
+    if memory:
+        if setup:
+            setup()
+        tracemalloc.start()
+        try:
+            with _quiet():
+                run()
+            peak = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+    return {"seconds": best, "peak_bytes": peak}
+
+
+def _remove(path):
+    for leftover in (path, path + ".idx", path + ".snap", path + ".snap.json"):
+        if os.path.exists(leftover):
+            os.remove(leftover)
+
+
+def run_size(rows, workdir, repeat=DEFAULT_REPEAT, memory=True):
+    """
+    Runs every benchmark against one synthetic file size.
+
+    Returns:
+    - dict: Maps benchmark name to its 'seconds', 'peak_bytes', 'items' and 'items_per_sec'.
+    """
+    source = os.path.join(workdir, f"hours_{rows}.csv")
+    target = os.path.join(workdir, f"saved_{rows}.csv")
+    generate_hours_file(source, rows)
+
+    # Every data_handler path points into workdir, so the real data, its partitions and
+    # database are neither read nor written
+    data_handler.STORAGE_BACKEND = "csv"
+    data_handler.DATA_FILE = source
+    data_handler.EMPLOYEE_DIR = os.path.join(workdir, f"employees_{rows}")
+    data_handler.DB_FILE = os.path.join(workdir, f"hours_{rows}.db")
+    with _quiet():
+        entries = data_handler.load_data()
+    holidays = default_calendar()
+    gross = [entry.hours * entry.rate for entry in entries]
+    single_rows = entries[:min(SAVE_DATA_CALLS, len(entries))]
+
+    def use_target():
+        _remove(target)
+        data_handler.DATA_FILE = target
+
+    def use_source():
+        data_handler.DATA_FILE = source
+
+    def use_snapshot():
+        use_source()
+        write_snapshot(source)
+
+    def save_single_rows():
+        for entry in single_rows:
+            data_handler.save_data(entry.date, entry.hours, entry.rate)
+
+    def tax_all():
+        for amount in gross:
+            utils.calculate_tax(amount)
+
+    benchmarks = (
+        # name, run, setup, items processed per run
+        ("load_data", data_handler.load_data, use_source, rows),
+        ("save_entries", lambda: data_handler.save_entries(entries), use_target, rows),
+        ("save_data", save_single_rows, use_target, len(single_rows)),
+        ("summarize_snapshot", data_handler.summarize_snapshot, use_snapshot, rows),
+        ("calculate_weekly_totals", lambda: utils.calculate_weekly_totals(entries, holidays), None, rows),
+        ("calculate_tax", tax_all, utils.clear_tax_cache, rows),
+        ("calculate_holiday_pay", lambda: utils.calculate_holiday_pay(entries, holidays), None, rows),
+    )
+
+    results = {}
+    for name, run, setup, items in benchmarks:
+        result = _measure(run, setup, repeat, memory)
+        result["items"] = items
+        result["items_per_sec"] = items / result["seconds"] if result["seconds"] else None
+        results[name] = result
+    _remove(source)
+    _remove(target)
+    return results
+
+
+def run_benchmarks(sizes=DEFAULT_ROWS, repeat=DEFAULT_REPEAT, memory=True, workdir=None, report=print):
+    """
+    Runs the suite for each file size, restoring the data_handler settings afterwards.
+
+    Parameters:
+    - sizes (iterable of int): Row counts to generate and benchmark.
+    - repeat (int): Timed runs per benchmark.
+    - memory (bool): Measure peak traced memory (adds one untimed run each).
+    - workdir (str, optional): Where synthetic files go. Defaults to a temporary folder.
+    - report (callable, optional): Called with the formatted results of each size as it finishes.
+
+    Returns:
+    - dict: 'meta' (environment and settings) and 'results' (size -> benchmark -> result).
+    """
+    import numpy as np
+
+    saved = (data_handler.DATA_FILE, data_handler.EMPLOYEE_DIR, data_handler.DB_FILE, data_handler.STORAGE_BACKEND)
+    own_workdir = workdir is None
+    workdir = workdir or tempfile.mkdtemp(prefix="ballyroe_bench_")
+    os.makedirs(workdir, exist_ok=True)
+    results = {}
+    try:
+        for rows in sizes:
+            results[str(rows)] = run_size(rows, workdir, repeat, memory)
+            if report:
+                report(format_results({str(rows): results[str(rows)]}))
+    finally:
+        data_handler.DATA_FILE, data_handler.EMPLOYEE_DIR, data_handler.DB_FILE, data_handler.STORAGE_BACKEND = saved
+        if own_workdir:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    meta = {
+        "created": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "platform": platform.platform(),
+        "repeat": repeat,
+        "seed": SEED,
+    }
+    return {"meta": meta, "results": results}
+
+
+def compare_results(current, baseline, threshold=DEFAULT_THRESHOLD):
+    """
+    Compares best times against a baseline run.
+    Benchmarks or sizes missing from either run are ignored.
+
+    Parameters:
+    - current (dict): Results from run_benchmarks.
+    - baseline (dict): Earlier results in the same format.
+    - threshold (float): Allowed relative slowdown, e.g. 0.20 for 20%.
+
+    Returns:
+    - list of dict: One row per compared benchmark with 'size', 'name',
+      'baseline', 'current', 'change' and 'regressed'.
+    """
+    rows = []
+    for size, benchmarks in current["results"].items():
+        for name, result in benchmarks.items():
+            before = baseline.get("results", {}).get(size, {}).get(name)
+            if not before or not before.get("seconds"):
+                continue
+            change = result["seconds"] / before["seconds"] - 1
+            rows.append({"size": size, "name": name, "baseline": before["seconds"],
+                         "current": result["seconds"], "change": change, "regressed": change > threshold})
+    return rows
+
+
+def format_results(results):
+    lines = []
+    for size, benchmarks in results.items():
+        lines.append(f"{int(size):,} rows")
+        for name, result in benchmarks.items():
+            rate = f"{result['items_per_sec']:,.0f}/s" if result["items_per_sec"] else "-"
+            peak = f"{result['peak_bytes'] / 2**20:,.1f} MiB" if result["peak_bytes"] is not None else "-"
+            lines.append(f"  {name:<24} {result['seconds']:>10.4f}s {rate:>16} {peak:>12}")
+    return "\n".join(lines)
+
+
+def format_comparison(rows, threshold):
+    lines = [f"Compared with baseline (threshold +{threshold:.0%}):"]
+    for row in rows:
+        flag = "  REGRESSION" if row["regressed"] else ""
+        lines.append(f"  {int(row['size']):>10,} {row['name']:<24} {row['baseline']:>10.4f}s -> "
+                     f"{row['current']:>10.4f}s ({row['change']:+.1%}){flag}")
+    return "\n".join(lines)
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="Benchmark the Ballyroe Pay Calculator hot paths")
+    parser.add_argument("--rows", type=int, nargs="+", default=list(DEFAULT_ROWS),
+                        help="Synthetic file sizes to run (default: 10k, 100k and 1M rows)")
+    parser.add_argument("--repeat", type=int, default=DEFAULT_REPEAT, help="Timed runs per benchmark; the best counts")
+    parser.add_argument("--no-memory", action="store_true", help="Skip the tracemalloc peak memory runs")
+    parser.add_argument("--workdir", help="Folder for the synthetic files (default: a temporary folder)")
+    parser.add_argument("--output", help="Write the results to this JSON file")
+    parser.add_argument("--baseline", help="Fail if slower than the results in this JSON file")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="Allowed slowdown against the baseline (default: 0.20 = 20%%)")
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    results = run_benchmarks(args.rows, args.repeat, not args.no_memory, args.workdir)
+
+    if args.output:
+        with open(args.output, mode='w') as file:
+            json.dump(results, file, indent=2)
+        print(f"Results written to {args.output}.")
+
+    if args.baseline:
+        with open(args.baseline, mode='r') as file:
+            baseline = json.load(file)
+        rows = compare_results(results, baseline, args.threshold)
+        print(format_comparison(rows, args.threshold))
+        if any(row["regressed"] for row in rows):
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,281 @@
+"""
+Headless command-line entry point for scheduled payroll runs.
+
+Only the data and calculation modules are imported at startup; the PDF stack
+is loaded when an export is requested and Tkinter is never touched.
+
+Examples:
+    python cli.py totals --start 2024-10-01 --end 2024-10-31
+    python cli.py weekly --json
+    python cli.py export summary.pdf --name "Nikita" --rate 15 --weekly
+    python cli.py payroll staff_hours/ --workers 8 --pdf-dir payslips/
+    python cli.py partition "Nikita" --rate 15 && python cli.py totals --employee nikita
+    python cli.py import timesheet.xlsx --employee nikita --dry-run --errors problems.csv
+    python cli.py --profile ledger.prof ledger
+"""
+import argparse
+import json
+import sys
+
+import data_handler
+import instrumentation
+from roster import load_roster
+from utils import format_currency
+
+TOTAL_LABELS = (
+    ("total_hours", "Total Hours"),
+    ("total_regular_pay", "Regular Pay"),
+    ("total_overtime_pay", "Overtime Pay"),
+    ("total_holiday_pay", "Holiday Pay"),
+    ("total_gross", "Gross Pay"),
+    ("total_deductions", "Total Deductions"),
+    ("total_net", "Net Pay"),
+)
+
+
+def _format_totals(totals, indent=""):
+    lines = []
+    for key, label in TOTAL_LABELS:
+        if key not in totals:
+            continue
+        value = totals[key]
+        lines.append(f"{indent}{label}: {value if key == 'total_hours' else format_currency(value)}")
+    return "\n".join(lines)
+
+
+def _emit(args, data, text):
+    print(json.dumps(data, indent=2) if args.json else text)
+
+
+def cmd_totals(args):
+    totals = data_handler.summarize_data(args.start, args.end, args.min_rate, args.max_rate, args.employee)
+    _emit(args, totals, _format_totals(totals))
+
+
+def cmd_weekly(args):
+    weeks = data_handler.weekly_summary(args.start, args.end, args.employee)
+    text = "\n\n".join(f"Week of {monday}\n{_format_totals(totals, '  ')}" for monday, totals in weeks.items())
+    _emit(args, weeks, text or "No entries found.")
+
+
+def _format_ledger(ledger, start=None, end=None, indent=""):
+    lines = []
+    for week in ledger.between(start, end):
+        lines.append(f"{indent}{week['week']} (tax year {week['tax_year']}, week {week['period']})\n"
+                     f"{indent}  Regular Hours: {week['regular_hours']}\n"
+                     f"{indent}  Overtime Hours: {week['overtime_hours']}\n"
+                     f"{indent}  Holiday Hours: {week['total_holiday_hours']}\n"
+                     f"{_format_totals(week, indent + '  ')}\n"
+                     f"{indent}  Year-to-date Tax: {format_currency(week['ytd_tax'])}")
+    return "\n\n".join(lines)
+
+
+def cmd_ledger(args):
+    # Tax is cumulative per person, so every employee gets their own ledger
+    ledgers = data_handler.payroll_ledgers(args.start, args.end, employee=args.employee)
+    data = {employee or "": {"weeks": ledger.between(args.start, args.end),
+                             "tax_years": ledger.tax_years(args.start, args.end)}
+            for employee, ledger in ledgers.items()}
+    if len(ledgers) == 1:
+        data = next(iter(data.values()))
+        text = _format_ledger(next(iter(ledgers.values())), args.start, args.end)
+    else:
+        text = "\n\n".join(f"{employee}\n{_format_ledger(ledger, args.start, args.end, '  ')}"
+                           for employee, ledger in ledgers.items() if ledger.between(args.start, args.end))
+    _emit(args, data, text or "No entries found.")
+
+
+def cmd_export(args):
+    from pdf_export import export_payslips, export_summary, weekly_payslips
+
+    if args.weekly:
+        weeks = data_handler.weekly_summary(args.start, args.end, args.employee)
+        payslips = weekly_payslips(args.name, args.rate, weeks)
+        if args.output.lower().endswith(".pdf"):
+            written = export_payslips(payslips, filename=args.output)
+        else:
+            written = export_payslips(payslips, directory=args.output)
+    else:
+        totals = data_handler.summarize_data(args.start, args.end, employee=args.employee)
+        written = [export_summary(args.output, args.name, args.rate, totals)]
+    _emit(args, written, "\n".join(written))
+
+
+def cmd_payroll(args):
+    from payroll_run import employee_files, run_payroll
+
+    if not employee_files(args.source):
+        source = args.source if isinstance(args.source, str) else ", ".join(args.source)
+        print(f"Payroll failed: no employee hour files in {source}. "
+              "Split the hours by employee with the partition command, or name the files to run.",
+              file=sys.stderr)
+        return 1
+    results = run_payroll(args.source, workers=args.workers, chunksize=args.chunksize,
+                          start=args.start, end=args.end)
+    if args.pdf_dir:
+        from pdf_export import employee_payslips, export_payslips
+
+        export_payslips(employee_payslips(results, load_roster()), directory=args.pdf_dir)
+    text = "\n\n".join(f"{employee}\n{_format_totals(result['total'], '  ')}" for employee, result in results.items())
+    _emit(args, results, text)
+
+
+def cmd_employees(args):
+    roster = load_roster()
+    data = [employee.as_dict() for employee in roster]
+    text = "\n".join(f"{employee.id}: {employee.name} (rate {format_currency(employee.current_rate or 0)}, "
+                     f"{len(employee.rates)} rate change(s))" for employee in roster)
+    _emit(args, data, text or "No employees on the roster.")
+
+
+def cmd_partition(args):
+    written = data_handler.partition_data(args.default_employee, args.rate)
+    text = "\n".join(f"{employee}: {count} rows" for employee, count in written.items())
+    _emit(args, written, text or "Nothing partitioned.")
+
+
+def cmd_import(args):
+    from timesheet_import import import_timesheet
+
+    try:
+        result = import_timesheet(args.timesheet, employee=args.employee, default_rate=args.rate,
+                                  commit=not args.dry_run)
+    except (ValueError, OSError) as e:
+        print(f"Import failed: {e}", file=sys.stderr)
+        return 1
+    if args.errors and result.errors:
+        result.write_errors(args.errors)
+    _emit(args, result.as_dict(), result.summary(limit=args.show_errors))
+    return 1 if result.errors else 0
+
+
+def cmd_compact(args):
+    kept, removed = data_handler.compact_data()
+    _emit(args, {"kept": kept, "removed": removed}, f"{kept} rows kept, {removed} duplicates removed.")
+
+
+def cmd_migrate(args):
+    count = data_handler.migrate_csv_to_sqlite()
+    _emit(args, {"migrated": count}, f"{count} rows migrated.")
+
+
+def cmd_snapshot(args):
+    from snapshot import write_snapshot
+
+    if data_handler.is_split():
+        data_files = [data_handler.employee_file(employee) for employee in data_handler.partitioned_employees()]
+    else:
+        data_files = [data_handler.DATA_FILE]
+    count = sum(write_snapshot(data_file) for data_file in data_files)
+    _emit(args, {"rows": count}, f"Snapshot written ({count} rows).")
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="Ballyroe Pay Calculator (headless mode)")
+    parser.add_argument("--data-file", help=f"Hours CSV file (default: {data_handler.DATA_FILE})")
+    parser.add_argument("--db-file", help=f"SQLite database file (default: {data_handler.DB_FILE})")
+    parser.add_argument("--backend", choices=("csv", "sqlite"), help="Storage backend to read from")
+    parser.add_argument("--snapshot", action="store_true",
+                        help="Compute totals from the memory-mapped binary snapshot of the CSV")
+    parser.add_argument("--json", action="store_true", help="Print results as JSON")
+    parser.add_argument("--profile", metavar="FILE",
+                        help="Record timings and write a cProfile of the command to FILE")
+
+    def add_range(subparser):
+        # Weeks are paid whole, so the range is widened to the Monday and Sunday of its end weeks
+        subparser.add_argument("--start", help="First date to include (YYYY-MM-DD), from the Monday of its week")
+        subparser.add_argument("--end", help="Last date to include (YYYY-MM-DD), to the Sunday of its week")
+
+    def add_employee(subparser):
+        subparser.add_argument("--employee", help="Only this employee id (reads just their partition; default: every partition)")
+
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    totals = commands.add_parser("totals", help="Totals for all matching entries")
+    add_range(totals)
+    add_employee(totals)
+    totals.add_argument("--min-rate", type=float, help="Skip entries paid below this rate")
+    totals.add_argument("--max-rate", type=float, help="Skip entries paid above this rate")
+    totals.set_defaults(handler=cmd_totals)
+
+    weekly = commands.add_parser("weekly", help="Totals per Monday-to-Sunday week")
+    add_range(weekly)
+    add_employee(weekly)
+    weekly.set_defaults(handler=cmd_weekly)
+
+    ledger = commands.add_parser("ledger", help="Weekly payroll with weekly overtime and cumulative tax")
+    add_range(ledger)
+    add_employee(ledger)
+    ledger.set_defaults(handler=cmd_ledger)
+
+    export = commands.add_parser("export", help="Export a PDF summary or weekly payslips")
+    export.add_argument("output", help="PDF file, or a folder for one PDF per week with --weekly")
+    export.add_argument("--name", default="", help="Employee name shown on the PDF")
+    export.add_argument("--rate", type=float, help="Hourly rate shown on the PDF")
+    export.add_argument("--weekly", action="store_true", help="One payslip per week instead of a single summary")
+    add_range(export)
+    add_employee(export)
+    export.set_defaults(handler=cmd_export)
+
+    payroll = commands.add_parser("payroll", help="Payroll run over per-employee hour files")
+    payroll.add_argument("source", nargs="*", default=[data_handler.EMPLOYEE_DIR],
+                         help="Directory of <employee>.csv files, or the files themselves "
+                              f"(default: the {data_handler.EMPLOYEE_DIR}/ partitions)")
+    payroll.add_argument("--workers", type=int, help="Worker processes (default: CPU count)")
+    payroll.add_argument("--chunksize", type=int, default=1, help="Employees handed to a worker at a time")
+    payroll.add_argument("--pdf-dir", help="Also write one payslip PDF per employee into this folder")
+    add_range(payroll)
+    payroll.set_defaults(handler=cmd_payroll)
+
+    timesheet = commands.add_parser("import", help="Validate and import a timesheet export (CSV or Excel)")
+    timesheet.add_argument("timesheet", help="The .csv or .xlsx file to import")
+    timesheet.add_argument("--employee", help="Employee the rows belong to when the file has no Employee column")
+    timesheet.add_argument("--rate", type=float, help="Rate for rows without one (default: the roster rate)")
+    timesheet.add_argument("--dry-run", action="store_true", help="Validate only; save nothing")
+    timesheet.add_argument("--errors", help="Write every rejected row to this CSV file")
+    timesheet.add_argument("--show-errors", type=int, default=20, help="Rejected rows to list in the output")
+    timesheet.set_defaults(handler=cmd_import)
+
+    employees = commands.add_parser("employees", help="List the roster with current rates")
+    employees.set_defaults(handler=cmd_employees)
+
+    partition = commands.add_parser("partition", help="Split the shared hours CSV into per-employee files")
+    partition.add_argument("default_employee", help="Employee the rows without an Employee column belong to")
+    partition.add_argument("--rate", type=float, help="That employee's hourly rate, recorded for all their hours")
+    partition.set_defaults(handler=cmd_partition)
+
+    compact = commands.add_parser("compact", help="Remove duplicate rows from the hours files")
+    compact.set_defaults(handler=cmd_compact)
+
+    migrate = commands.add_parser("migrate", help="Copy the hours CSV into the SQLite database")
+    migrate.set_defaults(handler=cmd_migrate)
+
+    snapshot = commands.add_parser("snapshot", help="Rebuild the binary snapshots of the hours CSV files")
+    snapshot.set_defaults(handler=cmd_snapshot)
+
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    if args.data_file:
+        data_handler.DATA_FILE = args.data_file
+    if args.db_file:
+        data_handler.DB_FILE = args.db_file
+    if args.backend:
+        data_handler.STORAGE_BACKEND = args.backend
+    if args.snapshot:
+        data_handler.USE_SNAPSHOT = True
+    if getattr(args, "source", None) and len(args.source) == 1:
+        args.source = args.source[0]
+    if args.profile:
+        instrumentation.enable()
+        with instrumentation.profiled(args.profile):
+            status = args.handler(args)
+    else:
+        status = args.handler(args)
+    return status or 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,13 +1,76 @@
 import csv
+import heapq
+import io
 import os
+import shutil
+import tempfile
+from datetime import date
+
+import utils
+from date_index import DateIndex, read_header, read_rows_at
+from entry_store import Entry, EntryStore, from_ordinal, to_ordinal
+from holiday_calendar import default_calendar
+from instrumentation import instrumented
+from payroll_periods import PayrollLedger, combine_weeks, ledger_bounds
+from roster import ROSTER_FILE, employee_id, load_roster
 
 DATA_FILE = "work_hours_data.csv"
+DB_FILE = "work_hours_data.db"
+EMPLOYEE_DIR = "employees"  # Per-employee partitions: one '<employee id>.csv' file each
+SPLIT_MARKER = ".split"  # Left in EMPLOYEE_DIR by partition_data once the shared file is split
+# Rows between report() calls on long loads and saves. Every call is a cancellation
+# checkpoint; the caller decides how often to actually publish progress.
+CHECKPOINT_ROWS = 1000
+
+# Storage backend: "csv" (default) or "sqlite". Can be overridden with BALLYROE_STORAGE.
+# sqlite3 is only imported inside the SQLite code paths, so CSV users never load it.
+STORAGE_BACKEND = os.environ.get("BALLYROE_STORAGE", "csv")
+
+# Read totals from the memory-mapped binary snapshot of the CSV. Enable with BALLYROE_SNAPSHOT=1.
+USE_SNAPSHOT = os.environ.get("BALLYROE_SNAPSHOT", "0") == "1"
+
+def _use_sqlite():
+    return STORAGE_BACKEND == "sqlite"
+
+def _use_snapshot():
+    return USE_SNAPSHOT and not _use_sqlite()
+
+def employee_file(employee):
+    """
+    Returns the CSV partition holding one employee's entries.
+    """
+    return os.path.join(EMPLOYEE_DIR, f"{employee}.csv")
+
+def _data_file(employee=None):
+    # An employee with their own partition is read from it alone; everyone else shares DATA_FILE
+    if employee is not None and _csv_split() and os.path.exists(employee_file(employee)):
+        return employee_file(employee)
+    return DATA_FILE
+
+def _partitions(employee=None):
+    # The employees a read covers: the one asked for or, once the shared file has been
+    # split, every partition. [None] stands for the shared file (or the whole table).
+    # Overtime and tax are per person, so ledgers are built per entry of this list.
+    if employee is not None:
+        return [employee]
+    if _use_sqlite():
+        import sqlite_backend
+
+        return sqlite_backend.employees(DB_FILE) or [None]
+    return (partitioned_employees() if is_split() else []) or [None]
 
 def initialize_csv():
     """
     Initializes the CSV file with headers if it doesn't already exist.
     This function is called when the app starts.
+    With the SQLite backend it creates the database schema instead.
     """
+    if _use_sqlite():
+        import sqlite_backend
+
+        sqlite_backend.connect(DB_FILE).close()
+        print(f"{DB_FILE} ready.")
+        return
     if not os.path.exists(DATA_FILE):
         with open(DATA_FILE, mode='w', newline='') as file:
             writer = csv.writer(file)
@@ -16,39 +79,271 @@ def initialize_csv():
     else:
         print(f"{DATA_FILE} already exists.")
 
-def save_data(date, hours, rate):
+def _checkpointed(entries, report, total):
+    # Passes entries through, calling report every CHECKPOINT_ROWS of them
+    for count, entry in enumerate(entries, start=1):
+        yield entry
+        if count % CHECKPOINT_ROWS == 0:
+            report(count, total)
+
+@instrumented("save", rows=int)
+def save_entries(entries, employee=None, report=None):
     """
-    Saves a new workday entry to the CSV file.
-    Ensures data format is consistent and entries are appended.
+    Appends a batch of workday entries to the CSV file in a single buffered write.
+    The rows are formatted in memory, written with one call, then flushed and
+    fsync'd so a crash cannot leave a half-written batch in the OS cache.
+
+    Parameters:
+    - entries (iterable): Entries with 'date', 'hours' and 'rate' keys (dicts, Entry records or an EntryStore).
+    - employee (str, optional): Employee id; their entries go to their own partition file.
+      With CSV that needs the shared file to have been split first (see is_split);
+      until then only entries without an employee are saved, to the shared file.
+    - report (callable, optional): Called as report(done, total) every CHECKPOINT_ROWS rows
+      while they are prepared. It is never called once the CSV write starts, and the
+      SQLite insert is one transaction, so an exception raised from it (e.g. to cancel)
+      leaves the data untouched.
+
+    Returns:
+    - int: Number of rows written (0 if nothing was saved).
     """
+    total = len(entries) if hasattr(entries, "__len__") else None
+    if _use_sqlite():
+        import sqlite3
+        import sqlite_backend
+
+        if report:
+            report(0, total)
+            entries = _checkpointed(entries, report, total)
+        try:
+            count = sqlite_backend.save_entries(DB_FILE, entries, employee or "")
+        except sqlite3.Error as e:
+            print(f"An error occurred while saving data: {e}")
+            return 0
+        if count:
+            print(f"Data saved successfully ({count} entries).")
+        return count
+
+    if employee is None and is_split():
+        # Nothing reads the shared file once it has been split
+        print(f"An error occurred while saving data: {DATA_FILE} has been split by employee; "
+              "choose the employee the entries belong to.")
+        return 0
+    if employee is not None and not is_split():
+        # A partition would hide every row still in the shared file from the reads
+        print(f"An error occurred while saving data: {DATA_FILE} has not been split by employee yet; "
+              "run the partition command first.")
+        return 0
     try:
-        with open(DATA_FILE, mode='a', newline='') as file:
-            writer = csv.writer(file)
-            writer.writerow([date, hours, rate])
-        print("Data saved successfully.")
+        count = _append_csv(employee_file(employee) if employee is not None else DATA_FILE, entries, report, total)
     except IOError as e:
         print(f"An error occurred while saving data: {e}")
+        return 0
+    if count:
+        print(f"Data saved successfully ({count} entries).")
+    return count
+
+def _append_csv(data_file, entries, report=None, total=None):
+    # Appends entries to one hours CSV in a single fsync'd write, keeping its date index current.
+    # Returns the number of rows written; file errors propagate.
+    directory = os.path.dirname(data_file)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    if not os.path.exists(data_file):
+        writer.writerow(["Date", "Hours Worked", "Hourly Rate"])
+    count = 0
+    for entry in entries:
+        writer.writerow([entry["date"], entry["hours"], entry["rate"]])
+        count += 1
+        if report and count % CHECKPOINT_ROWS == 0:
+            report(count, total)
+    if not count:
+        return 0
 
-def load_data():
+    # Only extend the date index incrementally if it matched the file before this write
+    index = DateIndex(data_file)
+    index_current = index.load() and index.is_current()
+    with open(data_file, mode='a', newline='') as file:
+        file.write(buffer.getvalue())
+        file.flush()
+        os.fsync(file.fileno())
+    if index_current:
+        index.extend()
+    return count
+
+def save_data(date, hours, rate, employee=None):
+    """
+    Saves a new workday entry to the CSV file.
+    Thin wrapper over save_entries for single-row callers.
+    """
+    save_entries([{"date": date, "hours": hours, "rate": rate}], employee)
+
+def _iter_rows(start=None, end=None, min_rate=None, max_rate=None, employee=None):
     """
-    Loads work hours data from the CSV file and returns it as a list of dictionaries.
-    If the file is missing or empty, returns an empty list.
+    Streams typed (date ordinal, hours, rate) tuples from the configured backend.
+    """
+    if _use_sqlite():
+        import sqlite_backend
+
+        for day, hours, rate in sqlite_backend.iter_rows(DB_FILE, start, end, min_rate, max_rate, employee):
+            yield to_ordinal(day), hours, rate
+    else:
+        yield from _iter_csv_rows(start, end, min_rate, max_rate, employee)
+
+def _iter_csv_rows(start=None, end=None, min_rate=None, max_rate=None, employee=None):
+    if employee is None and is_split():
+        # The shared file is stale once split; everyone's rows are in the partitions
+        return (row for key in partitioned_employees()
+                for row in iter_csv_file(employee_file(key), start, end, min_rate, max_rate))
+    data_file = _data_file(employee)
+    if data_file != DATA_FILE:
+        # A partition only holds this employee's rows, so no column filter is needed
+        employee = None
+    return iter_csv_file(data_file, start, end, min_rate, max_rate, employee)
+
+def iter_csv_file(path, start=None, end=None, min_rate=None, max_rate=None, employee=None):
+    """
+    Streams typed (date ordinal, hours, rate) tuples from an hours CSV file,
+    applying the filters during the pass. File errors propagate to the caller.
+
+    Parameters:
+    - path (str): The CSV file to read, in the same layout as DATA_FILE.
+    - start, end, min_rate, max_rate, employee: Optional filters, as in iter_data.
+    """
+    low = to_ordinal(start) if start is not None else None
+    high = to_ordinal(end) if end is not None else None
+    with open(path, mode='r', newline='') as file:
+        reader = csv.reader(file)
+        header = next(reader, None)
+        if header is None:
+            return
+        date_col = header.index("Date")
+        hours_col = header.index("Hours Worked")
+        rate_col = header.index("Hourly Rate")
+        employee_col = header.index("Employee") if "Employee" in header else None
+        if employee is not None and employee_col is None:
+            # Rows without an employee column cannot match an employee filter
+            return
+
+        for row in reader:
+            if not row:
+                continue
+            # Convert data types to ensure consistency
+            try:
+                ordinal = to_ordinal(row[date_col])
+                hours = float(row[hours_col])
+                rate = float(row[rate_col])
+            except (ValueError, IndexError):
+                print("Data format error: skipping an entry due to invalid values.")
+                continue
+            if low is not None and ordinal < low:
+                continue
+            if high is not None and ordinal > high:
+                continue
+            if min_rate is not None and rate < min_rate:
+                continue
+            if max_rate is not None and rate > max_rate:
+                continue
+            if employee is not None and row[employee_col] != employee:
+                continue
+            yield ordinal, hours, rate
+
+def iter_csv_by_date(path, start=None, end=None, min_rate=None, max_rate=None, employee=None):
+    """
+    Streams the same tuples as iter_csv_file, but in date order (rows on one date
+    in file order), seeking to them through the sidecar date index one row at a time.
+    The index is rebuilt first if the file changed since it was written.
+    Nothing is sorted or buffered, so a ledger can be built over a file of any size.
+    File errors propagate to the caller; a file without the expected columns raises ValueError.
+    """
+    header = read_header(path)
+    if not header:
+        return
+    date_col = header.index("Date")
+    hours_col = header.index("Hours Worked")
+    rate_col = header.index("Hourly Rate")
+    employee_col = header.index("Employee") if "Employee" in header else None
+    if employee is not None and employee_col is None:
+        # Rows without an employee column cannot match an employee filter
+        return
+    index = DateIndex(path)
+    index.ensure_current()
+    for row in read_rows_at(path, index.iter_offsets_between(start, end)):
+        try:
+            ordinal = to_ordinal(row[date_col])
+            hours = float(row[hours_col])
+            rate = float(row[rate_col])
+        except (ValueError, IndexError):
+            print("Data format error: skipping an entry due to invalid values.")
+            continue
+        if min_rate is not None and rate < min_rate:
+            continue
+        if max_rate is not None and rate > max_rate:
+            continue
+        if employee is not None and row[employee_col] != employee:
+            continue
+        yield ordinal, hours, rate
+
+def _iter_rows_by_date(start=None, end=None, min_rate=None, max_rate=None, employee=None):
+    # _iter_rows in date order: SQLite sorts in the query, CSV files are read through their
+    # date index, and the partitions are merged on date as they stream
+    if _use_sqlite():
+        return _iter_rows(start, end, min_rate, max_rate, employee)
+    if employee is None and is_split():
+        return heapq.merge(*(iter_csv_by_date(employee_file(key), start, end, min_rate, max_rate)
+                             for key in partitioned_employees()), key=lambda row: row[0])
+    data_file = _data_file(employee)
+    return iter_csv_by_date(data_file, start, end, min_rate, max_rate, employee if data_file == DATA_FILE else None)
+
+def iter_data(start=None, end=None, min_rate=None, max_rate=None, employee=None):
+    """
+    Lazily yields typed entries from the CSV file without loading it all into memory.
+
+    Parameters:
+    - start (str or date, optional): First date to include.
+    - end (str or date, optional): Last date to include.
+    - min_rate (float, optional): Skip entries paid below this hourly rate.
+    - max_rate (float, optional): Skip entries paid above this hourly rate.
+    - employee (str, optional): Only yield rows for this employee. Reads just their
+      partition file if they have one, otherwise filters on an 'Employee' column.
+      Without one, every partition is read once the shared file has been split.
+
+    Yields:
+    - Entry: Records with 'date', 'hours' and 'rate'.
     """
-    entries = []
     try:
-        with open(DATA_FILE, mode='r', newline='') as file:
-            reader = csv.DictReader(file)
-            for row in reader:
-                # Convert data types to ensure consistency
-                try:
-                    entry = {
-                        "date": row["Date"],
-                        "hours": float(row["Hours Worked"]),
-                        "rate": float(row["Hourly Rate"])
-                    }
-                    entries.append(entry)
-                except ValueError:
-                    print("Data format error: skipping an entry due to invalid values.")
+        for ordinal, hours, rate in _iter_rows(start, end, min_rate, max_rate, employee):
+            yield Entry(from_ordinal(ordinal), hours, rate)
+    except FileNotFoundError:
+        print("Data file not found; a new file will be created on the next save.")
+    except IOError as e:
+        print(f"An error occurred while loading data: {e}")
+
+@instrumented("load", rows=len)
+def load_data(start=None, end=None, min_rate=None, max_rate=None, employee=None, report=None):
+    """
+    Loads work hours data from the CSV file and returns it as an EntryStore.
+    Entries still support dict-style access (entry['date'], entry['hours'], entry['rate']).
+    Accepts the same optional filters as iter_data.
+    If the file is missing or empty, returns an empty store.
+
+    Parameters:
+    - report (callable, optional): Called as report(rows loaded, None) every
+      CHECKPOINT_ROWS rows. Exceptions it raises abandon the load.
+    """
+    entries = EntryStore()
+    try:
+        rows = _iter_rows(start, end, min_rate, max_rate, employee)
+        if report is None:
+            for ordinal, hours, rate in rows:
+                entries.append(ordinal, hours, rate)
+        else:
+            for count, (ordinal, hours, rate) in enumerate(rows, start=1):
+                entries.append(ordinal, hours, rate)
+                if count % CHECKPOINT_ROWS == 0:
+                    report(count, None)
+        entries.mark_clean()
         print("Data loaded successfully.")
     except FileNotFoundError:
         print("Data file not found; a new file will be created on the next save.")
@@ -56,3 +351,419 @@ def load_data():
         print(f"An error occurred while loading data: {e}")
 
     return entries
+
+@instrumented("load_range", rows=len)
+def load_range(start=None, end=None, employee=None):
+    """
+    Loads only the entries dated within [start, end] using the sidecar date index,
+    seeking straight to the matching rows instead of parsing the whole file.
+    The index is rebuilt first if the CSV changed since it was written.
+    With the SQLite backend the date index of the table is used instead.
+
+    Parameters:
+    - employee (str, optional): Employee id; uses the index of their partition file,
+      or of the shared file filtered on its 'Employee' column if they have none.
+      Without one, every partition is read once the shared file has been split.
+
+    Returns:
+    - EntryStore: The matching entries in date order.
+    """
+    entries = EntryStore()
+    try:
+        for ordinal, hours, rate in _iter_rows_by_date(start, end, employee=employee):
+            entries.append(ordinal, hours, rate)
+        entries.mark_clean()
+    except FileNotFoundError:
+        print("Data file not found; a new file will be created on the next save.")
+    except ValueError:
+        print("Data format error: the data file has no Date, Hours Worked or Hourly Rate column.")
+    except IOError as e:
+        print(f"An error occurred while loading data: {e}")
+
+    return entries
+
+def load_week(day, employee=None):
+    """
+    Loads the Monday-to-Sunday week containing the given day.
+
+    Parameters:
+    - day (str or date): Any date within the wanted week.
+    - employee (str, optional): Employee id, as in load_range.
+
+    Returns:
+    - EntryStore: The entries of that week in date order.
+    """
+    ordinal = to_ordinal(day)
+    monday = ordinal - date.fromordinal(ordinal).weekday()
+    return load_range(monday, monday + 6, employee)
+
+@instrumented("summarize")
+def summarize_data(start=None, end=None, min_rate=None, max_rate=None, employee=None, holidays=None):
+    """
+    Adds up the payroll ledger weeks that overlap [start, end], so totals carry
+    weekly overtime and year-to-date tax exactly as the ledger and payslips do.
+    Weeks are paid whole: a range starting or ending mid-week covers that whole week.
+    Without an employee, each employee's ledger is built separately and then added up.
+
+    Parameters:
+    - holidays (HolidayCalendar, optional): Defaults to the public and custom holiday files.
+
+    Returns:
+    - dict: Totals in the same shape as utils.calculate_weekly_totals.
+    """
+    if _use_snapshot():
+        return summarize_snapshot(start, end, min_rate, max_rate, employee, holidays)
+    ledgers = payroll_ledgers(start, end, holidays, employee, min_rate, max_rate)
+    return combine_weeks(week for ledger in ledgers.values() for week in ledger.between(start, end))
+
+@instrumented("load_snapshot", rows=len)
+def load_snapshot(employee=None):
+    """
+    Memory-maps the binary snapshot of the CSV file, rebuilding it first
+    if the CSV has changed since it was written.
+    Given an employee id with a partition file, the snapshot of that file is used.
+
+    Returns:
+    - Snapshot: Date, employee, hours and rate columns with no parsing or copying,
+      or None if the data file does not exist yet.
+    """
+    # NumPy is only imported once the snapshot is used, keeping plain CSV startup light
+    from snapshot import open_snapshot
+
+    try:
+        return open_snapshot(_data_file(employee))
+    except FileNotFoundError:
+        print("Data file not found; a new file will be created on the next save.")
+    except IOError as e:
+        print(f"An error occurred while loading data: {e}")
+    return None
+
+def summarize_snapshot(start=None, end=None, min_rate=None, max_rate=None, employee=None, holidays=None):
+    """
+    Computes the same totals as summarize_data with the batch ledger
+    reading columns straight out of the memory-mapped snapshot of each partition.
+    """
+    from batch_calc import calculate_weekly_totals_batch
+
+    holidays = holidays if holidays is not None else default_calendar()
+    totals = []
+    for key in _partitions(employee):
+        data = load_snapshot(key)
+        if data is None:
+            continue
+        records = data.select(*ledger_bounds(start, end), min_rate, max_rate,
+                              key if _data_file(key) == DATA_FILE else None)
+        totals.append(calculate_weekly_totals_batch(records["hours"], records["rate"], dates=records["date"],
+                                                    holidays=holidays, start=start))
+    return combine_weeks(totals)
+
+@instrumented("weekly_summary", rows=len)
+def weekly_summary(start=None, end=None, employee=None, holidays=None):
+    """
+    Returns the payroll ledger weeks that overlap [start, end].
+    Pass an employee id to summarise only that employee; otherwise each week
+    adds up every employee's ledger row for it.
+
+    Parameters:
+    - holidays (HolidayCalendar, optional): Defaults to the public and custom holiday files.
+
+    Returns:
+    - dict: Maps each week's Monday ('YYYY-MM-DD') to its totals, in date order.
+    """
+    ledgers = payroll_ledgers(start, end, holidays, employee)
+    if len(ledgers) == 1:
+        return next(iter(ledgers.values())).weekly(start, end)
+    weeks = {}
+    for ledger in ledgers.values():
+        for week in ledger.between(start, end):
+            weeks.setdefault(week["week_start"], []).append(week)
+    return {monday: combine_weeks(weeks[monday]) for monday in sorted(weeks)}
+
+@instrumented("payroll_ledger", rows=lambda ledger: len(ledger.weeks))
+def payroll_ledger(start=None, end=None, holidays=None, employee=None, min_rate=None, max_rate=None):
+    """
+    Builds a PayrollLedger with weekly overtime, holiday pay and cumulative year-to-date tax.
+    The rows are read from the start of the tax year containing start (see
+    payroll_periods.ledger_bounds), so the year-to-date figures of the weeks in
+    [start, end] are complete; use its between/weekly/totals methods with the same range.
+    They are streamed in date order and each week is closed as soon as the next
+    one starts, so only one week of rows is in memory at a time. With SQLite the
+    weekly hours and pay are aggregated in the query and only the tax is added here.
+
+    Parameters:
+    - holidays (HolidayCalendar, optional): Defaults to the public and custom holiday files.
+    - employee (str, optional): Employee id; tax is cumulative per person, so pass one
+      whenever the data holds more than one employee (or use payroll_ledgers).
+    - min_rate, max_rate (float, optional): Only pay entries within this hourly rate band.
+
+    Returns:
+    - PayrollLedger: Per-week rows plus tax-year rollups.
+    """
+    holidays = holidays if holidays is not None else default_calendar()
+    if _use_sqlite():
+        import sqlite3
+
+        try:
+            return _sqlite_ledger(start, end, holidays, employee, min_rate, max_rate)
+        except sqlite3.Error as e:
+            print(f"An error occurred while loading data: {e}")
+            return PayrollLedger((), holidays)
+    try:
+        return PayrollLedger(_iter_rows_by_date(*ledger_bounds(start, end), min_rate, max_rate, employee),
+                             holidays, ordered=True)
+    except FileNotFoundError:
+        print("Data file not found; a new file will be created on the next save.")
+    except IOError as e:
+        print(f"An error occurred while loading data: {e}")
+    return PayrollLedger((), holidays)
+
+def _sqlite_ledger(start, end, holidays, employee, min_rate, max_rate):
+    # The weekly hours and pay are aggregated in SQL; only the year-to-date tax is worked out here
+    import sqlite_backend
+
+    first, last = ledger_bounds(start, end)
+    in_range = [day for day in map(to_ordinal, holidays)
+                if (first is None or day >= first) and (last is None or day <= last)]
+    weeks = sqlite_backend.weekly_pay(DB_FILE, first, last, min_rate, max_rate, employee, in_range,
+                                      utils.OVERTIME_THRESHOLD)
+    return PayrollLedger.from_week_pay((to_ordinal(week[0]), _week_pay_from_sums(*week[1:])) for week in weeks)
+
+def _week_pay_from_sums(hours, regular_hours, holiday_hours, entries, regular_pay, overtime_base, holiday_base):
+    # overtime_base and holiday_base are those hours times their rate, before any premium
+    overtime_pay = overtime_base * utils.OVERTIME_RATE_MULTIPLIER
+    holiday_pay = holiday_base * (utils.HOLIDAY_RATE_MULTIPLIER - 1)
+    return {
+        "total_hours": hours,
+        "regular_hours": regular_hours,
+        "overtime_hours": hours - regular_hours,
+        "total_regular_pay": regular_pay,
+        "total_overtime_pay": overtime_pay,
+        "total_holiday_hours": holiday_hours,
+        "entries": entries,
+        "total_holiday_pay": holiday_pay,
+        "total_gross": regular_pay + overtime_pay + holiday_pay,
+    }
+
+@instrumented("payroll_ledgers", rows=len)
+def payroll_ledgers(start=None, end=None, holidays=None, employee=None, min_rate=None, max_rate=None):
+    """
+    Builds one payroll_ledger per employee the read covers: just the given one,
+    or every partition (every employee in the database with SQLite) otherwise.
+
+    Returns:
+    - dict: Maps employee id (None for an unsplit shared file) to its PayrollLedger.
+    """
+    holidays = holidays if holidays is not None else default_calendar()
+    return {key: payroll_ledger(start, end, holidays, key, min_rate, max_rate) for key in _partitions(employee)}
+
+@instrumented("migrate", rows=int)
+def migrate_csv_to_sqlite():
+    """
+    Copies every row of the employee partitions (or of the CSV file, before it has
+    been partitioned) into the SQLite database in one streaming, batched transaction,
+    keyed by employee id. Every row is kept, including several on one date.
+    Employees that already have rows in the database are skipped, so running
+    the migration again does not copy anyone twice.
+
+    Returns:
+    - int: Number of rows inserted.
+    """
+    import sqlite3
+    import sqlite_backend
+
+    # Once partitioned, the shared file's rows already live in the partitions
+    if _csv_split():
+        sources = [(employee, employee_file(employee)) for employee in partitioned_employees()]
+    else:
+        sources = [("", DATA_FILE)]
+    sources = [(employee, path) for employee, path in sources if os.path.exists(path)]
+    if not sources:
+        print("Data file not found; nothing to migrate.")
+        return 0
+    try:
+        migrated = set(sqlite_backend.employees(DB_FILE))
+        for employee, path in sources:
+            if employee in migrated:
+                print(f"{path} is already in {DB_FILE}; skipping it.")
+        sources = [(employee, path) for employee, path in sources if employee not in migrated]
+        if not sources:
+            return 0
+        rows = ((employee, from_ordinal(ordinal), hours, rate)
+                for employee, path in sources
+                for ordinal, hours, rate in iter_csv_file(path))
+        count = sqlite_backend.insert_rows(DB_FILE, rows)
+    except (IOError, sqlite3.Error) as e:
+        print(f"An error occurred while migrating data: {e}")
+        return 0
+    print(f"Migrated {count} rows from {len(sources)} file(s) to {DB_FILE}.")
+    return count
+
+def _compact_file(data_file):
+    # Rewrites one hours CSV without duplicate rows; returns (rows kept, duplicate rows removed)
+    seen = set()
+    kept = removed = 0
+    fd, temp_path = tempfile.mkstemp(suffix=".tmp", dir=os.path.dirname(os.path.abspath(data_file)))
+    try:
+        with open(data_file, mode='r', newline='') as source, \
+                os.fdopen(fd, mode='w', newline='') as target:
+            reader = csv.reader(source)
+            writer = csv.writer(target)
+            header = next(reader, None)
+            if header is not None:
+                writer.writerow(header)
+            for row in reader:
+                try:
+                    key = (row[0], float(row[1]), float(row[2]))
+                except (IndexError, ValueError):
+                    key = tuple(row)
+                if key in seen:
+                    removed += 1
+                    continue
+                seen.add(key)
+                writer.writerow(row)
+                kept += 1
+            target.flush()
+            os.fsync(target.fileno())
+        shutil.copymode(data_file, temp_path)
+        os.replace(temp_path, data_file)
+    except IOError:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+    return kept, removed
+
+@instrumented("compact", rows=sum)
+def compact_data():
+    """
+    Rewrites the CSV file without duplicate rows in one streaming pass.
+    Once the shared file has been split, every employee partition is compacted instead.
+    Rows are compared on their parsed values, so '8' and '8.0' count as the same.
+    The result is written to a temporary file and atomically swapped in.
+
+    Returns:
+    - tuple: (rows kept, duplicate rows removed).
+    """
+    if _use_sqlite():
+        import sqlite3
+        import sqlite_backend
+
+        try:
+            kept, removed = sqlite_backend.remove_duplicates(DB_FILE)
+        except sqlite3.Error as e:
+            print(f"An error occurred while compacting data: {e}")
+            return 0, 0
+        print(f"Data compacted: {kept} rows kept, {removed} duplicates removed.")
+        return kept, removed
+    data_files = [employee_file(key) for key in partitioned_employees()] if is_split() else [DATA_FILE]
+    if not data_files or not os.path.exists(data_files[0]):
+        print("Data file not found; nothing to compact.")
+        return 0, 0
+
+    kept = removed = 0
+    for data_file in data_files:
+        try:
+            file_kept, file_removed = _compact_file(data_file)
+        except IOError as e:
+            print(f"An error occurred while compacting {data_file}: {e}")
+            continue
+        kept += file_kept
+        removed += file_removed
+    print(f"Data compacted: {kept} rows kept, {removed} duplicates removed.")
+    return kept, removed
+
+def is_split():
+    """
+    Returns True once the hours are kept per employee. With CSV that is after
+    partition_data has split the shared file, which it records with SPLIT_MARKER;
+    a partition file on its own does not count. With SQLite it is always the
+    case, since every row is stored with its employee id.
+    """
+    return _use_sqlite() or _csv_split()
+
+def _csv_split():
+    return os.path.exists(os.path.join(EMPLOYEE_DIR, SPLIT_MARKER))
+
+def partitioned_employees():
+    """
+    Returns the ids of employees that have their own partition file, sorted.
+    """
+    if not os.path.isdir(EMPLOYEE_DIR):
+        return []
+    return sorted(os.path.splitext(name)[0] for name in os.listdir(EMPLOYEE_DIR) if name.endswith(".csv"))
+
+def partition_data(default_employee, rate=None, roster_file=ROSTER_FILE):
+    """
+    Splits the shared CSV file into per-employee partition files in one pass.
+    Rows with an 'Employee' column go to that employee; rows without one belong to
+    default_employee. Every employee is added to the roster; default_employee gets
+    rate as their starting rate, covering all their hours. Rates are not inferred
+    from the rows, which keep the rate they were paid at.
+    Employees that already have a partition are skipped. The shared file is kept
+    as a backup, but from then on (see is_split) reads and saves use the partitions only.
+    The partitions are always CSV files; with SQLite there is nothing to split,
+    as migrate_csv_to_sqlite copies them into the database by employee id.
+
+    Parameters:
+    - default_employee (str): Name of the employee the unlabelled rows belong to.
+    - rate (float, optional): default_employee's hourly rate.
+    - roster_file (str): Roster to update.
+
+    Returns:
+    - dict: Maps employee id to the number of rows written.
+    """
+    partitions = {}
+    names = {}
+    try:
+        with open(DATA_FILE, mode='r', newline='') as file:
+            reader = csv.reader(file)
+            header = next(reader, None) or []
+            if header and "Date" not in header:
+                print("Data format error: the data file has no Date, Hours Worked or Hourly Rate column.")
+                return {}
+            date_col = header.index("Date")
+            hours_col = header.index("Hours Worked")
+            rate_col = header.index("Hourly Rate")
+            employee_col = header.index("Employee") if "Employee" in header else None
+            for row in reader:
+                if not row:
+                    continue
+                name = row[employee_col] if employee_col is not None and row[employee_col] else default_employee
+                try:
+                    ordinal = to_ordinal(row[date_col])
+                    hours = float(row[hours_col])
+                    row_rate = float(row[rate_col])
+                    key = employee_id(name)
+                except (ValueError, IndexError):
+                    print("Data format error: skipping an entry due to invalid values.")
+                    continue
+                names.setdefault(key, name)
+                partitions.setdefault(key, EntryStore()).append(ordinal, hours, row_rate)
+    except FileNotFoundError:
+        # A new install has nothing to split, but saves still go to the partitions from now on
+        print("Data file not found; nothing to partition.")
+    except IOError as e:
+        print(f"An error occurred while partitioning data: {e}")
+        return {}
+
+    roster = load_roster(roster_file)
+    roster.add(default_employee, rate)
+    written = {}
+    try:
+        for key, entries in partitions.items():
+            if os.path.exists(employee_file(key)):
+                print(f"{employee_file(key)} already exists; skipping {names[key]}.")
+                continue
+            written[key] = _append_csv(employee_file(key), entries)
+            roster.add(names[key])
+        os.makedirs(EMPLOYEE_DIR, exist_ok=True)
+        # Recorded last: an interrupted split is simply run again, skipping the partitions it wrote
+        with open(os.path.join(EMPLOYEE_DIR, SPLIT_MARKER), mode='w') as file:
+            file.write(f"{DATA_FILE}\n")
+    except IOError as e:
+        print(f"An error occurred while partitioning data: {e}")
+        roster.save(roster_file)
+        return written
+    roster.save(roster_file)
+    if written:
+        print(f"{DATA_FILE} has been split into {EMPLOYEE_DIR}/ and is kept only as a backup.")
+    return written
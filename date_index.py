@@ -0,0 +1,257 @@
+import csv
+import heapq
+import locale
+import mmap
+import os
+import struct
+import tempfile
+from bisect import bisect_left, bisect_right
+
+from entry_store import to_ordinal
+
+INDEX_SUFFIX = ".idx"
+INDEX_MAGIC = b"BPIX"
+INDEX_VERSION = 1
+# magic, version, CSV size, CSV mtime_ns, sorted records, total records
+HEADER = struct.Struct("<4sIqqqq")
+# Fixed-width little-endian records: date ordinal and byte offset of the row
+RECORD = struct.Struct("<iq")
+TAIL_LIMIT = 4096  # Out-of-order records kept unsorted before the index is re-sorted
+CHUNK_RECORDS = 4096  # Sorted records unpacked at a time when streaming a range
+
+
+class _SortedOrdinals:
+    # Read-only sequence over the ordinals of the sorted records, so bisect can search the mapped file
+    __slots__ = ("buffer", "count")
+
+    def __init__(self, buffer, count):
+        self.buffer = buffer
+        self.count = count
+
+    def __len__(self):
+        return self.count
+
+    def __getitem__(self, position):
+        return RECORD.unpack_from(self.buffer, HEADER.size + position * RECORD.size)[0]
+
+
+def read_header(data_file):
+    """
+    Returns the column names of an hours CSV, or an empty list if it has none.
+    """
+    encoding = locale.getpreferredencoding(False)
+    with open(data_file, mode='rb') as file:
+        return next(csv.reader([file.readline().decode(encoding)]), None) or []
+
+
+class DateIndex:
+    """
+    Persistent sidecar index mapping entry dates to byte offsets in the hours CSV.
+
+    The sidecar is a small header followed by fixed-width (date ordinal, offset)
+    records: a section sorted by date, searched by bisecting the memory-mapped
+    file, then a short unsorted tail for rows appended out of date order.
+    Saves append records in place, so neither queries nor saves read or rewrite
+    the whole index. The header remembers the size and mtime of the CSV it
+    describes; if either changes behind its back the index is rebuilt from
+    scratch on the next query.
+    """
+
+    def __init__(self, data_file):
+        self.data_file = data_file
+        self.index_file = data_file + INDEX_SUFFIX
+        self.size = None
+        self.mtime_ns = None
+        self.sorted_count = 0
+        self.count = 0
+
+    def load(self):
+        """
+        Reads the sidecar header. Returns False if it is missing, unreadable or truncated.
+        """
+        try:
+            with open(self.index_file, mode='rb') as file:
+                header = file.read(HEADER.size)
+                length = os.fstat(file.fileno()).st_size
+        except FileNotFoundError:
+            return False
+        if len(header) < HEADER.size:
+            return False
+        magic, version, size, mtime_ns, sorted_count, count = HEADER.unpack(header)
+        if magic != INDEX_MAGIC or version != INDEX_VERSION or length < HEADER.size + count * RECORD.size:
+            return False
+        self.size, self.mtime_ns = size, mtime_ns
+        self.sorted_count, self.count = sorted_count, count
+        return True
+
+    def _header(self):
+        return HEADER.pack(INDEX_MAGIC, INDEX_VERSION, self.size, self.mtime_ns, self.sorted_count, self.count)
+
+    def _write(self, records):
+        # Replaces the whole sidecar atomically with records already sorted by (date, offset)
+        self.sorted_count = self.count = len(records)
+        directory = os.path.dirname(os.path.abspath(self.index_file))
+        fd, temp_path = tempfile.mkstemp(suffix=".tmp", dir=directory)
+        try:
+            with os.fdopen(fd, mode='wb') as file:
+                file.write(self._header())
+                file.write(b"".join(RECORD.pack(ordinal, offset) for ordinal, offset in records))
+            os.replace(temp_path, self.index_file)
+        except OSError:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+
+    def _records(self):
+        with open(self.index_file, mode='rb') as file:
+            file.seek(HEADER.size)
+            data = file.read(self.count * RECORD.size)
+        return list(RECORD.iter_unpack(data))
+
+    def is_current(self):
+        """
+        Returns True if the index still describes the CSV file on disk.
+        """
+        try:
+            stat = os.stat(self.data_file)
+        except FileNotFoundError:
+            return False
+        return stat.st_size == self.size and stat.st_mtime_ns == self.mtime_ns
+
+    def rebuild(self):
+        """
+        Rebuilds the index with a full scan of the CSV file and writes it out.
+        """
+        records = self._scan(0)
+        records.sort()
+        self._write(records)
+
+    def extend(self):
+        """
+        Indexes only the rows appended since the index was last current,
+        appending their records to the sidecar instead of rewriting it.
+        Rows in date order extend the sorted section; anything else goes to the
+        unsorted tail, which is merged back in once it reaches TAIL_LIMIT records.
+        """
+        new = self._scan(self.size or 0)
+        new.sort()
+        if self.count - self.sorted_count + len(new) > TAIL_LIMIT:
+            records = self._records() + new
+            records.sort()
+            self._write(records)
+            return
+
+        with open(self.index_file, mode='r+b') as file:
+            if new and self.count == self.sorted_count:
+                if self.sorted_count:
+                    file.seek(HEADER.size + (self.sorted_count - 1) * RECORD.size)
+                    last = RECORD.unpack(file.read(RECORD.size))[0]
+                else:
+                    last = None
+                in_order = last is None or new[0][0] >= last
+            else:
+                in_order = False
+            file.seek(HEADER.size + self.count * RECORD.size)
+            file.write(b"".join(RECORD.pack(ordinal, offset) for ordinal, offset in new))
+            file.truncate()
+            self.count += len(new)
+            if in_order:
+                self.sorted_count = self.count
+            # The header goes last: a crash before this leaves a stale header, which forces a rebuild
+            file.seek(0)
+            file.write(self._header())
+
+    def ensure_current(self):
+        """
+        Loads the sidecar, rebuilding it if it is missing or stale.
+        """
+        if not (self.load() and self.is_current()):
+            self.rebuild()
+
+    def offsets_between(self, start=None, end=None):
+        """
+        Returns the byte offsets of all rows dated within [start, end], in date order.
+        The sorted section is searched by binary search on the mapped file.
+        """
+        return list(self.iter_offsets_between(start, end))
+
+    def iter_offsets_between(self, start=None, end=None):
+        """
+        Yields the byte offsets of all rows dated within [start, end], in date order,
+        like offsets_between but without building the list: the matching part of the
+        sorted section is unpacked CHUNK_RECORDS at a time and merged with the tail.
+        The sidecar stays mapped until the generator is exhausted or closed.
+        """
+        low_ordinal = to_ordinal(start) if start is not None else None
+        high_ordinal = to_ordinal(end) if end is not None else None
+        if not self.count:
+            return
+        with open(self.index_file, mode='rb') as file, \
+                mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+            ordinals = _SortedOrdinals(buffer, self.sorted_count)
+            low = bisect_left(ordinals, low_ordinal) if low_ordinal is not None else 0
+            high = bisect_right(ordinals, high_ordinal) if high_ordinal is not None else self.sorted_count
+            tail = sorted((ordinal, offset) for ordinal, offset in RECORD.iter_unpack(
+                              buffer[HEADER.size + self.sorted_count * RECORD.size:HEADER.size + self.count * RECORD.size])
+                          if (low_ordinal is None or ordinal >= low_ordinal)
+                          and (high_ordinal is None or ordinal <= high_ordinal))
+
+            def matches():
+                for first in range(low, high, CHUNK_RECORDS):
+                    last = min(first + CHUNK_RECORDS, high)
+                    yield from RECORD.iter_unpack(
+                        buffer[HEADER.size + first * RECORD.size:HEADER.size + last * RECORD.size])
+
+            for _, offset in heapq.merge(matches(), tail):
+                yield offset
+
+    def _scan(self, offset):
+        # Returns (date ordinal, byte offset) for every row from offset to the end of the file
+        encoding = locale.getpreferredencoding(False)
+        records = []
+        with open(self.data_file, mode='rb') as file:
+            stat = os.fstat(file.fileno())
+            header = next(csv.reader([file.readline().decode(encoding)]), None) or []
+            date_col = header.index("Date") if "Date" in header else None
+            if offset == 0:
+                offset = file.tell()
+            else:
+                file.seek(offset)
+            for line in file:
+                if offset >= stat.st_size:
+                    break
+                row_offset = offset
+                offset += len(line)
+                if date_col is None:
+                    continue
+                row = next(csv.reader([line.decode(encoding)]), None)
+                if not row:
+                    continue
+                try:
+                    records.append((to_ordinal(row[date_col]), row_offset))
+                except (ValueError, IndexError):
+                    continue
+        self.size = stat.st_size
+        self.mtime_ns = stat.st_mtime_ns
+        return records
+
+
+def read_rows_at(data_file, offsets):
+    """
+    Reads and parses the CSV rows starting at the given byte offsets.
+
+    Parameters:
+    - data_file (str): Path to the hours CSV.
+    - offsets (iterable of int): Byte offsets from DateIndex.offsets_between or
+      iter_offsets_between; they are read lazily, one row at a time.
+
+    Yields:
+    - list of str: The raw CSV fields of each row.
+    """
+    encoding = locale.getpreferredencoding(False)
+    with open(data_file, mode='rb') as file:
+        for offset in offsets:
+            file.seek(offset)
+            row = next(csv.reader([file.readline().decode(encoding)]), None)
+            if row:
+                yield row
@@ -0,0 +1,210 @@
+from array import array
+from datetime import date as date_type
+
+
+def to_ordinal(value):
+    """
+    Converts a 'YYYY-MM-DD' string or date object into a proleptic Gregorian ordinal.
+
+    Parameters:
+    - value (str or date or int): The date to convert. Ints are returned unchanged.
+
+    Returns:
+    - int: The date ordinal.
+    """
+    if isinstance(value, int):
+        return value
+    if isinstance(value, str):
+        value = date_type.fromisoformat(value)
+    return value.toordinal()
+
+
+def from_ordinal(ordinal):
+    """
+    Converts a date ordinal back into the 'YYYY-MM-DD' string used throughout the app.
+    """
+    return date_type.fromordinal(ordinal).isoformat()
+
+
+class Entry:
+    """
+    A single workday entry. Supports both attribute access and the
+    dict-style access (entry['hours'], entry.get('rate', 0)) used by older callers.
+    """
+    __slots__ = ("date", "hours", "rate")
+
+    def __init__(self, date, hours, rate):
+        self.date = date
+        self.hours = hours
+        self.rate = rate
+
+    def __getitem__(self, key):
+        try:
+            return getattr(self, key)
+        except (AttributeError, TypeError):
+            raise KeyError(key) from None
+
+    def get(self, key, default=None):
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def as_dict(self):
+        return {"date": self.date, "hours": self.hours, "rate": self.rate}
+
+    def __repr__(self):
+        return f"Entry(date={self.date!r}, hours={self.hours!r}, rate={self.rate!r})"
+
+
+class EntryStore:
+    """
+    Compact columnar container for workday entries.
+    Dates are kept as int32 ordinals and hours/rates as float64 in typed arrays,
+    so no per-row dict is allocated and the columns can be handed to the
+    batch totals engine without copying.
+    """
+
+    def __init__(self, entries=None):
+        self._dates = array("i")
+        self._hours = array("d")
+        self._rates = array("d")
+        self._clean = 0  # entries before this index are already persisted
+        if entries is not None:
+            self.extend(entries)
+
+    def append(self, date, hours, rate):
+        """
+        Appends one entry.
+
+        Parameters:
+        - date (str or date or int): Entry date as 'YYYY-MM-DD', date object or ordinal.
+        - hours (float): Hours worked.
+        - rate (float): Hourly rate.
+        """
+        self._dates.append(to_ordinal(date))
+        self._hours.append(float(hours))
+        self._rates.append(float(rate))
+
+    def extend(self, entries):
+        """
+        Appends entries given as dicts or Entry records.
+        """
+        if isinstance(entries, EntryStore):
+            self._dates.extend(entries._dates)
+            self._hours.extend(entries._hours)
+            self._rates.extend(entries._rates)
+            return
+        for entry in entries:
+            self.append(entry["date"], entry["hours"], entry["rate"])
+
+    def extend_columns(self, dates, hours, rates):
+        """
+        Appends whole columns at once, e.g. NumPy arrays from a vectorized pass.
+
+        Parameters:
+        - dates (array-like): Date ordinals.
+        - hours (array-like): Hours worked.
+        - rates (array-like): Hourly rates.
+        """
+        import numpy as np
+
+        self._dates.frombytes(np.ascontiguousarray(dates, dtype=np.int32).tobytes())
+        self._hours.frombytes(np.ascontiguousarray(hours, dtype=np.float64).tobytes())
+        self._rates.frombytes(np.ascontiguousarray(rates, dtype=np.float64).tobytes())
+
+    def clear(self):
+        del self._dates[:]
+        del self._hours[:]
+        del self._rates[:]
+        self._clean = 0
+
+    def __len__(self):
+        return len(self._dates)
+
+    def __bool__(self):
+        return len(self._dates) > 0
+
+    def __iter__(self):
+        for ordinal, hours, rate in zip(self._dates, self._hours, self._rates):
+            yield Entry(from_ordinal(ordinal), hours, rate)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            store = EntryStore()
+            store._dates = self._dates[index]
+            store._hours = self._hours[index]
+            store._rates = self._rates[index]
+            return store
+        return Entry(from_ordinal(self._dates[index]), self._hours[index], self._rates[index])
+
+    def column(self, name):
+        """
+        Returns the underlying 'date' (ordinals), 'hours' or 'rate' array. Treat it as read-only.
+        """
+        return {"date": self._dates, "hours": self._hours, "rate": self._rates}[name]
+
+    def rows(self):
+        """
+        Iterates over raw (date ordinal, hours, rate) tuples without building Entry records.
+        """
+        return zip(self._dates, self._hours, self._rates)
+
+    def between(self, start=None, end=None):
+        """
+        Returns a new store holding only the entries dated within [start, end].
+
+        Parameters:
+        - start (str or date, optional): First date to include. Open-ended if None.
+        - end (str or date, optional): Last date to include. Open-ended if None.
+
+        Returns:
+        - EntryStore: The matching entries, in their original order.
+        """
+        low = to_ordinal(start) if start is not None else None
+        high = to_ordinal(end) if end is not None else None
+        store = EntryStore()
+        for ordinal, hours, rate in zip(self._dates, self._hours, self._rates):
+            if (low is None or ordinal >= low) and (high is None or ordinal <= high):
+                store._dates.append(ordinal)
+                store._hours.append(hours)
+                store._rates.append(rate)
+        return store
+
+    def columns(self):
+        """
+        Returns zero-copy NumPy views over the date, hours and rate columns.
+        The views share memory with the store, so drop them before appending again.
+
+        Returns:
+        - tuple: (dates, hours, rates) as int32, float64 and float64 arrays.
+        """
+        import numpy as np
+
+        return (
+            np.frombuffer(self._dates, dtype=np.int32),
+            np.frombuffer(self._hours, dtype=np.float64),
+            np.frombuffer(self._rates, dtype=np.float64),
+        )
+
+    def pending(self):
+        """
+        Returns the entries added since the last load or save.
+        Entries are append-only, so anything past the clean mark is new.
+        """
+        return self[self._clean:]
+
+    def has_pending(self):
+        return self._clean < len(self._dates)
+
+    def mark_clean(self):
+        """
+        Marks every current entry as persisted.
+        """
+        self._clean = len(self._dates)
+
+    def to_dicts(self):
+        return [entry.as_dict() for entry in self]
+
+    def __repr__(self):
+        return f"EntryStore({len(self)} entries)"
@@ -0,0 +1,98 @@
+import csv
+import os
+
+from entry_store import from_ordinal, to_ordinal
+
+HOLIDAYS_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "public_holidays.csv")
+CUSTOM_HOLIDAYS_FILE = "custom_holidays.csv"  # Optional, same 'Date,Name' layout
+
+
+class HolidayCalendar:
+    """
+    Immutable set of holiday dates stored as ordinals for O(1) lookups.
+    Membership accepts 'YYYY-MM-DD' strings, date objects or ordinals.
+    """
+    __slots__ = ("ordinals", "names", "_array")
+
+    def __init__(self, holidays=()):
+        """
+        Parameters:
+        - holidays (iterable): Dates, or (date, name) pairs.
+        """
+        names = {}
+        for holiday in holidays:
+            day, name = holiday if isinstance(holiday, tuple) else (holiday, "")
+            names[to_ordinal(day)] = name
+        self.ordinals = frozenset(names)
+        self.names = names
+        self._array = None
+
+    def __contains__(self, day):
+        try:
+            return to_ordinal(day) in self.ordinals
+        except (ValueError, TypeError, AttributeError):
+            return False
+
+    def __len__(self):
+        return len(self.ordinals)
+
+    def __iter__(self):
+        return (from_ordinal(ordinal) for ordinal in sorted(self.ordinals))
+
+    def name_of(self, day):
+        return self.names.get(to_ordinal(day))
+
+    def array(self):
+        """
+        Returns the holiday ordinals as a sorted int32 NumPy array for numpy.isin.
+        """
+        if self._array is None:
+            import numpy as np
+
+            self._array = np.array(sorted(self.ordinals), dtype=np.int32)
+        return self._array
+
+
+def read_holidays(path):
+    """
+    Reads (date, name) pairs from a 'Date,Name' CSV file.
+    Missing files yield nothing; malformed rows are skipped.
+    """
+    try:
+        with open(path, mode='r', newline='') as file:
+            for row in csv.DictReader(file):
+                try:
+                    yield to_ordinal(row["Date"].strip()), (row.get("Name") or "").strip()
+                except (ValueError, KeyError, AttributeError):
+                    print("Holiday format error: skipping an invalid row.")
+    except FileNotFoundError:
+        return
+
+
+def load_holidays(path=None, custom_path=None):
+    """
+    Loads the Irish public holidays shipped with the app plus any custom holidays.
+
+    Parameters:
+    - path (str, optional): Public holidays file. Defaults to HOLIDAYS_FILE.
+    - custom_path (str, optional): Extra holidays file. Defaults to CUSTOM_HOLIDAYS_FILE.
+
+    Returns:
+    - HolidayCalendar: All holidays from both files.
+    """
+    public = read_holidays(path or HOLIDAYS_FILE)
+    custom = read_holidays(custom_path or CUSTOM_HOLIDAYS_FILE)
+    return HolidayCalendar([*public, *custom])
+
+
+_default_calendar = None
+
+
+def default_calendar():
+    """
+    Returns the calendar from the default files, loading it on first use.
+    """
+    global _default_calendar
+    if _default_calendar is None:
+        _default_calendar = load_holidays()
+    return _default_calendar
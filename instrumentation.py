@@ -0,0 +1,215 @@
+"""
+Opt-in timing and profiling hooks for the load, save, calculate and export paths.
+
+Set BALLYROE_INSTRUMENT before starting the app or CLI to record call counts,
+cumulative wall time and row counts per operation; a summary is logged on exit.
+Use BALLYROE_INSTRUMENT=debug to also log every call. Set BALLYROE_PROFILE to a
+file name to also dump a cProfile of the whole session there (readable with
+pstats or snakeviz). With neither set, every hook returns immediately.
+"""
+import atexit
+import cProfile
+import contextlib
+import functools
+import logging
+import os
+import time
+
+INSTRUMENT_ENV = "BALLYROE_INSTRUMENT"
+PROFILE_ENV = "BALLYROE_PROFILE"
+
+logger = logging.getLogger("ballyroe")
+
+_enabled = False
+_stats = {}  # operation name -> [calls, seconds, rows]
+_session_profile = None
+
+
+class _Timer:
+    __slots__ = ("name", "rows", "_started")
+
+    def __init__(self, name, rows=None):
+        self.name = name
+        self.rows = rows
+
+    def __enter__(self):
+        self._started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        record(self.name, time.perf_counter() - self._started, self.rows)
+        return False
+
+
+class _NullTimer:
+    # Shared no-op timer handed out while instrumentation is off
+    __slots__ = ("rows",)
+
+    def __init__(self):
+        self.rows = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+
+_NULL_TIMER = _NullTimer()
+
+
+def is_enabled():
+    return _enabled
+
+
+def enable(verbose=False):
+    """
+    Turns on call recording and makes sure the 'ballyroe' logger has somewhere to write.
+
+    Parameters:
+    - verbose (bool): Log every recorded call at DEBUG level, not just the exit summary.
+    """
+    global _enabled
+    if not _enabled:
+        atexit.register(log_summary)
+    _enabled = True
+    logger.setLevel(logging.DEBUG if verbose else logging.INFO)
+    if not logger.handlers and not logging.getLogger().handlers:
+        handler = logging.StreamHandler()
+        handler.setFormatter(logging.Formatter("%(asctime)s %(name)s %(levelname)s %(message)s"))
+        logger.addHandler(handler)
+
+
+def disable():
+    global _enabled
+    _enabled = False
+
+
+def timed(name, rows=None):
+    """
+    Context manager that records the wall time of its block under name.
+    Set .rows on the returned timer to record how many rows the block handled.
+    Costs one function call when instrumentation is off.
+
+    Example:
+        with timed("load_data") as timer:
+            entries = ...
+            timer.rows = len(entries)
+    """
+    if not _enabled:
+        return _NULL_TIMER
+    return _Timer(name, rows)
+
+
+def instrumented(name, rows=None, input_rows=False):
+    """
+    Decorator form of timed() for whole functions.
+
+    Parameters:
+    - name (str): Operation name the calls are recorded under.
+    - rows (callable, optional): Maps the function's result to a row count, e.g. len.
+      Not called when the function returns None, e.g. on a missing file.
+    - input_rows (bool): Count the rows of the first argument instead, when it has a length.
+    """
+    def decorate(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return func(*args, **kwargs)
+            with _Timer(name) as timer:
+                if input_rows and args and hasattr(args[0], "__len__"):
+                    timer.rows = len(args[0])
+                result = func(*args, **kwargs)
+                if rows is not None and result is not None:
+                    timer.rows = rows(result)
+            return result
+        return wrapper
+    return decorate
+
+
+def record(name, seconds, rows=None):
+    """
+    Adds one call to the statistics for name.
+    """
+    stat = _stats.get(name)
+    if stat is None:
+        stat = _stats[name] = [0, 0.0, 0]
+    stat[0] += 1
+    stat[1] += seconds
+    if rows:
+        stat[2] += rows
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("%s took %.4fs%s", name, seconds, f" ({rows} rows)" if rows is not None else "")
+
+
+def stats():
+    """
+    Returns the recorded statistics.
+
+    Returns:
+    - dict: Maps operation name to {'calls', 'seconds', 'rows'}, slowest first.
+    """
+    ordered = sorted(_stats.items(), key=lambda item: item[1][1], reverse=True)
+    return {name: {"calls": calls, "seconds": seconds, "rows": rows} for name, (calls, seconds, rows) in ordered}
+
+
+def reset():
+    _stats.clear()
+
+
+def log_summary():
+    """
+    Logs one line per recorded operation at INFO level.
+    """
+    for name, stat in stats().items():
+        rows = f", {stat['rows']} rows" if stat["rows"] else ""
+        logger.info("%s: %d calls, %.4fs total%s", name, stat["calls"], stat["seconds"], rows)
+
+
+@contextlib.contextmanager
+def profiled(path):
+    """
+    Runs the block under cProfile and dumps the statistics to path,
+    e.g. around a batch run: with profiled("payroll.prof"): run_payroll(...)
+    """
+    profile = cProfile.Profile()
+    profile.enable()
+    try:
+        yield profile
+    finally:
+        profile.disable()
+        profile.dump_stats(path)
+        logger.info("Profile written to %s", path)
+
+
+def start_session_profile(path):
+    """
+    Profiles the rest of the process and dumps the statistics to path on exit.
+    """
+    global _session_profile
+    if _session_profile is not None:
+        return
+    _session_profile = cProfile.Profile()
+
+    def dump():
+        _session_profile.disable()
+        _session_profile.dump_stats(path)
+        logger.info("Profile written to %s", path)
+
+    atexit.register(dump)
+    _session_profile.enable()
+
+
+def configure_from_environment():
+    """
+    Applies BALLYROE_INSTRUMENT and BALLYROE_PROFILE; called once on import.
+    """
+    setting = os.environ.get(INSTRUMENT_ENV, "").strip().lower()
+    profile_path = os.environ.get(PROFILE_ENV)
+    if profile_path or (setting and setting not in ("0", "false", "no", "off")):
+        enable(verbose=setting == "debug")
+    if profile_path:
+        start_session_profile(profile_path)
+
+
+configure_from_environment()
@@ -1,43 +1,200 @@
-import tkinter as tk
-from tkinter import messagebox, filedialog
-from data_handler import initialize_csv, load_data, save_data
-from ui_components import create_widgets, display_data_entry
-from validation import validate_all_fields
-from utils import calculate_weekly_totals, format_currency
-from fpdf import FPDF, XPos, YPos
+import os
 
+from data_handler import initialize_csv, is_split, load_data, load_range, partition_data, save_entries
+from utils import format_currency
+from entry_store import EntryStore, to_ordinal
+from holiday_calendar import default_calendar
+from payroll_periods import TOTAL_KEYS, PayrollLedger, combine_weeks, ledger_bounds, week_start
+from roster import load_roster
 
 
-print("Application starting...")
-
 class EmployeeData:
-    def __init__(self):
+    """
+    The GUI's view onto one employee of the roster: their entries, payroll ledger
+    and rate history. Loads and saves touch only that employee's partition.
+    """
+    def __init__(self, roster=None):
         self.name = ""
         self.hourly_rate = 0
-        self.entries = []
+        self.employee = None  # Roster id of the employee being viewed
+        self.roster = roster if roster is not None else load_roster()
+        self.entries = EntryStore()
+        self._ledger = None  # Built on first use, then kept up to date by add_entry
+        self._span = None  # (first, last) date ordinals of the saved rows in the ledger
+        self._mondays = set()  # Ordinals of the Mondays of the weeks with entries on screen
+        self.holidays = default_calendar()
 
-    def set_employee_info(self, name, hourly_rate):
+    def set_employee_info(self, name, hourly_rate, effective_from=None):
+        """
+        Switches to an employee, adding them to the roster if they are new.
+        A rate different from their current one is recorded from effective_from
+        (default today); a new employee's first rate covers all their hours.
+        """
+        if not is_split():
+            # First run after the upgrade: the existing single-user file belongs to this employee
+            partition_data(name, hourly_rate)
+            self.roster = load_roster()
+        employee = self.roster.add(name, hourly_rate, effective_from)
+        try:
+            self.roster.save()
+        except OSError as e:
+            print(f"An error occurred while saving the roster: {e}")
+        if employee.id != self.employee:
+            self.clear_entries()
         self.name = name
         self.hourly_rate = hourly_rate
+        self.employee = employee.id
+
+    def rate_on(self, date):
+        """
+        Returns the employee's rate on date from their rate history,
+        falling back to the rate entered for this session.
+        """
+        employee = self.roster.get(self.employee) if self.employee else None
+        rate = employee.rate_on(date) if employee else None
+        return rate if rate is not None else self.hourly_rate
 
     def add_entry(self, date, hours):
-        self.entries.append({"date": date, "hours": hours, "rate": self.hourly_rate})
+        """
+        Adds an unsaved entry. Once the ledger is built it is updated in place:
+        only the entry's week is re-closed and the later weeks of its tax year
+        re-taxed, and saved rows are read only for weeks the ledger does not cover yet.
+        """
+        rate = self.rate_on(date)
+        self.entries.append(date, hours, rate)
+        if self._ledger is None:
+            return
+        ordinal = to_ordinal(date)
+        first, last = ledger_bounds(ordinal, ordinal)
+        if self._span is None:
+            saved = list(load_range(first, last, self.employee).rows())
+        else:
+            saved = []
+            if first < self._span[0]:
+                saved += load_range(first, self._span[0] - 1, self.employee).rows()
+            if last > self._span[1]:
+                saved += load_range(self._span[1] + 1, last, self.employee).rows()
+            first, last = min(first, self._span[0]), max(last, self._span[1])
+        self._span = (first, last)
+        self._ledger.extend(saved + [(ordinal, hours, rate)])
+        self._mondays.add(week_start(ordinal))
 
     def clear_entries(self):
         self.entries.clear()
+        self._ledger = None
+
+    def _bounds(self, entries):
+        # The saved rows a ledger of these entries needs (see ledger_bounds), or None for no entries
+        if not entries:
+            return None
+        dates = entries.column("date")
+        return ledger_bounds(min(dates), max(dates))
+
+    def _build_ledger(self, entries):
+        # Saved rows from the start of the tax year, plus the unsaved ones on screen,
+        # so year-to-date tax and whole-week overtime match the stored history
+        bounds = self._bounds(entries)
+        saved = list(load_range(*bounds, self.employee).rows()) if bounds else []
+        return PayrollLedger(saved + list(entries.pending().rows()), self.holidays, keep_entries=True)
+
+    def _use_ledger(self, ledger):
+        self._ledger = ledger
+        self._span = self._bounds(self.entries)
+        self._mondays = {week_start(ordinal) for ordinal in self.entries.column("date")}
+
+    def ledger(self):
+        """
+        Returns the payroll ledger behind every total, summary and payslip.
+        """
+        if self._ledger is None:
+            self._use_ledger(self._build_ledger(self.entries))
+        return self._ledger
+
+    def weeks(self):
+        """
+        Returns the ledger weeks containing the entries on screen, in date order.
+        """
+        ledger = self.ledger()
+        return [ledger.week_of(monday) for monday in sorted(self._mondays)]
 
     def calculate_totals(self):
-        return calculate_weekly_totals(self.entries)
+        """
+        Returns the totals of the weeks worked, in the shape of utils.calculate_weekly_totals.
+        Reads the ledger kept up to date by add_entry, so it costs O(weeks), not O(entries).
+        """
+        return combine_weeks(self.weeks())
+
+    def recalculate_totals(self):
+        """
+        Recomputes calculate_totals from scratch with the batch ledger, over the
+        saved rows and the unsaved entries.
+        """
+        from batch_calc import payroll_ledger_batch
+
+        bounds = self._bounds(self.entries)
+        if bounds is None:
+            return combine_weeks(())
+        rows = list(load_range(*bounds, self.employee).rows()) + list(self.entries.pending().rows())
+        dates, hours, rates = zip(*rows)
+        weeks = payroll_ledger_batch(dates, hours, rates, self.holidays)
+        mondays = {week_start(ordinal) for ordinal in self.entries.column("date")}
+        on_screen = [position for position, monday in enumerate(weeks["week_start"]) if monday in mondays]
+        return {key: sum(weeks[key][position] for position in on_screen) for key in TOTAL_KEYS}
+
+    def totals_consistent(self, tolerance=0.005):
+        """
+        Checks the incrementally kept totals against a full recomputation, to the cent by default.
+        """
+        kept = self.calculate_totals()
+        full = self.recalculate_totals()
+        return all(abs(kept[key] - full[key]) <= tolerance for key in TOTAL_KEYS)
+
+    def save_to_csv(self, report=None):
+        """
+        Appends only the entries added since the last load or save.
+        Safe on a worker thread as long as no entries are added meanwhile;
+        report(done, total) is passed on to save_entries.
+        Returns the number of rows written.
+        """
+        pending = self.entries.pending()
+        saved = save_entries(pending, self.employee, report)
+        if saved == len(pending):
+            self.entries.mark_clean()
+        return saved
+
+    def read_entries(self, report=None):
+        """
+        Loads this employee's entries and their ledger without touching the
+        current ones, so it can run on a worker thread.
 
-    def save_to_csv(self):
-        for entry in self.entries:
-            save_data(entry["date"], entry["hours"], entry["rate"])
+        Returns:
+        - tuple: (EntryStore, PayrollLedger), to be handed to set_entries.
+        """
+        entries = load_data(employee=self.employee, report=report)
+        return entries, self._build_ledger(entries)
 
-    def load_from_csv(self):
-        self.entries = load_data()
+    def set_entries(self, entries, ledger=None):
+        self.entries = entries
+        self._ledger = None
+        if ledger is not None:
+            self._use_ledger(ledger)
+
+    def load_from_csv(self, report=None):
+        self.set_entries(*self.read_entries(report))
 
 
 def main():
+    # GUI and PDF stacks are imported here so headless use of this module stays light
+    import tkinter as tk
+    import tkinter.messagebox  # Loads the submodule behind tk.messagebox
+    from datetime import date
+    from tkinter import filedialog, simpledialog
+    from ui_components import create_widgets
+    from validation import validate_all_fields
+    from background_task import BackgroundTask
+
+    print("Application starting...")
+
     # Initialize main application window
     root = tk.Tk()
     root.title("Ballyroe Pay Calculator")
@@ -50,13 +207,41 @@ def main():
     widgets = create_widgets(root)
 
     employee_data = EmployeeData()  # Use EmployeeData to manage user data and entries
+    widgets['data_display'].set_entries(employee_data.entries)
+
+    def fill_employee_rate(event=None):
+        employee = employee_data.roster.get(widgets['name_entry'].get().strip())
+        if employee is not None and employee.current_rate is not None:
+            widgets['hourly_rate_entry'].delete(0, tk.END)
+            widgets['hourly_rate_entry'].insert(0, f"{employee.current_rate:g}")
+
+    def ask_rate_effective_from(employee, hourly_rate):
+        # Returns the first day of a changed rate, or None if the user cancels
+        while True:
+            answer = simpledialog.askstring(
+                "Rate Change",
+                f"{employee.name}'s rate changes from €{employee.current_rate:.2f} to €{hourly_rate:.2f}.\n"
+                "First day paid at the new rate (YYYY-MM-DD):",
+                initialvalue=date.today().isoformat(), parent=root)
+            if answer is None:
+                return None
+            try:
+                return date.fromisoformat(answer.strip())
+            except ValueError:
+                tk.messagebox.showerror("Invalid Input", "Please enter the date in YYYY-MM-DD format.")
 
     def start_app():
         name = widgets['name_entry'].get().strip()
         try:
             hourly_rate = float(widgets['hourly_rate_entry'].get())
-            if name and hourly_rate > 0:
-                employee_data.set_employee_info(name, hourly_rate)
+            if any(char.isalnum() for char in name) and hourly_rate > 0:
+                employee = employee_data.roster.get(name)
+                effective_from = None
+                if employee is not None and employee.current_rate not in (None, hourly_rate):
+                    effective_from = ask_rate_effective_from(employee, hourly_rate)
+                    if effective_from is None:
+                        return
+                employee_data.set_employee_info(name, hourly_rate, effective_from)
                 widgets['name_prompt_frame'].pack_forget()
                 widgets['input_frame'].pack(fill="x", expand=True)
                 widgets['greeting_label'].config(text=f"Hi {name}! Your hourly rate is €{hourly_rate:.2f}")
@@ -71,24 +256,28 @@ def main():
             date = widgets['date_entry'].get_date().strftime('%Y-%m-%d')
             hours = float(widgets['hours_entry'].get())
             employee_data.add_entry(date, hours)
-            display_data_entry(widgets['data_display'], date, hours, employee_data.hourly_rate)
+            widgets['data_display'].entry_added()
+            update_total_labels()
             tk.messagebox.showinfo("Entry Added", f"Entry for {date} added successfully!")
 
+    def update_total_labels():
+        totals = employee_data.calculate_totals()
+        widgets['total_hours_label'].config(text=f"Total Hours: {totals['total_hours']}")
+        widgets['total_gross_label'].config(text=f"Total Gross Pay: €{totals['total_gross']}")
+        widgets['total_net_label'].config(text=f"Total Net Pay: {format_currency(totals['total_net'])}")
+        average_net_pay = totals['total_net'] / max(totals['entries'], 1)
+        widgets['average_label'].config(text=f"Average Net Pay: {format_currency(average_net_pay)}")
+
     def calculate_and_display_totals():
         if employee_data.entries:
-            totals = employee_data.calculate_totals()
-            widgets['total_hours_label'].config(text=f"Total Hours: {totals['total_hours']}")
-            widgets['total_gross_label'].config(text=f"Total Gross Pay: €{totals['total_gross']}")
-            widgets['total_net_label'].config(text=f"Total Net Pay: {format_currency(totals['total_net'])}")
-            average_net_pay = totals['total_net'] / max(len(employee_data.entries), 1)
-            widgets['average_label'].config(text=f"Average Net Pay: {format_currency(average_net_pay)}")
+            update_total_labels()
             tk.messagebox.showinfo("Calculation Complete", "Totals have been calculated and displayed!")
         else:
             tk.messagebox.showwarning("No Data", "Please add work entries before calculating totals.")
 
     def clear_entries():
         employee_data.clear_entries()
-        widgets['data_display'].delete(1.0, tk.END)
+        widgets['data_display'].set_entries(employee_data.entries)
         widgets['total_hours_label'].config(text="Total Hours: 0")
         widgets['total_gross_label'].config(text="Total Gross Pay: €0.00")
         widgets['total_net_label'].config(text="Total Net Pay: €0.00")
@@ -96,61 +285,187 @@ def main():
         tk.messagebox.showinfo("Entries Cleared", "All entries have been cleared.")
 
     def save_data_to_csv():
-        if employee_data.entries:
-            employee_data.save_to_csv()
-            tk.messagebox.showinfo("Data Saved", "Your data has been saved successfully.")
+        if employee_data.entries.has_pending():
+            def on_done(saved):
+                if saved:
+                    tk.messagebox.showinfo("Data Saved", "Your data has been saved successfully.")
+                else:
+                    tk.messagebox.showerror("Save Failed", "Your data could not be saved.")
+
+            run_in_background(employee_data.save_to_csv, "Saving...", on_done, "Save Failed")
+        elif employee_data.entries:
+            tk.messagebox.showinfo("Data Saved", "All entries are already saved.")
         else:
             tk.messagebox.showwarning("No Data", "There is no data to save.")
 
     def load_and_display_data():
-        employee_data.load_from_csv()
-        if employee_data.entries:
-            widgets['data_display'].delete(1.0, tk.END)
-            for entry in employee_data.entries:
-                display_data_entry(widgets['data_display'], entry['date'], entry['hours'], entry['rate'])
-            calculate_and_display_totals()
-            tk.messagebox.showinfo("Data Loaded", "Data loaded successfully from file.")
-        else:
-            tk.messagebox.showwarning("No Data", "No data available to load.")
+        def on_done(loaded):
+            # Back on the Tk thread: only now swap the loaded entries in
+            employee_data.set_entries(*loaded)
+            widgets['data_display'].set_entries(employee_data.entries)
+            if employee_data.entries:
+                calculate_and_display_totals()
+                tk.messagebox.showinfo("Data Loaded", "Data loaded successfully from file.")
+            else:
+                update_total_labels()
+                tk.messagebox.showwarning("No Data", "No data available to load.")
 
-    def show_weekly_summary():
-        totals = employee_data.calculate_totals()
+        run_in_background(employee_data.read_entries, "Loading...", on_done, "Load Failed")
+
+    def apply_entries_filter():
+        start = widgets['filter_start_entry'].get().strip()
+        end = widgets['filter_end_entry'].get().strip()
         try:
-            regular_hours = totals['total_regular_pay'] / employee_data.hourly_rate if employee_data.hourly_rate else 0
-            overtime_hours = totals['total_overtime_pay'] / (employee_data.hourly_rate * 1.5) if employee_data.hourly_rate else 0
-            summary_text = (
-                f"Total Hours: {totals['total_hours']}\n"
-                f"Regular Hours: {regular_hours:.2f}\n"
-                f"Overtime Hours: {overtime_hours:.2f}\n"
-                f"Gross Pay: €{totals['total_gross']}\n"
-                f"Total Deductions: €{totals['total_deductions']}\n"
-                f"Net Pay: €{totals['total_net']}\n"
-            )
-            tk.messagebox.showinfo("Weekly Summary", summary_text)
-        except ZeroDivisionError:
-            tk.messagebox.showerror("Calculation Error", "Hourly rate cannot be zero when calculating summary.")
+            widgets['data_display'].set_filter(start or None, end or None)
+        except ValueError:
+            tk.messagebox.showerror("Invalid Input", "Filter dates must be in YYYY-MM-DD format.")
+
+    def show_weekly_summary():
+        # Overtime and tax are worked out per week, so summarise the latest week worked
+        weeks = employee_data.weeks()
+        if not weeks:
+            tk.messagebox.showwarning("No Data", "Please add work entries before showing a summary.")
+            return
+        week = weeks[-1]
+        summary_text = (
+            f"Week of {week['week_start']} ({week['week']})\n"
+            f"Total Hours: {week['total_hours']}\n"
+            f"Regular Hours: {week['regular_hours']:.2f}\n"
+            f"Overtime Hours: {week['overtime_hours']:.2f}\n"
+            f"Holiday Hours: {week['total_holiday_hours']:.2f}\n"
+            f"Holiday Pay: {format_currency(week['total_holiday_pay'])}\n"
+            f"Gross Pay: {format_currency(week['total_gross'])}\n"
+            f"Total Deductions: {format_currency(week['total_deductions'])}\n"
+            f"Net Pay: {format_currency(week['total_net'])}\n"
+        )
+        tk.messagebox.showinfo("Weekly Summary", summary_text)
+
+    # Buttons that read or change the entries are disabled while a background task owns them
+    busy_buttons = [widgets[name] for name in (
+        'add_day_button', 'calculate_button', 'save_button', 'load_button', 'clear_button',
+        'summary_button', 'export_button', 'payslips_button', 'filter_button', 'import_button')]
+    current_task = None
+
+    def run_in_background(job, message, on_done, error_title):
+        # The job runs on a worker thread; every callback below runs on the Tk thread via after()
+        nonlocal current_task
+        for button in busy_buttons:
+            button.config(state="disabled")
+        widgets['status_label'].config(text=message)
+        widgets['progress_bar'].config(mode="indeterminate", value=0)
+        widgets['progress_bar'].start()
+        widgets['cancel_button'].config(state="normal")
+
+        def on_progress(done, total):
+            progress_bar = widgets['progress_bar']
+            if total:
+                progress_bar.stop()
+                progress_bar.config(mode="determinate", value=100 * done / total)
+                widgets['status_label'].config(text=f"{message} {done:,}/{total:,}")
+            else:
+                widgets['status_label'].config(text=f"{message} {done:,} rows")
+
+        def on_finished():
+            nonlocal current_task
+            current_task = None
+            widgets['progress_bar'].stop()
+            widgets['progress_bar'].config(mode="determinate", value=0)
+            widgets['status_label'].config(text="")
+            widgets['cancel_button'].config(state="disabled")
+            for button in busy_buttons:
+                button.config(state="normal")
+
+        def done(result):
+            on_finished()
+            on_done(result)
+
+        def failed(error):
+            on_finished()
+            tk.messagebox.showerror(error_title, f"An error occurred: {error}")
+
+        def cancelled():
+            on_finished()
+            tk.messagebox.showinfo("Cancelled", "The operation was cancelled.")
+
+        current_task = BackgroundTask(job).start(root, on_done=done, on_error=failed,
+                                                 on_progress=on_progress, on_cancel=cancelled)
+
+    def cancel_task():
+        if current_task is not None:
+            widgets['status_label'].config(text="Cancelling...")
+            widgets['cancel_button'].config(state="disabled")
+            current_task.cancel()
+
+    def close_window():
+        if current_task is not None and current_task.is_running():
+            tk.messagebox.showwarning("Busy", "Please wait for the current operation to finish or cancel it.")
+            return
+        root.destroy()
+
+    def run_pdf_export(job, success_message):
+        run_in_background(job, "Exporting...", lambda written: tk.messagebox.showinfo("Export Success", success_message),
+                          "Export Failed")
 
     def export_summary_to_pdf():
+        from pdf_export import export_summary
+
         totals = employee_data.calculate_totals()
-        pdf = FPDF()
-        pdf.add_page()
-        pdf.set_font("Helvetica", size=12)  # Replacing "Arial" with "Helvetica"
-
-        pdf.cell(200, 10, text="Ballyroe Pay Calculator - Weekly Summary", new_x=XPos.LMARGIN, new_y=YPos.NEXT,
-                 align="C")
-        pdf.cell(200, 10, text=f"Name: {employee_data.name}", new_x=XPos.LMARGIN, new_y=YPos.NEXT, align="L")
-        pdf.cell(200, 10, text=f"Hourly Rate: EUR{employee_data.hourly_rate}", new_x=XPos.LMARGIN, new_y=YPos.NEXT,
-                 align="L")
-        pdf.cell(200, 10, text=f"Total Hours: {totals['total_hours']}", new_x=XPos.LMARGIN, new_y=YPos.NEXT, align="L")
-        pdf.cell(200, 10, text=f"Gross Pay: EUR{totals['total_gross']}", new_x=XPos.LMARGIN, new_y=YPos.NEXT, align="L")
-        pdf.cell(200, 10, text=f"Total Deductions: EUR{totals['total_deductions']}", new_x=XPos.LMARGIN,
-                 new_y=YPos.NEXT, align="L")
-        pdf.cell(200, 10, text=f"Net Pay: EUR{totals['total_net']}", new_x=XPos.LMARGIN, new_y=YPos.NEXT, align="L")
+        filename = filedialog.asksaveasfilename(defaultextension=".pdf", filetypes=[("PDF files", "*.pdf")])
+        if filename:
+            name, hourly_rate = employee_data.name, employee_data.hourly_rate
+            run_pdf_export(lambda report: export_summary(filename, name, hourly_rate, totals, report),
+                           f"Summary exported to {filename} successfully!")
+
+    def export_weekly_payslips():
+        from pdf_export import export_payslips, weekly_payslips
 
+        if not employee_data.entries:
+            tk.messagebox.showwarning("No Data", "Please add work entries before exporting payslips.")
+            return
+        weeks = {week['week_start']: week for week in employee_data.weeks()}
+        payslips = weekly_payslips(employee_data.name, employee_data.hourly_rate, weeks)
         filename = filedialog.asksaveasfilename(defaultextension=".pdf", filetypes=[("PDF files", "*.pdf")])
         if filename:
-            pdf.output(filename)
-            tk.messagebox.showinfo("Export Success", f"Summary exported to {filename} successfully!")
+            run_pdf_export(lambda report: export_payslips(payslips, filename=filename, report=report),
+                           f"{len(payslips)} weekly payslips exported to {filename} successfully!")
+
+    # Offer the roster in the name prompt; picking someone fills in their current rate
+    widgets['name_entry'].config(values=[employee.name for employee in employee_data.roster])
+    widgets['name_entry'].bind("<<ComboboxSelected>>", fill_employee_rate)
+
+    def import_timesheet_file():
+        from timesheet_import import import_timesheet
+
+        if employee_data.entries.has_pending():
+            tk.messagebox.showwarning("Unsaved Entries", "Please save your entries before importing a timesheet.")
+            return
+        path = filedialog.askopenfilename(filetypes=[("Timesheets", "*.csv *.xlsx"), ("All files", "*.*")])
+        if not path:
+            return
+
+        def job(report):
+            # Reading and validation check for Cancel every few rows, until the single write starts
+            result = import_timesheet(path, employee=employee_data.employee,
+                                      default_rate=employee_data.hourly_rate, report=report)
+            return result, employee_data.read_entries()
+
+        def on_done(outcome):
+            result, loaded = outcome
+            employee_data.set_entries(*loaded)
+            widgets['data_display'].set_entries(employee_data.entries)
+            update_total_labels()
+            message = result.summary()
+            if result.errors:
+                try:
+                    errors_file = result.write_errors(os.path.splitext(path)[0] + "_errors.csv")
+                    message += f"\n\nThe full list of problems was saved to {errors_file}."
+                except OSError as e:
+                    print(f"An error occurred while writing the import errors: {e}")
+                tk.messagebox.showwarning("Import Finished With Errors", message)
+            else:
+                tk.messagebox.showinfo("Import Complete", message)
+
+        run_in_background(job, "Importing...", on_done, "Import Failed")
 
     # Assign button commands
     widgets['start_button'].config(command=start_app)
@@ -161,6 +476,11 @@ def main():
     widgets['load_button'].config(command=load_and_display_data)
     widgets['summary_button'].config(command=show_weekly_summary)
     widgets['export_button'].config(command=export_summary_to_pdf)
+    widgets['payslips_button'].config(command=export_weekly_payslips)
+    widgets['filter_button'].config(command=apply_entries_filter)
+    widgets['import_button'].config(command=import_timesheet_file)
+    widgets['cancel_button'].config(command=cancel_task)
+    root.protocol("WM_DELETE_WINDOW", close_window)
 
     # Show initial prompt frame
     widgets['name_prompt_frame'].pack(fill="x", expand=True)
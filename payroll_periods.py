@@ -0,0 +1,295 @@
+from bisect import bisect_left, bisect_right
+from datetime import date
+
+import utils
+from entry_store import from_ordinal, to_ordinal
+from tax_tables import TAX_YEARS, get_tax_table
+
+WEEKS_PER_TAX_YEAR = 52
+
+# Keys of a totals dict, the shape returned by utils.calculate_weekly_totals
+TOTAL_KEYS = ("total_hours", "regular_hours", "overtime_hours", "total_holiday_hours", "entries",
+              "total_regular_pay", "total_overtime_pay", "total_holiday_pay", "total_gross",
+              "income_tax", "total_net", "total_deductions")
+# The keys of TOTAL_KEYS that a week's entries decide on their own, before tax
+PAY_KEYS = TOTAL_KEYS[:9]
+
+
+def tax_table_for(tax_year):
+    """
+    Returns the TaxTable for a tax year: its published settings for years in
+    tax_tables.TAX_YEARS, otherwise the utils constants.
+    """
+    return get_tax_table(tax_year) if tax_year in TAX_YEARS else utils.current_tax_table()
+
+
+def week_start(day):
+    """
+    Returns the ordinal of the Monday of the week containing day.
+    """
+    ordinal = to_ordinal(day)
+    return ordinal - date.fromordinal(ordinal).weekday()
+
+
+def week_end(day):
+    """
+    Returns the ordinal of the Sunday of the week containing day.
+    """
+    return week_start(day) + 6
+
+
+def tax_year_start(day):
+    """
+    Returns the ordinal of the Monday of the first pay week of the tax year that
+    the week containing day is paid in. Weeks are paid on their Sunday, so that is
+    the week containing the 1st of January.
+    """
+    tax_year = date.fromordinal(week_end(day)).year
+    return week_start(date(tax_year, 1, 1))
+
+
+def ledger_bounds(start=None, end=None):
+    """
+    Widens a reporting range to the rows a ledger needs: from the start of the
+    tax year of start's week, so year-to-date tax is complete, to the Sunday of
+    end's week, so the last week's overtime is complete.
+
+    Returns:
+    - tuple: (first, last) date ordinals, either of them None when open-ended.
+    """
+    return (tax_year_start(start) if start is not None else None,
+            week_end(end) if end is not None else None)
+
+
+def combine_weeks(weeks):
+    """
+    Adds up ledger weeks into one totals dict.
+
+    Parameters:
+    - weeks (iterable of dict): Rows of PayrollLedger.weeks.
+
+    Returns:
+    - dict: The TOTAL_KEYS summed over the weeks; all zero for no weeks.
+    """
+    totals = dict.fromkeys(TOTAL_KEYS, 0)
+    for week in weeks:
+        for key in TOTAL_KEYS:
+            totals[key] += week[key]
+    return totals
+
+
+def _week_pay(entries, holidays):
+    # entries: (ordinal, hours, rate) in date order; the first OVERTIME_THRESHOLD hours are regular
+    regular_hours = overtime_hours = regular_pay = overtime_pay = 0.0
+    holiday_hours = holiday_pay = 0.0
+    remaining = float(utils.OVERTIME_THRESHOLD)
+    for ordinal, hours, rate in entries:
+        if ordinal in holidays:
+            holiday_hours += hours
+            holiday_pay += utils.holiday_premium(hours, rate)
+        regular = min(hours, max(remaining, 0))
+        overtime = hours - regular
+        remaining -= regular
+        regular_hours += regular
+        overtime_hours += overtime
+        regular_pay += regular * rate
+        overtime_pay += overtime * rate * utils.OVERTIME_RATE_MULTIPLIER
+    return {
+        "total_hours": regular_hours + overtime_hours,
+        "regular_hours": regular_hours,
+        "overtime_hours": overtime_hours,
+        "total_regular_pay": regular_pay,
+        "total_overtime_pay": overtime_pay,
+        "total_holiday_hours": holiday_hours,
+        "entries": len(entries),
+        "total_holiday_pay": holiday_pay,
+        "total_gross": regular_pay + overtime_pay + holiday_pay,
+    }
+
+
+def _tax_week(monday, pay, ytd):
+    # Turns one week's pay into its ledger row, carrying the year-to-date figures in ytd.
+    # The week is paid on its Sunday; that date decides the tax year and PAYE week number
+    pay_date = date.fromordinal(monday + 6)
+    tax_year = pay_date.year
+    period = min((pay_date.timetuple().tm_yday - 1) // 7 + 1, WEEKS_PER_TAX_YEAR)
+    if ytd["tax_year"] != tax_year:
+        ytd.update(tax_year=tax_year, gross=0, tax=0)
+
+    # Cumulative basis, through the memoized utils.calculate_cumulative_tax.
+    # Years without a published table use the utils constants, as in tax_table_for
+    gross = pay["total_gross"]
+    ytd_gross = ytd["gross"] + gross
+    ytd_tax = utils.calculate_cumulative_tax(ytd_gross, period, WEEKS_PER_TAX_YEAR,
+                                             tax_year if tax_year in TAX_YEARS else None)
+    income_tax = ytd_tax - ytd["tax"]
+    ytd.update(gross=ytd_gross, tax=ytd_tax)
+
+    iso_year, iso_week, _ = date.fromordinal(monday).isocalendar()
+    return {
+        "week": f"{iso_year}-W{iso_week:02d}",
+        "week_start": from_ordinal(monday),
+        "tax_year": tax_year,
+        "period": period,
+        **pay,
+        "income_tax": income_tax,
+        "total_net": gross - income_tax,
+        "total_deductions": income_tax,
+        "ytd_gross": ytd_gross,
+        "ytd_tax": ytd_tax,
+    }
+
+
+class PayrollLedger:
+    """
+    Week-by-week payroll built in a single pass over date-ordered entries.
+    Overtime is applied per ISO week and tax per weekly pay period on the
+    cumulative year-to-date basis. Queries are bisect lookups on the
+    precomputed weeks, so nothing is regrouped after the ledger is built.
+
+    This is the one place pay is worked out; every total, summary, payslip and
+    report reads its weeks. For correct year-to-date tax the rows must start at
+    the beginning of the tax year (see ledger_bounds).
+    """
+
+    def __init__(self, rows, holidays=frozenset(), ordered=False, keep_entries=False):
+        """
+        Parameters:
+        - rows (iterable): (date ordinal, hours, rate) tuples, e.g. EntryStore.rows()
+          or data_handler.iter_csv_file().
+        - holidays (HolidayCalendar, optional): Hours on these dates earn holiday pay.
+        - ordered (bool): True if rows already come in date order, e.g. from
+          data_handler.iter_csv_by_date(). They are then streamed, each week closed
+          as soon as the next one starts, so only one week's rows are held at a time.
+          Otherwise they are sorted first. Out-of-order rows raise ValueError.
+        - keep_entries (bool): Keep each week's rows so the ledger can be updated
+          in place with extend().
+        """
+        self.weeks = []
+        self._starts = []
+        self.holidays = holidays
+        self._entries = {} if keep_entries else None
+        ytd = {"tax_year": None, "gross": 0, "tax": 0}
+        current_monday, current = None, []
+        previous = None
+        for ordinal, hours, rate in rows if ordered else sorted(rows, key=lambda row: row[0]):
+            if previous is not None and ordinal < previous:
+                raise ValueError("Ledger rows are not in date order.")
+            previous = ordinal
+            monday = ordinal - date.fromordinal(ordinal).weekday()
+            if monday != current_monday:
+                if current:
+                    self._close(current_monday, current, ytd, holidays)
+                current_monday, current = monday, []
+            current.append((ordinal, hours, rate))
+        if current:
+            self._close(current_monday, current, ytd, holidays)
+
+    def _close(self, monday, entries, ytd, holidays):
+        self.weeks.append(_tax_week(monday, _week_pay(entries, holidays), ytd))
+        self._starts.append(monday)
+        if self._entries is not None:
+            self._entries[monday] = entries
+
+    def extend(self, rows):
+        """
+        Adds rows to a ledger built with keep_entries=True without rebuilding it.
+        Only the weeks the rows fall in are re-closed; tax is then re-run from the
+        first of them to the end of the last one's tax year, since a week's pay
+        changes the year-to-date tax of every later week of its year. Rows on a
+        date already in the ledger count after the ones there.
+
+        Parameters:
+        - rows (iterable): (date ordinal, hours, rate) tuples in any order.
+        """
+        touched = set()
+        for ordinal, hours, rate in rows:
+            monday = ordinal - date.fromordinal(ordinal).weekday()
+            self._entries.setdefault(monday, []).append((ordinal, hours, rate))
+            touched.add(monday)
+        if not touched:
+            return
+        for monday in touched:
+            entries = self._entries[monday]
+            entries.sort(key=lambda row: row[0])
+            index = bisect_left(self._starts, monday)
+            if index == len(self._starts) or self._starts[index] != monday:
+                self._starts.insert(index, monday)
+                self.weeks.insert(index, None)
+            # Re-taxed below; until then the slot holds just the week's pay
+            self.weeks[index] = _week_pay(entries, self.holidays)
+
+        first = bisect_left(self._starts, min(touched))
+        last_year = date.fromordinal(max(touched) + 6).year
+        previous = self.weeks[first - 1] if first else None
+        if previous is not None:
+            ytd = {"tax_year": previous["tax_year"], "gross": previous["ytd_gross"], "tax": previous["ytd_tax"]}
+        else:
+            ytd = {"tax_year": None, "gross": 0, "tax": 0}
+        for index in range(first, len(self.weeks)):
+            monday = self._starts[index]
+            if date.fromordinal(monday + 6).year > last_year:
+                break
+            pay = {key: self.weeks[index][key] for key in PAY_KEYS}
+            self.weeks[index] = _tax_week(monday, pay, ytd)
+
+    @classmethod
+    def from_week_pay(cls, weeks):
+        """
+        Builds a ledger from pay already worked out per week, e.g. aggregated in SQL,
+        adding only the year-to-date tax.
+
+        Parameters:
+        - weeks (iterable): (Monday ordinal, pay) pairs in date order, pay holding the
+          hours, entries and pay keys of TOTAL_KEYS.
+        """
+        ledger = cls(())
+        ytd = {"tax_year": None, "gross": 0, "tax": 0}
+        for monday, pay in weeks:
+            ledger.weeks.append(_tax_week(monday, pay, ytd))
+            ledger._starts.append(monday)
+        return ledger
+
+    def week_of(self, day):
+        """
+        Returns the ledger row for the week containing day, or None.
+        """
+        ordinal = to_ordinal(day)
+        index = bisect_right(self._starts, ordinal) - 1
+        if index >= 0 and ordinal - self._starts[index] < 7:
+            return self.weeks[index]
+        return None
+
+    def between(self, start=None, end=None):
+        """
+        Returns the weeks that overlap [start, end], in date order.
+        Weeks are paid whole, so a range starting mid-week includes that week.
+        """
+        low = bisect_left(self._starts, week_start(start)) if start is not None else 0
+        high = bisect_right(self._starts, to_ordinal(end)) if end is not None else len(self.weeks)
+        return self.weeks[low:high]
+
+    def weekly(self, start=None, end=None):
+        """
+        Returns the weeks that overlap [start, end] keyed by their Monday ('YYYY-MM-DD').
+        """
+        return {week["week_start"]: week for week in self.between(start, end)}
+
+    def totals(self, start=None, end=None):
+        """
+        Returns the weeks that overlap [start, end] added up, in the shape of
+        utils.calculate_weekly_totals.
+        """
+        return combine_weeks(self.between(start, end))
+
+    def tax_years(self, start=None, end=None):
+        """
+        Rolls the weeks that overlap [start, end] up per tax year.
+
+        Returns:
+        - dict: Maps each tax year to its summed hours, pay, tax and net, in year order.
+        """
+        years = {}
+        for week in self.between(start, end):
+            years.setdefault(week["tax_year"], []).append(week)
+        return {year: combine_weeks(weeks) for year, weeks in years.items()}
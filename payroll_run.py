@@ -0,0 +1,81 @@
+import glob
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from data_handler import iter_csv_by_date
+from holiday_calendar import default_calendar
+from instrumentation import instrumented
+from payroll_periods import PayrollLedger, combine_weeks, ledger_bounds
+
+
+def employee_files(source):
+    """
+    Resolves the per-employee hour files for a payroll run.
+
+    Parameters:
+    - source (str or iterable of str): A directory of '<employee>.csv' files, or explicit file paths.
+
+    Returns:
+    - dict: Maps employee id (the file name without extension) to its path, sorted by id.
+      A directory that does not exist, e.g. employees/ before the hours are split, has no files.
+    """
+    sources = [source] if isinstance(source, str) else list(source)
+    paths = []
+    for path in sources:
+        if os.path.isdir(path):
+            paths.extend(glob.glob(os.path.join(path, "*.csv")))
+        elif os.path.exists(path) or os.path.splitext(path)[1]:
+            # Missing files are kept, so the run reports them instead of skipping an employee
+            paths.append(path)
+    files = {os.path.splitext(os.path.basename(path))[0]: path for path in paths}
+    return dict(sorted(files.items()))
+
+
+def summarize_employee(path, start=None, end=None):
+    """
+    Computes one employee's payroll ledger weeks and overall totals from their hours file,
+    including holiday pay for the default holiday calendar. The file is read from the
+    start of the tax year so the year-to-date tax of the weeks in [start, end] is complete,
+    in date order through its date index, so one week of rows is held at a time.
+    This is the unit of work sent to each worker process.
+
+    Returns:
+    - dict: {'weeks': week Monday -> ledger row, 'total': totals over all weeks}.
+    """
+    ledger = PayrollLedger(iter_csv_by_date(path, *ledger_bounds(start, end)), default_calendar(), ordered=True)
+    weeks = ledger.weekly(start, end)
+    return {"weeks": weeks, "total": combine_weeks(weeks.values())}
+
+
+def _summarize_job(job):
+    path, start, end = job
+    return summarize_employee(path, start, end)
+
+
+@instrumented("payroll_run", rows=len)
+def run_payroll(source, workers=None, chunksize=1, start=None, end=None):
+    """
+    Runs payroll for many employees, one process per core.
+
+    Parameters:
+    - source (str or iterable of str): A directory of '<employee>.csv' files, or explicit file paths.
+    - workers (int, optional): Number of worker processes. Defaults to the CPU count;
+      1 runs serially in the current process.
+    - chunksize (int): Number of employees handed to a worker at a time.
+    - start (str or date, optional): First date to include.
+    - end (str or date, optional): Last date to include.
+
+    Returns:
+    - dict: Maps employee id to summarize_employee results, in sorted employee order.
+    """
+    files = employee_files(source)
+    jobs = [(path, start, end) for path in files.values()]
+    workers = workers or os.cpu_count() or 1
+
+    if workers == 1 or len(jobs) <= 1:
+        results = map(_summarize_job, jobs)
+    else:
+        with ProcessPoolExecutor(max_workers=min(workers, len(jobs))) as executor:
+            # map() yields in submission order, so the merge is deterministic
+            results = list(executor.map(_summarize_job, jobs, chunksize=max(chunksize, 1)))
+    return dict(zip(files, results))
@@ -0,0 +1,128 @@
+import os
+
+from fpdf import FPDF, XPos, YPos
+
+from instrumentation import instrumented
+
+SUMMARY_TITLE = "Ballyroe Pay Calculator - Weekly Summary"
+
+
+def _new_document():
+    # Shared page and font setup, applied once per document rather than per page
+    pdf = FPDF()
+    pdf.set_font("Helvetica", size=12)  # Replacing "Arial" with "Helvetica"
+    return pdf
+
+
+def _line(pdf, text, align="L"):
+    pdf.cell(200, 10, text=text, new_x=XPos.LMARGIN, new_y=YPos.NEXT, align=align)
+
+
+def render_payslip(pdf, payslip):
+    """
+    Adds one summary page to an open document.
+
+    Parameters:
+    - pdf (FPDF): The document to add the page to.
+    - payslip (dict): 'title', 'name', 'totals' and optionally 'hourly_rate'.
+    """
+    totals = payslip["totals"]
+    pdf.add_page()
+    _line(pdf, payslip.get("title", SUMMARY_TITLE), align="C")
+    _line(pdf, f"Name: {payslip['name']}")
+    if payslip.get("hourly_rate") is not None:
+        _line(pdf, f"Hourly Rate: EUR{payslip['hourly_rate']}")
+    _line(pdf, f"Total Hours: {totals['total_hours']}")
+    if totals.get("total_holiday_hours"):
+        _line(pdf, f"Holiday Hours: {totals['total_holiday_hours']}")
+        _line(pdf, f"Holiday Pay: EUR{totals['total_holiday_pay']}")
+    _line(pdf, f"Gross Pay: EUR{totals['total_gross']}")
+    _line(pdf, f"Total Deductions: EUR{totals['total_deductions']}")
+    _line(pdf, f"Net Pay: EUR{totals['total_net']}")
+
+
+def export_summary(filename, name, hourly_rate, totals, report=None):
+    """
+    Writes a single-page summary PDF.
+    Safe to run on a worker thread; report(done, total) is called when finished.
+
+    Returns:
+    - str: The file written.
+    """
+    return export_payslips([{"name": name, "hourly_rate": hourly_rate, "totals": totals}],
+                           filename=filename, report=report)[0]
+
+
+@instrumented("export", rows=len)
+def export_payslips(payslips, filename=None, directory=None, report=None):
+    """
+    Renders many payslips either into one multi-page PDF or a folder of PDFs.
+
+    Parameters:
+    - payslips (list of dict): Payslips as accepted by render_payslip; in folder
+      mode each also needs a 'slug' used as its file name.
+    - filename (str, optional): Write every payslip as a page of this PDF.
+    - directory (str, optional): Write one '<slug>.pdf' per payslip into this folder.
+    - report (callable, optional): Called as report(done, total) after each payslip.
+    Folders that do not exist yet are created.
+
+    Returns:
+    - list of str: The files written.
+
+    Raises:
+    - ValueError: Unless exactly one of filename and directory is given.
+    """
+    if (filename is None) == (directory is None):
+        raise ValueError("Give either a PDF file name or a folder to export the payslips to.")
+    if not (filename or directory):
+        raise ValueError("The export file name or folder is empty.")
+    total = len(payslips)
+    if directory is not None:
+        os.makedirs(directory, exist_ok=True)
+        written = []
+        for done, payslip in enumerate(payslips, start=1):
+            pdf = _new_document()
+            render_payslip(pdf, payslip)
+            path = os.path.join(directory, f"{payslip['slug']}.pdf")
+            pdf.output(path)
+            written.append(path)
+            if report:
+                report(done, total)
+        return written
+
+    pdf = _new_document()
+    for done, payslip in enumerate(payslips, start=1):
+        render_payslip(pdf, payslip)
+        if report:
+            report(done, total)
+    if os.path.dirname(filename):
+        os.makedirs(os.path.dirname(filename), exist_ok=True)
+    pdf.output(filename)
+    return [filename]
+
+
+def weekly_payslips(name, hourly_rate, weeks):
+    """
+    Builds one payslip per week from a week Monday -> totals mapping,
+    as returned by data_handler.weekly_summary.
+    """
+    return [
+        {"title": f"Ballyroe Pay Calculator - Week of {monday}", "slug": f"payslip_{monday}",
+         "name": name, "hourly_rate": hourly_rate, "totals": totals}
+        for monday, totals in weeks.items()
+    ]
+
+
+def employee_payslips(results, roster=None):
+    """
+    Builds one payslip per employee from payroll_run.run_payroll results.
+    With a roster, payslips show each employee's name and current rate instead of their id.
+    """
+    payslips = []
+    for employee_id, result in results.items():
+        employee = roster.get(employee_id) if roster is not None else None
+        payslips.append({"title": SUMMARY_TITLE, "slug": f"payslip_{employee_id}",
+                         "name": employee.name if employee else employee_id,
+                         "hourly_rate": employee.current_rate if employee else None,
+                         "totals": result["total"]})
+    return payslips
@@ -0,0 +1,169 @@
+import json
+import os
+import re
+import tempfile
+from bisect import bisect_right, insort
+from datetime import date
+
+from entry_store import from_ordinal, to_ordinal
+
+ROSTER_FILE = "roster.json"
+
+
+def employee_id(name):
+    """
+    Turns an employee name into the id used for their storage partition,
+    e.g. 'Nikita Talysman' -> 'nikita_talysman'.
+
+    Raises:
+    - ValueError: If the name has no letters or digits.
+    """
+    slug = re.sub(r"[^a-z0-9]+", "_", name.strip().lower()).strip("_")
+    if not slug:
+        raise ValueError(f"Cannot derive an employee id from {name!r}.")
+    return slug
+
+
+class Employee:
+    """
+    One employee and their hourly rate history.
+    Rates are kept as (effective-from ordinal, rate) pairs in date order,
+    so the rate on any day is a binary search.
+    """
+
+    def __init__(self, name, rates=(), id=None):
+        """
+        Parameters:
+        - name (str): Display name.
+        - rates (iterable): (effective-from date, rate) pairs in any order.
+        - id (str, optional): Storage id. Defaults to employee_id(name).
+        """
+        self.id = id or employee_id(name)
+        self.name = name
+        self.rates = sorted((to_ordinal(day), float(rate)) for day, rate in rates)
+
+    def set_rate(self, rate, effective_from=None):
+        """
+        Records a rate change, replacing any change already recorded for that day.
+
+        Parameters:
+        - rate (float): The new hourly rate.
+        - effective_from (str or date, optional): First day paid at this rate. Defaults to today.
+        """
+        ordinal = to_ordinal(effective_from if effective_from is not None else date.today())
+        self.rates = [change for change in self.rates if change[0] != ordinal]
+        insort(self.rates, (ordinal, float(rate)))
+
+    def rate_on(self, day):
+        """
+        Returns the hourly rate in effect on day, or None before the first recorded rate.
+        """
+        index = bisect_right(self.rates, (to_ordinal(day), float("inf"))) - 1
+        return self.rates[index][1] if index >= 0 else None
+
+    @property
+    def current_rate(self):
+        return self.rates[-1][1] if self.rates else None
+
+    def as_dict(self):
+        return {"id": self.id, "name": self.name,
+                "rates": [[from_ordinal(ordinal), rate] for ordinal, rate in self.rates]}
+
+    def __repr__(self):
+        return f"Employee(id={self.id!r}, name={self.name!r}, current_rate={self.current_rate!r})"
+
+
+class Roster:
+    """
+    All employees, keyed by id.
+    """
+
+    def __init__(self, employees=()):
+        self.employees = {employee.id: employee for employee in employees}
+
+    def __len__(self):
+        return len(self.employees)
+
+    def __iter__(self):
+        return iter(sorted(self.employees.values(), key=lambda employee: employee.name.lower()))
+
+    def __contains__(self, key):
+        return self.get(key) is not None
+
+    def get(self, key):
+        """
+        Looks an employee up by id or by name.
+        """
+        employee = self.employees.get(key)
+        if employee is None:
+            try:
+                employee = self.employees.get(employee_id(key))
+            except ValueError:
+                return None
+        return employee
+
+    def add(self, name, rate=None, effective_from=None):
+        """
+        Adds an employee, or returns the existing one with the same id.
+        A rate that differs from their current one is recorded as a rate change.
+
+        Parameters:
+        - name (str): Name or id of the employee.
+        - rate (float, optional): Their hourly rate.
+        - effective_from (str or date, optional): First day paid at rate. Defaults to today
+          for a rate change; an employee's first rate covers all their hours unless given.
+
+        Returns:
+        - Employee: The added or existing employee.
+        """
+        employee = self.get(name)
+        if employee is None:
+            employee = Employee(name)
+            self.employees[employee.id] = employee
+        if rate is not None and employee.current_rate != float(rate):
+            if effective_from is None and not employee.rates:
+                effective_from = date.min
+            employee.set_rate(rate, effective_from)
+        return employee
+
+    def remove(self, key):
+        employee = self.get(key)
+        if employee is not None:
+            del self.employees[employee.id]
+        return employee
+
+    def save(self, path=ROSTER_FILE):
+        """
+        Writes the roster as JSON, atomically.
+        """
+        data = {"employees": [employee.as_dict() for employee in self]}
+        directory = os.path.dirname(os.path.abspath(path))
+        fd, temp_path = tempfile.mkstemp(suffix=".tmp", dir=directory)
+        try:
+            with os.fdopen(fd, mode='w') as file:
+                json.dump(data, file, indent=2)
+            os.replace(temp_path, path)
+        except OSError:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+
+
+def load_roster(path=ROSTER_FILE):
+    """
+    Reads the roster file. A missing or unreadable file gives an empty roster.
+
+    Returns:
+    - Roster: The employees and their rate histories.
+    """
+    try:
+        with open(path, mode='r') as file:
+            data = json.load(file)
+        employees = [Employee(item["name"], item.get("rates", ()), item.get("id"))
+                     for item in data.get("employees", [])]
+    except FileNotFoundError:
+        return Roster()
+    except (ValueError, KeyError, TypeError):
+        print("Roster format error: starting with an empty roster.")
+        return Roster()
+    return Roster(employees)
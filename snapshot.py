@@ -0,0 +1,212 @@
+import csv
+import json
+import os
+import tempfile
+from array import array
+
+import numpy as np
+
+from entry_store import to_ordinal
+
+SNAPSHOT_SUFFIX = ".snap"  # NumPy .npy records, memory-mapped on open
+META_SUFFIX = ".snap.json"  # Employee names and the CSV size/mtime the snapshot describes
+
+# Fixed-width little-endian records, 24 bytes each
+SNAPSHOT_DTYPE = np.dtype([("date", "<i4"), ("employee", "<i4"), ("hours", "<f8"), ("rate", "<f8")])
+NO_EMPLOYEE = -1  # Employee id for rows without an 'Employee' column
+
+
+class Snapshot:
+    """
+    Read-only, memory-mapped view of a binary snapshot of the hours CSV.
+    The columns are views into the mapped file, so reading them neither
+    parses text nor copies data; pages are loaded by the OS on first touch.
+    """
+
+    def __init__(self, records, employees, is_sorted):
+        self.records = records
+        self.employees = employees
+        self.is_sorted = is_sorted
+
+    def __len__(self):
+        return len(self.records)
+
+    @property
+    def dates(self):
+        return self.records["date"]
+
+    @property
+    def hours(self):
+        return self.records["hours"]
+
+    @property
+    def rates(self):
+        return self.records["rate"]
+
+    @property
+    def employee_ids(self):
+        return self.records["employee"]
+
+    def employee_id(self, name):
+        """
+        Returns the id stored for an employee name, or None if the snapshot has no such employee.
+        """
+        try:
+            return self.employees.index(name)
+        except ValueError:
+            return None
+
+    def select(self, start=None, end=None, min_rate=None, max_rate=None, employee=None):
+        """
+        Returns the records matching the same filters as data_handler.iter_data.
+        A date range over a date-sorted file is a zero-copy slice found by binary search;
+        other filters fall back to a boolean mask, which copies the matching rows.
+
+        Returns:
+        - ndarray: Records with 'date', 'employee', 'hours' and 'rate' fields.
+        """
+        records = self.records
+        if start is not None or end is not None:
+            dates = records["date"]
+            if self.is_sorted:
+                low = np.searchsorted(dates, to_ordinal(start), side="left") if start is not None else 0
+                high = np.searchsorted(dates, to_ordinal(end), side="right") if end is not None else len(dates)
+                records = records[low:high]
+            else:
+                mask = np.ones(len(records), dtype=bool)
+                if start is not None:
+                    mask &= dates >= to_ordinal(start)
+                if end is not None:
+                    mask &= dates <= to_ordinal(end)
+                records = records[mask]
+        if min_rate is not None:
+            records = records[records["rate"] >= min_rate]
+        if max_rate is not None:
+            records = records[records["rate"] <= max_rate]
+        if employee is not None:
+            employee_id = self.employee_id(employee)
+            if employee_id is None:
+                return records[:0]
+            records = records[records["employee"] == employee_id]
+        return records
+
+
+def snapshot_paths(data_file):
+    return data_file + SNAPSHOT_SUFFIX, data_file + META_SUFFIX
+
+
+def _read_meta(meta_file):
+    try:
+        with open(meta_file, mode='r') as file:
+            return json.load(file)
+    except (FileNotFoundError, ValueError):
+        return None
+
+
+def is_current(data_file):
+    """
+    Returns True if the snapshot exists and still describes the CSV file on disk.
+    """
+    snapshot_file, meta_file = snapshot_paths(data_file)
+    meta = _read_meta(meta_file)
+    if meta is None or not os.path.exists(snapshot_file):
+        return False
+    try:
+        stat = os.stat(data_file)
+    except FileNotFoundError:
+        return False
+    return stat.st_size == meta.get("size") and stat.st_mtime_ns == meta.get("mtime_ns")
+
+
+def _parse_csv(data_file):
+    # Parses the CSV once into typed columns; employee names are numbered in order of appearance
+    dates, employee_ids, hours, rates = array("i"), array("i"), array("d"), array("d")
+    employees = {}
+    with open(data_file, mode='r', newline='') as file:
+        reader = csv.reader(file)
+        header = next(reader, None)
+        if header is not None:
+            date_col = header.index("Date")
+            hours_col = header.index("Hours Worked")
+            rate_col = header.index("Hourly Rate")
+            employee_col = header.index("Employee") if "Employee" in header else None
+            for row in reader:
+                if not row:
+                    continue
+                try:
+                    ordinal = to_ordinal(row[date_col])
+                    hour = float(row[hours_col])
+                    rate = float(row[rate_col])
+                    employee_id = (employees.setdefault(row[employee_col], len(employees))
+                                   if employee_col is not None else NO_EMPLOYEE)
+                except (ValueError, IndexError):
+                    print("Data format error: skipping an entry due to invalid values.")
+                    continue
+                dates.append(ordinal)
+                employee_ids.append(employee_id)
+                hours.append(hour)
+                rates.append(rate)
+    return dates, employee_ids, hours, rates, list(employees)
+
+
+def write_snapshot(data_file):
+    """
+    Builds the snapshot of an hours CSV next to it, replacing any older one atomically.
+
+    Parameters:
+    - data_file (str): The hours CSV, in the DATA_FILE layout.
+
+    Returns:
+    - int: Number of records written.
+    """
+    snapshot_file, meta_file = snapshot_paths(data_file)
+    stat = os.stat(data_file)  # Taken before parsing so a concurrent append makes the snapshot stale
+    dates, employee_ids, hours, rates, employees = _parse_csv(data_file)
+
+    directory = os.path.dirname(os.path.abspath(snapshot_file))
+    fd, temp_path = tempfile.mkstemp(suffix=".tmp", dir=directory)
+    os.close(fd)
+    try:
+        records = np.lib.format.open_memmap(temp_path, mode="w+", dtype=SNAPSHOT_DTYPE, shape=(len(dates),))
+        if len(dates):
+            records["date"] = np.frombuffer(dates, dtype=np.int32)
+            records["employee"] = np.frombuffer(employee_ids, dtype=np.int32)
+            records["hours"] = np.frombuffer(hours, dtype=np.float64)
+            records["rate"] = np.frombuffer(rates, dtype=np.float64)
+            records.flush()
+        is_sorted = bool(len(dates) < 2 or np.all(np.diff(records["date"]) >= 0))
+        del records
+        os.replace(temp_path, snapshot_file)
+    except OSError:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+
+    meta = {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns, "rows": len(dates),
+            "sorted": is_sorted, "employees": employees}
+    fd, temp_path = tempfile.mkstemp(suffix=".tmp", dir=directory)
+    try:
+        with os.fdopen(fd, mode='w') as file:
+            json.dump(meta, file)
+        os.replace(temp_path, meta_file)
+    except OSError:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+    return len(dates)
+
+
+def open_snapshot(data_file):
+    """
+    Memory-maps the snapshot of an hours CSV, regenerating it first if it is
+    missing or the CSV changed since it was written.
+
+    Returns:
+    - Snapshot: The mapped records. File errors for the CSV propagate to the caller.
+    """
+    if not is_current(data_file):
+        write_snapshot(data_file)
+    snapshot_file, meta_file = snapshot_paths(data_file)
+    meta = _read_meta(meta_file)
+    records = np.load(snapshot_file, mmap_mode="r")
+    return Snapshot(records, meta["employees"], meta["sorted"])
@@ -0,0 +1,183 @@
+import sqlite3
+from contextlib import closing
+
+from entry_store import from_ordinal, to_ordinal
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    id INTEGER PRIMARY KEY,
+    employee TEXT NOT NULL DEFAULT '',
+    date TEXT NOT NULL,
+    hours REAL NOT NULL,
+    rate REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_entries_date ON entries (date);
+CREATE INDEX IF NOT EXISTS idx_entries_employee_date ON entries (employee, date);
+"""
+
+# Several shifts on one date are separate rows, exactly as in the CSV file
+INSERT = "INSERT INTO entries (employee, date, hours, rate) VALUES (?, ?, ?, ?)"
+
+# Databases created before rows had their own id were keyed on (employee, date)
+UPGRADE = """
+ALTER TABLE entries RENAME TO entries_keyed;
+DROP INDEX IF EXISTS idx_entries_date;
+{schema}
+INSERT INTO entries (employee, date, hours, rate)
+    SELECT employee, date, hours, rate FROM entries_keyed ORDER BY rowid;
+DROP TABLE entries_keyed;
+"""
+
+
+def connect(db_file):
+    """
+    Opens a connection to the hours database in WAL mode, creating the schema if needed.
+
+    Parameters:
+    - db_file (str): Path to the SQLite database file.
+
+    Returns:
+    - sqlite3.Connection: An open connection. The caller is responsible for closing it.
+    """
+    connection = sqlite3.connect(db_file)
+    connection.execute("PRAGMA journal_mode=WAL")
+    connection.execute("PRAGMA synchronous=NORMAL")
+    columns = [row[1] for row in connection.execute("PRAGMA table_info(entries)")]
+    if columns and "id" not in columns:
+        connection.executescript(f"BEGIN;{UPGRADE.format(schema=SCHEMA)}COMMIT;")
+    else:
+        connection.executescript(SCHEMA)
+    return connection
+
+
+def _iso(value):
+    return from_ordinal(to_ordinal(value))
+
+
+def insert_rows(db_file, rows):
+    """
+    Inserts (employee, date, hours, rate) tuples in one transaction with executemany.
+    Every tuple becomes its own row, so two shifts on one date are both kept.
+
+    Returns:
+    - int: Number of rows inserted.
+    """
+    with closing(connect(db_file)) as connection:
+        with connection:
+            cursor = connection.executemany(INSERT, rows)
+        return cursor.rowcount
+
+
+def save_entries(db_file, entries, employee=""):
+    """
+    Saves entries with 'date', 'hours' and 'rate' keys for one employee.
+
+    Returns:
+    - int: Number of rows inserted.
+    """
+    rows = ((employee, _iso(entry["date"]), float(entry["hours"]), float(entry["rate"])) for entry in entries)
+    return insert_rows(db_file, rows)
+
+
+def _where(start, end, min_rate, max_rate, employee):
+    clauses, params = [], []
+    if start is not None:
+        clauses.append("date >= ?")
+        params.append(_iso(start))
+    if end is not None:
+        clauses.append("date <= ?")
+        params.append(_iso(end))
+    if min_rate is not None:
+        clauses.append("rate >= ?")
+        params.append(min_rate)
+    if max_rate is not None:
+        clauses.append("rate <= ?")
+        params.append(max_rate)
+    if employee is not None:
+        clauses.append("employee = ?")
+        params.append(employee)
+    where = f" WHERE {' AND '.join(clauses)}" if clauses else ""
+    return where, params
+
+
+def iter_rows(db_file, start=None, end=None, min_rate=None, max_rate=None, employee=None):
+    """
+    Yields (date, hours, rate) tuples in date order, filtered in SQL.
+    """
+    where, params = _where(start, end, min_rate, max_rate, employee)
+    with closing(connect(db_file)) as connection:
+        yield from connection.execute(
+            f"SELECT date, hours, rate FROM entries{where} ORDER BY date, id", params
+        )
+
+
+# One row per pay week (Monday), aggregated in SQL. A running total over each week in
+# date order splits every entry into its regular hours, the part below the overtime
+# threshold, and the rest, exactly as payroll_periods does it row by row.
+WEEKLY_PAY = """
+SELECT week, SUM(hours), SUM(regular), SUM(holiday * hours), COUNT(*),
+       SUM(regular * rate), SUM((hours - regular) * rate), SUM(holiday * hours * rate)
+FROM (
+    SELECT week, hours, rate, holiday,
+           MIN(hours, MAX(? - (SUM(hours) OVER (PARTITION BY week ORDER BY date, id ROWS UNBOUNDED PRECEDING)
+                               - hours), 0)) AS regular
+    FROM (SELECT date(date, 'weekday 0', '-6 days') AS week, date, id, hours, rate, {holiday} AS holiday
+          FROM entries{where})
+)
+GROUP BY week ORDER BY week
+"""
+
+
+def weekly_pay(db_file, start=None, end=None, min_rate=None, max_rate=None, employee=None, holidays=(),
+               overtime_threshold=40):
+    """
+    Aggregates the entries per pay week in SQL, so only one row per week reaches Python.
+    Needs window functions (SQLite 3.25 or later).
+
+    Parameters:
+    - holidays (iterable): Dates whose hours are holiday hours; only those within
+      [start, end] need to be passed.
+    - overtime_threshold (float): Regular hours per week before overtime.
+
+    Yields:
+    - tuple: (Monday 'YYYY-MM-DD', hours, regular hours, holiday hours, entries,
+      regular pay, overtime hours x rate, holiday hours x rate), in date order.
+    """
+    where, params = _where(start, end, min_rate, max_rate, employee)
+    holidays = [_iso(day) for day in holidays]
+    holiday = f"(date IN ({', '.join('?' * len(holidays))}))" if holidays else "0"
+    with closing(connect(db_file)) as connection:
+        yield from connection.execute(WEEKLY_PAY.format(holiday=holiday, where=where),
+                                      [overtime_threshold] + holidays + params)
+
+
+def count_rows(db_file, employee=None):
+    where, params = _where(None, None, None, None, employee)
+    with closing(connect(db_file)) as connection:
+        return connection.execute(f"SELECT COUNT(*) FROM entries{where}", params).fetchone()[0]
+
+
+def employees(db_file):
+    """
+    Returns the ids of the employees with rows in the database, sorted.
+    """
+    with closing(connect(db_file)) as connection:
+        return [row[0] for row in connection.execute("SELECT DISTINCT employee FROM entries ORDER BY employee")]
+
+
+def remove_duplicates(db_file):
+    """
+    Deletes rows that repeat an earlier row's employee, date, hours and rate,
+    keeping the first of each.
+
+    Returns:
+    - tuple: (rows kept, duplicate rows removed).
+    """
+    with closing(connect(db_file)) as connection:
+        with connection:
+            removed = connection.execute(
+                "DELETE FROM entries WHERE id NOT IN "
+                "(SELECT MIN(id) FROM entries GROUP BY employee, date, hours, rate)"
+            ).rowcount
+        kept = connection.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+    return kept, removed
@@ -0,0 +1,123 @@
+from bisect import bisect_right
+from functools import lru_cache
+
+# Irish income tax and USC settings per tax year (single person, PAYE employee).
+# The reduced USC bands apply to medical card holders and people over 70
+# earning up to the reduced-rate income limit.
+TAX_YEARS = {
+    2024: {
+        "standard_rate_limit": 42000,
+        "standard_rate": 0.20,
+        "higher_rate": 0.40,
+        "personal_tax_credit": 1875,
+        "employee_tax_credit": 1875,
+        "usc_bands": ((12012, 0.005), (25760, 0.02), (70044, 0.04), (float('inf'), 0.08)),
+        "reduced_usc_bands": ((12012, 0.005), (float('inf'), 0.02)),
+    },
+    2025: {
+        "standard_rate_limit": 44000,
+        "standard_rate": 0.20,
+        "higher_rate": 0.40,
+        "personal_tax_credit": 2000,
+        "employee_tax_credit": 2000,
+        "usc_bands": ((12012, 0.005), (27382, 0.02), (70044, 0.03), (float('inf'), 0.08)),
+        "reduced_usc_bands": ((12012, 0.005), (float('inf'), 0.02)),
+    },
+}
+
+
+def _rate_at(bands, amount):
+    for limit, rate in bands:
+        if amount < limit:
+            return rate
+    return bands[-1][1]
+
+
+class TaxTable:
+    """
+    Income tax and USC merged into one sorted piecewise-linear schedule.
+    Each band edge stores the cumulative tax due up to that edge and the
+    combined marginal rate above it, so the tax on any gross amount is a
+    single bisect plus one multiply-add.
+    """
+    __slots__ = ("edges", "cumulative", "marginal", "credits", "_arrays")
+
+    def __init__(self, edges, cumulative, marginal, credits):
+        self.edges = edges
+        self.cumulative = cumulative
+        self.marginal = marginal
+        self.credits = credits
+        self._arrays = None
+
+    def tax(self, gross_pay):
+        """
+        Returns the total tax on a gross amount after credits.
+        """
+        index = max(bisect_right(self.edges, gross_pay) - 1, 0)
+        gross_tax = self.cumulative[index] + (gross_pay - self.edges[index]) * self.marginal[index]
+        return max(gross_tax - self.credits, 0)
+
+    def arrays(self):
+        """
+        Returns the edges, cumulative tax and marginal rates as NumPy arrays
+        for use with numpy.searchsorted.
+        """
+        if self._arrays is None:
+            import numpy as np
+
+            self._arrays = (
+                np.array(self.edges, dtype=np.float64),
+                np.array(self.cumulative, dtype=np.float64),
+                np.array(self.marginal, dtype=np.float64),
+            )
+        return self._arrays
+
+
+@lru_cache(maxsize=32)
+def compile_tax_table(standard_rate_limit, standard_rate, higher_rate, usc_bands, credits):
+    """
+    Compiles income tax brackets and USC bands into a TaxTable.
+
+    Parameters:
+    - standard_rate_limit (float): Income taxed at the standard rate.
+    - standard_rate (float): Income tax rate up to the limit.
+    - higher_rate (float): Income tax rate above the limit.
+    - usc_bands (tuple): (upper limit, rate) pairs in ascending order.
+    - credits (float): Total tax credits deducted from the combined tax.
+
+    Returns:
+    - TaxTable: The compiled schedule. Identical inputs return the same object.
+    """
+    income_bands = ((standard_rate_limit, standard_rate), (float('inf'), higher_rate))
+    limits = {limit for limit, _ in income_bands + tuple(usc_bands) if limit != float('inf')}
+    edges = tuple(sorted({0, *limits}))
+
+    marginal = tuple(_rate_at(income_bands, edge) + _rate_at(usc_bands, edge) for edge in edges)
+    cumulative = [0.0]
+    for index in range(1, len(edges)):
+        cumulative.append(cumulative[-1] + (edges[index] - edges[index - 1]) * marginal[index - 1])
+    return TaxTable(edges, tuple(cumulative), marginal, credits)
+
+
+def get_tax_table(tax_year, reduced_usc=False):
+    """
+    Returns the compiled TaxTable for a tax year listed in TAX_YEARS.
+
+    Parameters:
+    - tax_year (int): The tax year, e.g. 2025.
+    - reduced_usc (bool): Use the reduced-rate USC bands instead of the standard ones.
+
+    Returns:
+    - TaxTable: The compiled schedule for that year.
+    """
+    try:
+        settings = TAX_YEARS[tax_year]
+    except KeyError:
+        raise ValueError(f"No tax settings for tax year {tax_year}.") from None
+    return compile_tax_table(
+        settings["standard_rate_limit"],
+        settings["standard_rate"],
+        settings["higher_rate"],
+        settings["reduced_usc_bands" if reduced_usc else "usc_bands"],
+        settings["personal_tax_credit"] + settings["employee_tax_credit"],
+    )
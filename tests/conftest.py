@@ -0,0 +1,30 @@
+import os
+import sys
+
+import pytest
+
+# The app is a flat set of modules run from the project folder, not an installed package
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import data_handler  # noqa: E402
+
+
+@pytest.fixture
+def data_store(tmp_path, monkeypatch):
+    """
+    Points every data_handler path into tmp_path, with the plain CSV backend and no
+    snapshot, and runs the test from there so roster.json is private to it too.
+    The shared hours file is data_store / "hours.csv".
+    """
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(data_handler, "DATA_FILE", str(tmp_path / "hours.csv"))
+    monkeypatch.setattr(data_handler, "DB_FILE", str(tmp_path / "hours.db"))
+    monkeypatch.setattr(data_handler, "EMPLOYEE_DIR", str(tmp_path / "employees"))
+    monkeypatch.setattr(data_handler, "STORAGE_BACKEND", "csv")
+    monkeypatch.setattr(data_handler, "USE_SNAPSHOT", False)
+    return tmp_path
+
+
+@pytest.fixture
+def hours_file(data_store):
+    return data_store / "hours.csv"
@@ -0,0 +1,9 @@
+def write_hours(path, rows, employees=None):
+    """
+    Writes (date, hours, rate) rows as an hours CSV in the DATA_FILE layout,
+    with an 'Employee' column holding employees[i] for row i if given.
+    """
+    header = "Date,Hours Worked,Hourly Rate" + (",Employee" if employees else "")
+    lines = [header] + [",".join([day, str(hours), str(rate)] + ([employees[position]] if employees else []))
+                        for position, (day, hours, rate) in enumerate(rows)]
+    path.write_text("\n".join(lines) + "\n")
@@ -0,0 +1,65 @@
+import pytest
+
+import background_task
+import data_handler
+from background_task import BackgroundTask, TaskCancelled
+from entry_store import EntryStore
+
+
+def _entries(count):
+    entries = EntryStore()
+    for day in range(count):
+        entries.append(738000 + day % 365, 8.0, 15.0)
+    return entries
+
+
+def test_cancel_is_checked_on_every_report_but_progress_is_throttled(monkeypatch):
+    monkeypatch.setattr(background_task, "PROGRESS_SECONDS", 3600)
+    task = BackgroundTask(lambda report: None)
+    for done in range(1, 100):
+        task._report(done, 100)
+    task._report(100, 100)
+    assert task._messages.qsize() == 2  # The first update and the last one
+    task.cancel()
+    with pytest.raises(TaskCancelled):
+        task._report(101, None)
+
+
+def test_a_load_stops_within_one_checkpoint_of_cancel(hours_file):
+    data_handler.save_entries(_entries(5 * data_handler.CHECKPOINT_ROWS))
+    calls = []
+
+    def report(done, total):
+        calls.append(done)
+        if done >= data_handler.CHECKPOINT_ROWS:
+            raise TaskCancelled()
+
+    with pytest.raises(TaskCancelled):
+        data_handler.load_data(report=report)
+    assert calls == [data_handler.CHECKPOINT_ROWS]
+
+
+def test_a_cancelled_save_leaves_the_file_untouched(hours_file):
+    data_handler.save_entries(_entries(10))
+    before = hours_file.read_bytes()
+
+    def report(done, total):
+        raise TaskCancelled()
+
+    with pytest.raises(TaskCancelled):
+        data_handler.save_entries(_entries(2 * data_handler.CHECKPOINT_ROWS), report=report)
+    assert hours_file.read_bytes() == before
+
+
+def test_a_cancelled_sqlite_save_is_rolled_back(data_store, monkeypatch):
+    import sqlite_backend
+
+    monkeypatch.setattr(data_handler, "STORAGE_BACKEND", "sqlite")
+
+    def report(done, total):
+        if done:
+            raise TaskCancelled()
+
+    with pytest.raises(TaskCancelled):
+        data_handler.save_entries(_entries(2 * data_handler.CHECKPOINT_ROWS), "nikita", report=report)
+    assert sqlite_backend.count_rows(data_handler.DB_FILE) == 0
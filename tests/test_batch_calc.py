@@ -0,0 +1,139 @@
+import numpy as np
+import pytest
+
+import batch_calc
+import utils
+from entry_store import to_ordinal
+from holiday_calendar import HolidayCalendar
+from payroll_periods import TOTAL_KEYS, PayrollLedger
+from tax_tables import TAX_YEARS, get_tax_table
+
+NET_PAY_KEYS = ("regular_hours", "overtime_hours", "regular_pay", "overtime_pay",
+                "holiday_pay", "gross", "income_tax", "net")
+
+
+def _band_edges(tax_year):
+    table = utils.resolve_tax_table(tax_year)
+    return [edge for edge in table.edges if edge > 0]
+
+
+def _boundary_incomes(tax_year):
+    # Every band edge, a cent either side of it, and zero
+    amounts = [0.0, 0.01]
+    for edge in _band_edges(tax_year):
+        amounts += [edge - 0.01, float(edge), edge + 0.01]
+    return amounts
+
+
+def assert_net_pay_parity(hours, rates, tax_year=None, holidays=None):
+    batch = batch_calc.calculate_net_pay_batch(hours, rates, tax_year, holidays)
+    flags = holidays if holidays is not None else [False] * len(hours)
+    for position, (hour, rate, holiday) in enumerate(zip(hours, rates, flags)):
+        scalar = utils.calculate_net_pay(hour, rate, tax_year, bool(holiday))
+        for key in NET_PAY_KEYS:
+            assert batch[key][position] == pytest.approx(scalar[key], abs=1e-9), (key, hour, rate, holiday)
+
+
+@pytest.fixture(autouse=True)
+def fresh_caches():
+    utils.clear_tax_cache()
+    yield
+    utils.clear_tax_cache()
+
+
+@pytest.mark.parametrize("tax_year", [None, *TAX_YEARS])
+def test_tax_parity_at_band_boundaries(tax_year):
+    amounts = _boundary_incomes(tax_year)
+    batch = batch_calc.calculate_tax_batch(amounts, tax_year)
+    for amount, tax in zip(amounts, batch):
+        assert tax == pytest.approx(utils.calculate_tax(amount, tax_year), abs=1e-9), amount
+
+
+@pytest.mark.parametrize("tax_year", [None, *TAX_YEARS])
+def test_net_pay_parity_at_band_boundaries(tax_year):
+    # One hour at a rate equal to the amount puts the gross exactly on each edge
+    amounts = _boundary_incomes(tax_year)
+    assert_net_pay_parity([1.0] * len(amounts), amounts, tax_year)
+
+
+def test_net_pay_parity_around_overtime_threshold():
+    threshold = utils.OVERTIME_THRESHOLD
+    hours = [0.0, 0.5, threshold - 0.01, threshold, threshold + 0.01, threshold + 8, 100.0]
+    rates = [11.0, 12.5, 15.0, 15.0, 15.0, 13.37, 20.0]
+    assert_net_pay_parity(hours, rates)
+    breakdown = batch_calc.calculate_net_pay_batch(hours, rates)
+    assert breakdown["overtime_hours"][3] == 0
+    assert breakdown["overtime_hours"][4] == pytest.approx(0.01)
+
+
+def test_net_pay_parity_with_holidays():
+    hours = [8.0, 8.0, 45.0, 3.5]
+    rates = [15.0, 15.0, 12.0, 11.0]
+    holidays = np.array([True, False, True, False])
+    assert_net_pay_parity(hours, rates, holidays=holidays)
+    assert_net_pay_parity(hours, rates, 2024, holidays)
+
+
+def test_net_pay_parity_on_random_entries():
+    rng = np.random.default_rng(7)
+    hours = np.round(rng.uniform(0, 60, 500), 2)
+    rates = np.round(rng.uniform(10, 200, 500), 2)
+    holidays = rng.random(500) < 0.1
+    for tax_year in (None, *TAX_YEARS):
+        assert_net_pay_parity(hours.tolist(), rates.tolist(), tax_year, holidays)
+
+
+def test_single_rate_broadcasts_to_every_entry():
+    batch = batch_calc.calculate_net_pay_batch([8.0, 42.0], 15.0)
+    assert batch["gross"].tolist() == pytest.approx([
+        utils.calculate_net_pay(8.0, 15.0)["gross"], utils.calculate_net_pay(42.0, 15.0)["gross"]])
+
+
+def test_compiled_year_table_matches_the_year_settings():
+    assert batch_calc.calculate_tax_batch([50000.0], 2024)[0] == pytest.approx(get_tax_table(2024).tax(50000.0))
+
+
+def test_holiday_mask_matches_calendar_membership():
+    calendar = HolidayCalendar(["2024-12-25", "2024-12-26"])
+    dates = [to_ordinal(day) for day in ("2024-12-24", "2024-12-25", "2024-12-26", "2024-12-27")]
+    assert batch_calc.holiday_mask(dates, calendar).tolist() == [False, True, True, False]
+
+
+def test_weekly_totals_parity():
+    calendar = HolidayCalendar(["2024-12-25"])
+    entries = [{"date": day, "hours": hours, "rate": rate} for day, hours, rate in (
+        ("2024-12-23", 10.0, 15.0), ("2024-12-24", 12.0, 15.0), ("2024-12-25", 8.0, 15.0),
+        ("2024-12-26", 14.0, 16.5), ("2024-12-27", 9.5, 16.5))]
+    dates = [to_ordinal(entry["date"]) for entry in entries]
+    hours = [entry["hours"] for entry in entries]
+    rates = [entry["rate"] for entry in entries]
+    batch = batch_calc.calculate_weekly_totals_batch(hours, rates, dates=dates, holidays=calendar)
+    scalar = utils.calculate_weekly_totals(entries, calendar)
+    assert batch.keys() == scalar.keys()
+    for key in scalar:
+        assert batch[key] == pytest.approx(scalar[key]), key
+
+
+@pytest.mark.parametrize("seed", [0, 1, 2])
+def test_payroll_ledger_batch_matches_ledger(seed):
+    rng = np.random.default_rng(seed)
+    count = 2000
+    dates = rng.integers(to_ordinal("2023-11-01"), to_ordinal("2026-02-28"), count)
+    hours = np.round(rng.uniform(0.5, 16.0, count), 2)
+    rates = np.round(rng.uniform(10.0, 60.0, count), 2)
+    calendar = HolidayCalendar(["2023-12-25", "2024-01-01", "2024-12-25", "2025-12-25"])
+    ledger = PayrollLedger(zip(dates.tolist(), hours.tolist(), rates.tolist()), calendar)
+    batch = batch_calc.payroll_ledger_batch(dates, hours, rates, calendar)
+    assert batch["week_start"].tolist() == [to_ordinal(week["week_start"]) for week in ledger.weeks]
+    for key in TOTAL_KEYS + ("tax_year", "period", "ytd_gross", "ytd_tax"):
+        assert batch[key].tolist() == pytest.approx([week[key] for week in ledger.weeks]), key
+
+
+def test_weekly_totals_batch_from_start_keeps_year_to_date():
+    dates = [to_ordinal(day) for day in ("2025-01-06", "2025-06-02", "2025-06-03")]
+    hours, rates = [40.0, 45.0, 8.0], [900.0, 900.0, 900.0]
+    ledger = PayrollLedger(zip(dates, hours, rates))
+    totals = batch_calc.calculate_weekly_totals_batch(hours, rates, dates, start="2025-06-04")
+    assert totals == pytest.approx(ledger.totals("2025-06-04"))
+    assert totals["entries"] == 2
+    assert totals["overtime_hours"] == pytest.approx(13.0)
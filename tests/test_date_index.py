@@ -0,0 +1,94 @@
+import date_index
+from date_index import DateIndex, read_rows_at
+from entry_store import to_ordinal
+
+
+def write_csv(path, header, rows, mode='w'):
+    with open(path, mode=mode, newline='') as file:
+        if header:
+            file.write(",".join(header) + "\n")
+        for row in rows:
+            file.write(",".join(str(value) for value in row) + "\n")
+
+
+def dates_between(path, start, end):
+    index = DateIndex(str(path))
+    index.ensure_current()
+    return [row[1] for row in read_rows_at(str(path), index.offsets_between(start, end))]
+
+
+def test_unsorted_file_is_indexed_in_date_order_by_header_name(tmp_path):
+    path = tmp_path / "hours.csv"
+    # The date is not the first column, so it must be found by name
+    write_csv(path, ["Hours Worked", "Date", "Hourly Rate"], [
+        (8, "2024-10-09", 15), (7, "2024-10-01", 15), (6, "2024-10-05", 15), (5, "2024-10-01", 15)])
+    assert dates_between(path, "2024-10-01", "2024-10-05") == ["2024-10-01", "2024-10-01", "2024-10-05"]
+    assert dates_between(path, None, None) == ["2024-10-01", "2024-10-01", "2024-10-05", "2024-10-09"]
+    assert dates_between(path, "2024-10-10", None) == []
+
+
+def test_appends_extend_the_index_without_rewriting_it(tmp_path):
+    path = tmp_path / "hours.csv"
+    write_csv(path, ["Date", "Hours Worked", "Hourly Rate"], [("2024-10-01", 8, 15), ("2024-10-02", 8, 15)])
+    index = DateIndex(str(path))
+    index.ensure_current()
+    inode = (tmp_path / "hours.csv.idx").stat().st_ino
+
+    write_csv(path, None, [("2024-10-03", 8, 15)], mode='a')
+    assert index.load() and not index.is_current()
+    index.extend()
+    assert index.sorted_count == index.count == 3
+
+    # A backdated row goes to the unsorted tail but is still found in date order
+    write_csv(path, None, [("2024-09-30", 4, 15)], mode='a')
+    index.extend()
+    assert (index.sorted_count, index.count) == (3, 4)
+    assert (tmp_path / "hours.csv.idx").stat().st_ino == inode
+
+    reloaded = DateIndex(str(path))
+    assert reloaded.load() and reloaded.is_current()
+    rows = list(read_rows_at(str(path), reloaded.offsets_between("2024-09-30", "2024-10-02")))
+    assert [row[0] for row in rows] == ["2024-09-30", "2024-10-01", "2024-10-02"]
+
+
+def test_full_tail_is_merged_into_the_sorted_section(tmp_path, monkeypatch):
+    monkeypatch.setattr(date_index, "TAIL_LIMIT", 2)
+    path = tmp_path / "hours.csv"
+    write_csv(path, ["Date", "Hours Worked", "Hourly Rate"], [("2024-10-10", 8, 15)])
+    index = DateIndex(str(path))
+    index.ensure_current()
+    for day in ("2024-10-03", "2024-10-02", "2024-10-01"):
+        write_csv(path, None, [(day, 8, 15)], mode='a')
+        index.extend()
+    assert index.sorted_count == index.count == 4
+    ordinals = [ordinal for ordinal, _ in index._records()]
+    assert ordinals == sorted(ordinals) == [to_ordinal(day) for day in
+                                            ("2024-10-01", "2024-10-02", "2024-10-03", "2024-10-10")]
+
+
+def test_changed_or_corrupt_sidecar_is_rebuilt(tmp_path):
+    path = tmp_path / "hours.csv"
+    write_csv(path, ["Date", "Hours Worked", "Hourly Rate"], [("2024-10-01", 8, 15)])
+    DateIndex(str(path)).ensure_current()
+    (tmp_path / "hours.csv.idx").write_bytes(b"not an index")
+    assert not DateIndex(str(path)).load()
+    index = DateIndex(str(path))
+    index.ensure_current()
+    assert index.load() and index.count == 1
+
+
+def test_ranges_stream_in_chunks_merged_with_the_tail(tmp_path, monkeypatch):
+    monkeypatch.setattr(date_index, "CHUNK_RECORDS", 2)
+    path = tmp_path / "hours.csv"
+    days = [f"2024-10-{day:02d}" for day in range(1, 8)]
+    write_csv(path, ["Date", "Hours Worked", "Hourly Rate"], [(day, 8, 15) for day in days])
+    index = DateIndex(str(path))
+    index.ensure_current()
+    write_csv(path, None, [("2024-10-04", 2, 15), ("2024-09-30", 2, 15)], mode='a')
+    index.extend()
+    offsets = index.iter_offsets_between("2024-10-02", "2024-10-06")
+    assert not isinstance(offsets, list)
+    rows = list(read_rows_at(str(path), offsets))
+    assert [(row[0], row[1]) for row in rows] == [
+        ("2024-10-02", "8"), ("2024-10-03", "8"), ("2024-10-04", "8"), ("2024-10-04", "2"),
+        ("2024-10-05", "8"), ("2024-10-06", "8")]
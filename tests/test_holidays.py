@@ -0,0 +1,42 @@
+import pytest
+
+import data_handler
+import utils
+from helpers import write_hours
+from holiday_calendar import HolidayCalendar
+
+CHRISTMAS = HolidayCalendar(["2024-12-25"])
+
+
+@pytest.fixture
+def christmas_hours(hours_file):
+    write_hours(hours_file, [("2024-12-24", 8.0, 15.0), ("2024-12-25", 8.0, 15.0)])
+    return hours_file
+
+
+def test_holiday_hours_are_paid_at_the_multiplier_in_total():
+    regular = utils.calculate_net_pay(8.0, 15.0)
+    holiday = utils.calculate_net_pay(8.0, 15.0, holiday=True)
+    assert holiday["gross"] == pytest.approx(8.0 * 15.0 * utils.HOLIDAY_RATE_MULTIPLIER)
+    assert holiday["holiday_pay"] == pytest.approx(holiday["gross"] - regular["gross"])
+
+
+def test_calculate_holiday_pay_is_the_premium_only():
+    entries = [{"date": "2024-12-24", "hours": 8.0, "rate": 15.0}, {"date": "2024-12-25", "hours": 8.0, "rate": 15.0}]
+    assert utils.calculate_holiday_pay(entries, ["2024-12-25"]) == pytest.approx(120.0)
+
+
+def test_every_summary_path_pays_holidays(christmas_hours, monkeypatch):
+    expected = {"total_holiday_hours": 8.0, "total_holiday_pay": 120.0, "total_gross": 360.0}
+
+    def check(totals):
+        for key, value in expected.items():
+            assert totals[key] == pytest.approx(value), key
+
+    check(data_handler.summarize_data(holidays=CHRISTMAS))
+    check(data_handler.weekly_summary(holidays=CHRISTMAS)["2024-12-23"])
+    check(data_handler.summarize_snapshot(holidays=CHRISTMAS))
+    assert data_handler.migrate_csv_to_sqlite() == 2
+    monkeypatch.setattr(data_handler, "STORAGE_BACKEND", "sqlite")
+    check(data_handler.summarize_data(holidays=CHRISTMAS))
+    check(data_handler.weekly_summary(holidays=CHRISTMAS)["2024-12-23"])
@@ -0,0 +1,29 @@
+import pytest
+
+import data_handler
+import instrumentation
+
+
+@pytest.fixture
+def enabled():
+    instrumentation.reset()
+    instrumentation.enable()
+    yield
+    instrumentation.disable()
+    instrumentation.reset()
+
+
+def test_rows_callback_is_skipped_for_none_results(enabled):
+    @instrumentation.instrumented("lookup", rows=len)
+    def lookup(found):
+        return [1, 2, 3] if found else None
+
+    assert lookup(False) is None
+    assert lookup(True) == [1, 2, 3]
+    stat = instrumentation.stats()["lookup"]
+    assert (stat["calls"], stat["rows"]) == (2, 3)
+
+
+def test_load_snapshot_of_a_missing_file_is_recorded(enabled, data_store):
+    assert data_handler.load_snapshot() is None
+    assert instrumentation.stats()["load_snapshot"]["calls"] == 1
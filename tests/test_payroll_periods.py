@@ -0,0 +1,180 @@
+import pytest
+
+import data_handler
+import main
+import payroll_run
+import utils
+from entry_store import from_ordinal, to_ordinal
+from helpers import write_hours
+from holiday_calendar import HolidayCalendar
+from main import EmployeeData
+from payroll_periods import (WEEKS_PER_TAX_YEAR, PayrollLedger, combine_weeks, ledger_bounds,
+                             tax_table_for, tax_year_start)
+from roster import Roster
+
+NO_HOLIDAYS = HolidayCalendar()
+
+
+def _year_of_weeks(tax_year, hours=40.0, rate=30.0):
+    # One entry on the Monday of every pay week of the tax year
+    monday = tax_year_start(f"{tax_year}-06-01")
+    return [(from_ordinal(monday + 7 * week), hours, rate) for week in range(WEEKS_PER_TAX_YEAR)]
+
+
+def test_overtime_is_counted_per_week():
+    rows = [(to_ordinal(day), 12.0, 20.0) for day in ("2024-10-07", "2024-10-08", "2024-10-09", "2024-10-10",
+                                                       "2024-10-11")]
+    week = PayrollLedger(rows).weeks[0]
+    assert week["regular_hours"] == pytest.approx(utils.OVERTIME_THRESHOLD)
+    assert week["overtime_hours"] == pytest.approx(60.0 - utils.OVERTIME_THRESHOLD)
+
+
+def test_equal_weeks_add_up_to_the_annual_tax():
+    rows = [(to_ordinal(day), hours, rate) for day, hours, rate in _year_of_weeks(2024)]
+    ledger = PayrollLedger(rows)
+    annual = sum(week["total_gross"] for week in ledger.weeks)
+    assert sum(week["income_tax"] for week in ledger.weeks) == pytest.approx(tax_table_for(2024).tax(annual))
+    assert [week["period"] for week in ledger.weeks] == list(range(1, WEEKS_PER_TAX_YEAR + 1))
+
+
+def test_ledger_tax_goes_through_the_tax_cache():
+    rows = [(to_ordinal(day), hours, rate) for day, hours, rate in _year_of_weeks(2024)]
+    utils.clear_tax_cache()
+    first = PayrollLedger(rows)
+    assert utils.tax_cache_info()["cumulative_tax"].misses == WEEKS_PER_TAX_YEAR
+    # Another employee with the same pay reuses every week's tax
+    assert PayrollLedger(rows).weeks == first.weeks
+    assert utils.tax_cache_info()["cumulative_tax"].hits == WEEKS_PER_TAX_YEAR
+    utils.clear_tax_cache()
+
+
+def test_a_week_is_taxed_in_the_year_of_its_sunday():
+    week = PayrollLedger([(to_ordinal("2024-12-30"), 8.0, 15.0)]).weeks[0]
+    assert (week["tax_year"], week["period"]) == (2025, 1)
+    assert from_ordinal(tax_year_start("2025-01-03")) == "2024-12-30"
+    assert ledger_bounds("2025-06-04", "2025-06-04") == (to_ordinal("2024-12-30"), to_ordinal("2025-06-08"))
+
+
+def test_summaries_carry_year_to_date_tax_from_the_start_of_the_tax_year(hours_file):
+    write_hours(hours_file, _year_of_weeks(2024, rate=60.0))
+    full = PayrollLedger(data_handler.iter_csv_file(str(hours_file)), NO_HOLIDAYS)
+    expected = full.totals("2024-07-01", "2024-07-31")
+
+    totals = data_handler.summarize_data("2024-07-01", "2024-07-31", holidays=NO_HOLIDAYS)
+    assert totals == pytest.approx(expected)
+    weeks = data_handler.weekly_summary("2024-07-01", "2024-07-31", holidays=NO_HOLIDAYS)
+    assert combine_weeks(weeks.values()) == pytest.approx(expected)
+    snapshot = data_handler.summarize_snapshot("2024-07-01", "2024-07-31", holidays=NO_HOLIDAYS)
+    assert snapshot == pytest.approx(expected)
+    # Taxing the month on its own would start the year-to-date basis over
+    assert PayrollLedger(data_handler.iter_csv_file(str(hours_file), "2024-07-01", "2024-07-31"),
+                         NO_HOLIDAYS).totals()["income_tax"] != pytest.approx(expected["income_tax"])
+
+
+def test_every_backend_agrees_with_the_ledger(hours_file, monkeypatch):
+    write_hours(hours_file, [("2024-12-23", 30.0, 20.0), ("2024-12-24", 14.0, 20.0), ("2024-12-25", 8.0, 20.0),
+                        ("2024-12-30", 10.0, 22.0), ("2025-01-02", 12.0, 22.0)])
+    calendar = HolidayCalendar(["2024-12-25"])
+    expected = PayrollLedger(data_handler.iter_csv_file(str(hours_file)), calendar).totals()
+    csv_totals = data_handler.summarize_data(holidays=calendar)
+    assert csv_totals == pytest.approx(expected)
+    assert data_handler.summarize_snapshot(holidays=calendar) == pytest.approx(expected)
+    assert data_handler.migrate_csv_to_sqlite() == 5
+    monkeypatch.setattr(data_handler, "STORAGE_BACKEND", "sqlite")
+    assert data_handler.summarize_data(holidays=calendar) == pytest.approx(expected)
+    assert combine_weeks(data_handler.weekly_summary(holidays=calendar).values()) == pytest.approx(expected)
+
+
+def test_ledgers_stream_rows_in_date_order(hours_file):
+    rows = _year_of_weeks(2024, rate=60.0)[:20]
+    # Rows appended out of date order are still read back in date order through the index
+    write_hours(hours_file, rows[10:] + rows[:10] + [("2024-03-05", 45.0, 60.0)])
+    expected = PayrollLedger(data_handler.iter_csv_file(str(hours_file)), NO_HOLIDAYS)
+    streamed = list(data_handler.iter_csv_by_date(str(hours_file)))
+    assert [row[0] for row in streamed] == sorted(row[0] for row in streamed)
+    assert PayrollLedger(streamed, NO_HOLIDAYS, ordered=True).weeks == expected.weeks
+    assert data_handler.payroll_ledger(holidays=NO_HOLIDAYS).weeks == expected.weeks
+    assert list(data_handler.load_range("2024-03-01", "2024-03-31").rows()) == [
+        row for row in streamed if to_ordinal("2024-03-01") <= row[0] <= to_ordinal("2024-03-31")]
+
+    # An ordered ledger streams its rows as given, so it refuses rows out of order
+    with pytest.raises(ValueError):
+        PayrollLedger(list(reversed(streamed)), NO_HOLIDAYS, ordered=True)
+
+
+def test_payroll_run_uses_the_ledger(data_store):
+    path = data_store / "nikita.csv"
+    write_hours(path, _year_of_weeks(2024, rate=60.0))
+    result = payroll_run.summarize_employee(str(path), "2024-07-01", "2024-07-31")
+    full = PayrollLedger(data_handler.iter_csv_file(str(path)), data_handler.default_calendar())
+    assert result["weeks"] == full.weekly("2024-07-01", "2024-07-31")
+    assert result["total"] == pytest.approx(full.totals("2024-07-01", "2024-07-31"))
+
+
+def test_a_pooled_payroll_run_matches_a_serial_one(data_store):
+    folder = data_store / "staff"
+    folder.mkdir()
+    for number in range(5):
+        weeks = _year_of_weeks(2024, hours=30.0 + 4 * number, rate=15.0 + number)
+        write_hours(folder / f"employee_{number}.csv", weeks[number::2])
+    serial = payroll_run.run_payroll(str(folder), workers=1, start="2024-03-01", end="2024-09-30")
+    pooled = payroll_run.run_payroll(str(folder), workers=4, chunksize=2, start="2024-03-01", end="2024-09-30")
+    assert list(pooled) == list(serial) == [f"employee_{number}" for number in range(5)]
+    assert pooled == serial
+
+
+def test_gui_totals_include_the_saved_history(hours_file):
+    write_hours(hours_file, _year_of_weeks(2024, rate=60.0)[:31])
+    employee_data = EmployeeData(roster=Roster())
+    employee_data.holidays = NO_HOLIDAYS
+    employee_data.hourly_rate = 60.0
+    employee_data.add_entry("2024-07-30", 8.0)  # Same week as a saved entry
+
+    rows = list(data_handler.iter_csv_file(str(hours_file))) + [(to_ordinal("2024-07-30"), 8.0, 60.0)]
+    week = PayrollLedger(rows, NO_HOLIDAYS).week_of("2024-07-30")
+    assert employee_data.weeks() == [week]
+    assert employee_data.calculate_totals() == pytest.approx(combine_weeks([week]))
+    assert employee_data.calculate_totals()["overtime_hours"] == pytest.approx(8.0)
+
+    # Saving moves the entry to disk without changing the ledger
+    assert employee_data.save_to_csv() == 1
+    employee_data.set_entries(*employee_data.read_entries())
+    assert employee_data.weeks()[-1] == pytest.approx(week)
+
+
+def test_gui_ledger_is_updated_in_place(hours_file, monkeypatch):
+    write_hours(hours_file, _year_of_weeks(2024, hours=30.0, rate=60.0)[:31])
+    employee_data = EmployeeData(roster=Roster())
+    employee_data.holidays = HolidayCalendar(["2024-05-06"])
+    employee_data.hourly_rate = 60.0
+    employee_data.add_entry("2024-07-30", 8.0)
+    ledger = employee_data.ledger()
+
+    reads = []
+    monkeypatch.setattr(main, "load_range", lambda *args: reads.append(args) or data_handler.load_range(*args))
+    # Within the saved rows already read, an earlier week re-taxes the rest of the year
+    for day, hours in [("2024-05-06", 12.0), ("2024-07-29", 5.0), ("2024-02-14", 3.5)]:
+        employee_data.add_entry(day, hours)
+    assert reads == [] and employee_data.ledger() is ledger
+    # A week past them reads just that week; a week in the previous tax year reads that year
+    employee_data.add_entry("2024-08-07", 45.0)
+    employee_data.add_entry("2023-12-20", 4.0)
+    assert [(from_ordinal(first), from_ordinal(last)) for first, last, _ in reads] == [
+        ("2024-08-05", "2024-08-11"), ("2022-12-26", "2023-12-31")]
+
+    rebuilt = EmployeeData(roster=Roster())
+    rebuilt.holidays = employee_data.holidays
+    rebuilt.set_entries(employee_data.entries)
+    assert employee_data.weeks() == [pytest.approx(week) for week in rebuilt.weeks()]
+    assert employee_data.totals_consistent()
+    assert employee_data.recalculate_totals()["overtime_hours"] == pytest.approx(2.0 + 3.0 + 5.0)
+
+
+def test_payroll_without_a_split_fails_clearly(hours_file, capsys):
+    import cli
+
+    write_hours(hours_file, _year_of_weeks(2024)[:4])
+    assert payroll_run.employee_files(data_handler.EMPLOYEE_DIR) == {}
+    assert payroll_run.run_payroll([data_handler.EMPLOYEE_DIR]) == {}
+    assert cli.main(["payroll"]) == 1
+    assert "no employee hour files" in capsys.readouterr().err
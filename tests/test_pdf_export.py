@@ -0,0 +1,26 @@
+import pytest
+
+from pdf_export import export_payslips, export_summary, weekly_payslips
+
+TOTALS = {"total_hours": 8.0, "total_holiday_hours": 0, "total_holiday_pay": 0,
+          "total_gross": 120.0, "total_deductions": 0.0, "total_net": 120.0}
+
+
+def test_export_needs_exactly_one_destination(tmp_path):
+    with pytest.raises(ValueError):
+        export_payslips([])
+    with pytest.raises(ValueError):
+        export_payslips([], filename=str(tmp_path / "a.pdf"), directory=str(tmp_path))
+    with pytest.raises(ValueError):
+        export_payslips([], filename="")
+
+
+def test_missing_folders_are_created(tmp_path):
+    summary = tmp_path / "reports" / "2024" / "summary.pdf"
+    assert export_summary(str(summary), "Nikita", 15.0, TOTALS) == str(summary)
+    assert summary.exists()
+
+    folder = tmp_path / "payslips"
+    written = export_payslips(weekly_payslips("Nikita", 15.0, {"2024-09-30": TOTALS}), directory=str(folder))
+    assert written == [str(folder / "payslip_2024-09-30.pdf")]
+    assert (folder / "payslip_2024-09-30.pdf").exists()
@@ -0,0 +1,130 @@
+import pytest
+
+import data_handler
+from helpers import write_hours
+from main import EmployeeData
+from payroll_periods import combine_weeks
+from roster import Employee, Roster, employee_id, load_roster
+from timesheet_import import import_timesheet
+
+SHARED_ROWS = [("2024-01-08", 8.0, 15.0), ("2024-03-04", 8.0, 15.5), ("2024-06-03", 9.0, 15.0),
+               ("2024-09-02", 7.5, 14.0)]
+
+
+def test_employee_id_slugs_names():
+    assert employee_id(" Nikita Talysman ") == "nikita_talysman"
+    with pytest.raises(ValueError):
+        employee_id("--")
+
+
+def test_rate_history_is_searched_by_date():
+    employee = Employee("Nikita", [("2024-06-01", 16.0), ("2024-01-01", 15.0)])
+    assert employee.rate_on("2023-12-31") is None
+    assert employee.rate_on("2024-05-31") == 15.0
+    assert employee.rate_on("2024-06-01") == 16.0
+    assert employee.current_rate == 16.0
+
+
+def test_a_first_rate_covers_all_history_and_changes_apply_from_their_date():
+    roster = Roster()
+    employee = roster.add("Nikita", 15.0)
+    assert employee.rate_on("1999-01-01") == 15.0
+    roster.add("Nikita", 16.0, "2024-06-01")
+    assert employee.rate_on("2024-05-31") == 15.0
+    assert employee.rate_on("2024-06-01") == 16.0
+    assert roster.add("nikita", 16.0).rates == employee.rates  # Same rate: no change recorded
+
+
+def test_partitioning_seeds_one_starting_rate(data_store):
+    write_hours(data_store / "hours.csv", SHARED_ROWS)
+    written = data_handler.partition_data("Nikita", 15.0, roster_file=str(data_store / "roster.json"))
+    assert written == {"nikita": len(SHARED_ROWS)}
+    employee = load_roster(str(data_store / "roster.json")).get("Nikita")
+    assert len(employee.rates) == 1
+    for day, _, _ in SHARED_ROWS:
+        assert employee.rate_on(day) == 15.0
+
+
+def test_gui_rate_change_is_recorded_from_its_effective_date(data_store):
+    write_hours(data_store / "hours.csv", SHARED_ROWS)
+    employee_data = EmployeeData(roster=Roster())
+    employee_data.set_employee_info("Nikita", 15.0)
+    employee_data.set_employee_info("Nikita", 17.0, effective_from="2024-07-01")
+    employee = load_roster().get("nikita")
+    assert employee.rate_on("2024-01-08") == 15.0
+    assert employee.rate_on("2024-06-30") == 15.0
+    assert employee.rate_on("2024-07-01") == 17.0
+    assert employee_data.rate_on("2024-07-02") == 17.0
+
+
+def test_reads_without_an_employee_use_the_partitions(data_store, monkeypatch):
+    write_hours(data_store / "hours.csv", SHARED_ROWS + [("2024-09-03", 6.0, 20.0)], ["", "", "", "", "Sam"])
+    data_handler.partition_data("Nikita", 15.0, roster_file=str(data_store / "roster.json"))
+    # Rows appended to the shared file after the split are no longer read
+    with open(data_store / "hours.csv", mode="a") as file:
+        file.write("2024-09-04,99.0,15.0,\n")
+
+    everyone = combine_weeks([data_handler.summarize_data(employee="nikita"),
+                              data_handler.summarize_data(employee="sam")])
+    assert data_handler.summarize_data() == pytest.approx(everyone)
+    assert combine_weeks(data_handler.weekly_summary().values()) == pytest.approx(everyone)
+    assert data_handler.summarize_snapshot() == pytest.approx(everyone)
+    assert set(data_handler.payroll_ledgers()) == {"nikita", "sam"}
+    assert len(data_handler.load_data()) == len(SHARED_ROWS) + 1
+    assert list(data_handler.load_range("2024-09-01", "2024-09-30").column("date")) == sorted(
+        data_handler.load_range("2024-09-01", "2024-09-30").column("date"))
+    assert len(data_handler.load_range("2024-09-01", "2024-09-30")) == 2
+
+    # SQLite builds one ledger per employee in the table
+    assert data_handler.migrate_csv_to_sqlite() == len(SHARED_ROWS) + 1
+    monkeypatch.setattr(data_handler, "STORAGE_BACKEND", "sqlite")
+    assert data_handler.summarize_data() == pytest.approx(everyone)
+    monkeypatch.setattr(data_handler, "STORAGE_BACKEND", "csv")
+
+    assert data_handler.save_entries([{"date": "2024-10-01", "hours": 8.0, "rate": 15.0}]) == 0
+    data_handler.save_entries([{"date": "2024-10-01", "hours": 8.0, "rate": 15.0}] * 2, "nikita")
+    assert data_handler.compact_data() == (len(SHARED_ROWS) + 2, 1)
+
+
+def test_import_needs_an_employee_once_partitioned(data_store):
+    write_hours(data_store / "hours.csv", SHARED_ROWS)
+    data_handler.partition_data("Nikita", 15.0, roster_file=str(data_store / "roster.json"))
+    timesheet = data_store / "timesheet.csv"
+    write_hours(timesheet, [("2024-10-07", 8.0, 15.0)])
+    with pytest.raises(ValueError):
+        import_timesheet(str(timesheet), roster_file=str(data_store / "roster.json"))
+
+    write_hours(timesheet, [("2024-10-07", 8.0, 15.0), ("2024-10-08", 8.0, 15.0)], ["Nikita", ""])
+    result = import_timesheet(str(timesheet), roster_file=str(data_store / "roster.json"))
+    assert result.saved == {"nikita": 1}
+    assert [error[3] for error in result.errors] == ["No employee for this row"]
+
+
+def test_employee_writes_wait_for_the_split(data_store):
+    write_hours(data_store / "hours.csv", SHARED_ROWS)
+    everyone = data_handler.summarize_data()
+    timesheet = data_store / "timesheet.csv"
+    write_hours(timesheet, [("2024-10-07", 8.0, 15.0)])
+    with pytest.raises(ValueError):
+        import_timesheet(str(timesheet), employee="Sam", roster_file=str(data_store / "roster.json"))
+    assert data_handler.save_entries([{"date": "2024-10-07", "hours": 8.0, "rate": 15.0}], "sam") == 0
+    # A partition file alone, e.g. copied in by hand, does not hide the shared history
+    (data_store / "employees").mkdir()
+    write_hours(data_store / "employees" / "sam.csv", [("2024-10-07", 8.0, 15.0)])
+    assert not data_handler.is_split()
+    assert data_handler.summarize_data() == pytest.approx(everyone)
+
+    data_handler.partition_data("Nikita", 15.0, roster_file=str(data_store / "roster.json"))
+    assert data_handler.is_split()
+    assert data_handler.save_entries([{"date": "2024-10-08", "hours": 8.0, "rate": 15.0}], "sam") == 1
+    assert data_handler.summarize_data()["total_hours"] == pytest.approx(everyone["total_hours"] + 16.0)
+
+
+def test_sqlite_logins_do_not_split_the_shared_file(data_store, monkeypatch):
+    write_hours(data_store / "hours.csv", SHARED_ROWS)
+    monkeypatch.setattr(data_handler, "STORAGE_BACKEND", "sqlite")
+    employee_data = EmployeeData(roster=Roster())
+    for _ in range(3):
+        employee_data.set_employee_info("Nikita", 15.0)
+    assert not (data_store / "employees").exists()
+    assert data_handler.summarize_data()["entries"] == 0
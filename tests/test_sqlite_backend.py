@@ -0,0 +1,72 @@
+import sqlite3
+from contextlib import closing
+
+import pytest
+
+import sqlite_backend
+from entry_store import to_ordinal
+from holiday_calendar import HolidayCalendar
+from payroll_periods import PayrollLedger
+
+
+def test_two_shifts_on_one_date_are_both_stored(tmp_path):
+    db_file = str(tmp_path / "hours.db")
+    saved = sqlite_backend.save_entries(db_file, [
+        {"date": "2024-10-04", "hours": 4.0, "rate": 15.0},
+        {"date": "2024-10-04", "hours": 5.0, "rate": 15.0},
+    ], "nikita")
+    assert saved == 2
+    assert sqlite_backend.count_rows(db_file) == 2
+    assert list(sqlite_backend.iter_rows(db_file)) == [("2024-10-04", 4.0, 15.0), ("2024-10-04", 5.0, 15.0)]
+
+
+def test_insert_count_matches_rows_stored(tmp_path):
+    db_file = str(tmp_path / "hours.db")
+    rows = [("", "2024-10-04", 8.0, 15.0)] * 3 + [("nikita", "2024-10-05", 8.0, 15.0)]
+    assert sqlite_backend.insert_rows(db_file, rows) == 4
+    assert sqlite_backend.count_rows(db_file) == 4
+    assert sqlite_backend.count_rows(db_file, "nikita") == 1
+    assert sqlite_backend.employees(db_file) == ["", "nikita"]
+
+
+def test_remove_duplicates_keeps_the_first_copy(tmp_path):
+    db_file = str(tmp_path / "hours.db")
+    sqlite_backend.insert_rows(db_file, [("", "2024-10-04", 8.0, 15.0), ("", "2024-10-04", 8.0, 15.0),
+                                         ("", "2024-10-04", 6.0, 15.0)])
+    assert sqlite_backend.remove_duplicates(db_file) == (2, 1)
+    assert [hours for _, hours, _ in sqlite_backend.iter_rows(db_file)] == [8.0, 6.0]
+
+
+def test_database_keyed_on_employee_and_date_is_upgraded(tmp_path):
+    db_file = str(tmp_path / "hours.db")
+    with closing(sqlite3.connect(db_file)) as connection:
+        connection.executescript("""
+            CREATE TABLE entries (employee TEXT NOT NULL DEFAULT '', date TEXT NOT NULL,
+                                  hours REAL NOT NULL, rate REAL NOT NULL, PRIMARY KEY (employee, date));
+            CREATE INDEX idx_entries_date ON entries (date);
+            INSERT INTO entries VALUES ('', '2024-10-04', 8.0, 15.0);
+        """)
+    assert sqlite_backend.save_entries(db_file, [{"date": "2024-10-04", "hours": 2.0, "rate": 15.0}]) == 1
+    assert list(sqlite_backend.iter_rows(db_file)) == [("2024-10-04", 8.0, 15.0), ("2024-10-04", 2.0, 15.0)]
+
+
+def test_weekly_pay_splits_overtime_in_sql_like_the_ledger(data_store, monkeypatch):
+    import data_handler
+
+    monkeypatch.setattr(data_handler, "STORAGE_BACKEND", "sqlite")
+    # Overtime starts part-way through the second shift of 2024-10-10; 2024-10-09 is a holiday
+    rows = [("2024-10-07", 12.0, 20.0), ("2024-10-08", 12.0, 20.0), ("2024-10-09", 10.0, 22.0),
+            ("2024-10-10", 4.0, 20.0), ("2024-10-10", 5.0, 25.0), ("2024-10-14", 8.0, 20.0),
+            ("2024-10-14", 6.0, 30.0)]
+    sqlite_backend.insert_rows(data_handler.DB_FILE, [("nikita",) + row for row in rows])
+    calendar = HolidayCalendar(["2024-10-09"])
+    expected = PayrollLedger([(to_ordinal(day), hours, rate) for day, hours, rate in rows], calendar)
+
+    ledger = data_handler.payroll_ledger(holidays=calendar, employee="nikita")
+    assert [week["week_start"] for week in ledger.weeks] == ["2024-10-07", "2024-10-14"]
+    assert ledger.weeks == [pytest.approx(week) for week in expected.weeks]
+    assert ledger.weeks[0]["overtime_hours"] == pytest.approx(3.0)
+
+    # Rate filters apply before the weekly split, as they do row by row
+    filtered = data_handler.payroll_ledger(holidays=calendar, employee="nikita", max_rate=25.0)
+    assert filtered.weeks[-1]["total_hours"] == pytest.approx(8.0)
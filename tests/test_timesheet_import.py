@@ -0,0 +1,84 @@
+import numpy as np
+import pytest
+
+import data_handler
+from entry_store import to_ordinal
+from roster import Roster
+from timesheet_import import import_timesheet, parse_dates
+from validation import MAX_DAILY_HOURS
+
+
+@pytest.fixture
+def store(data_store):
+    # A new install: nothing to split, but imports go to the employee partitions
+    data_handler.partition_data("Nikita", roster_file=str(data_store / "roster.json"))
+    return data_store
+
+
+def _timesheet(path, lines):
+    path.write_text("\n".join(lines) + "\n")
+    return str(path)
+
+
+def test_valid_rows_are_saved_to_the_employee_partition(store):
+    path = _timesheet(store / "sheet.csv", ["Work Date,Hours,Rate", "2024-10-07,8,15", "08/10/2024,7.5,15.5"])
+    result = import_timesheet(path, employee="Nikita", roster_file=str(store / "roster.json"))
+    assert (result.rows_read, result.rows_valid, result.rows_saved) == (2, 2, 2)
+    assert result.saved == {"nikita": 2}
+    entries = data_handler.load_data(employee="nikita")
+    assert list(entries.column("date")) == [to_ordinal("2024-10-07"), to_ordinal("2024-10-08")]
+    assert list(entries.column("rate")) == [15.0, 15.5]
+
+
+def test_every_problem_is_reported_and_only_valid_rows_are_saved(store):
+    path = _timesheet(store / "sheet.csv", [
+        "Date,Hours Worked,Hourly Rate",
+        "2024-10-07,1321,15",  # A typo for 13.21
+        "2024-13-40,8,15",
+        "2024-10-09,eight,15",
+        "2024-10-10,8,-1",
+        "2024-10-11,8,15",
+    ])
+    result = import_timesheet(path, employee="Nikita", roster_file=str(store / "roster.json"))
+    assert (result.rows_read, result.rows_valid, result.rows_saved) == (5, 1, 1)
+    assert sorted((line, field) for line, field, _, _ in result.errors) == [
+        (2, "hours"), (3, "date"), (4, "hours"), (5, "rate")]
+    assert (2, "hours", "1321", f"More than {MAX_DAILY_HOURS} hours in one day") in result.errors
+    errors_file = result.write_errors(str(store / "errors.csv"))
+    assert len((store / "errors.csv").read_text().splitlines()) == 5
+    assert errors_file == str(store / "errors.csv")
+
+
+def test_a_dry_run_saves_nothing(store):
+    path = _timesheet(store / "sheet.csv", ["Date,Hours,Rate", "2024-10-07,8,15"])
+    result = import_timesheet(path, employee="Nikita", commit=False, roster_file=str(store / "roster.json"))
+    assert (result.rows_valid, result.rows_saved) == (1, 0)
+    assert not data_handler.partitioned_employees()
+
+
+def test_rates_come_from_the_roster_on_each_date(store):
+    roster = Roster()
+    roster.add("Nikita", 15.0)
+    roster.add("Nikita", 17.0, "2024-10-09")
+    roster.save(str(store / "roster.json"))
+    path = _timesheet(store / "sheet.csv", ["Date,Hours", "2024-10-08,8", "2024-10-09,8"])
+    result = import_timesheet(path, employee="Nikita", roster_file=str(store / "roster.json"))
+    assert result.rows_saved == 2
+    assert list(data_handler.load_data(employee="nikita").column("rate")) == [15.0, 17.0]
+
+    # Without a roster rate or a default, the row cannot be priced
+    result = import_timesheet(path, employee="Sam", commit=False, roster_file=str(store / "roster.json"))
+    assert result.rows_valid == 0
+
+
+def test_a_timesheet_without_an_hours_column_is_refused(store):
+    path = _timesheet(store / "sheet.csv", ["Date,Rate", "2024-10-07,15"])
+    with pytest.raises(ValueError):
+        import_timesheet(path, employee="Nikita", roster_file=str(store / "roster.json"))
+
+
+def test_parse_dates_accepts_iso_and_day_first_layouts():
+    parsed = parse_dates(["2024-10-07", "07/10/2024", "7.10.2024", "2024-10", "not a date"])
+    assert parsed.tolist() == [to_ordinal("2024-10-07")] * 3 + [-1, -1]
+    assert parse_dates(np.array(["2024-10-07", "2024-10-08"])).tolist() == [
+        to_ordinal("2024-10-07"), to_ordinal("2024-10-08")]
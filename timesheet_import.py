@@ -0,0 +1,367 @@
+"""
+Bulk import of timesheet exports (CSV or Excel) into the hours data.
+
+Rows are streamed from the file in chunks, every chunk is parsed and validated
+with whole-column NumPy operations, and all problems are collected into one
+ImportReport instead of being shown one by one. The valid rows are then saved
+with a single batched write per employee.
+
+Recognised headers (case-insensitive): Date / Work Date / Day, Hours Worked /
+Hours, Hourly Rate / Rate and, optionally, Employee / Name / Employee Name.
+Without a rate column each row gets the employee's rate on that date from the
+roster, or default_rate.
+"""
+import csv
+import os
+from datetime import date, datetime
+
+import numpy as np
+
+import data_handler
+from entry_store import EntryStore
+from roster import ROSTER_FILE, employee_id, load_roster
+from validation import MAX_DAILY_HOURS, MAX_HOURLY_RATE
+
+CHUNK_ROWS = 50000  # Rows parsed and validated per vectorized pass
+UNIX_EPOCH_ORDINAL = date(1970, 1, 1).toordinal()
+DATE_FORMATS = ("%Y-%m-%d", "%d/%m/%Y", "%d-%m-%Y", "%d.%m.%Y")  # Tried in order for non-ISO dates
+
+COLUMN_ALIASES = {
+    "date": ("date", "work date", "day"),
+    "hours": ("hours worked", "hours"),
+    "rate": ("hourly rate", "rate"),
+    "employee": ("employee", "employee name", "name"),
+}
+
+
+class ImportReport:
+    """
+    Outcome of one import: row counts and every validation error found.
+    Errors are (line, field, value, reason) tuples, with line numbers as
+    shown in a spreadsheet (the header is line 1).
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.rows_read = 0
+        self.rows_valid = 0
+        self.rows_saved = 0
+        self.saved = {}  # employee id (None for the shared file) -> rows written
+        self.errors = []
+
+    @property
+    def rows_rejected(self):
+        return self.rows_read - self.rows_valid
+
+    def add_error(self, line, field, value, reason):
+        self.errors.append((line, field, value, reason))
+
+    def reasons(self):
+        """
+        Returns the number of errors per reason, most common first.
+        """
+        counts = {}
+        for _, _, _, reason in self.errors:
+            counts[reason] = counts.get(reason, 0) + 1
+        return dict(sorted(counts.items(), key=lambda item: item[1], reverse=True))
+
+    def summary(self, limit=10):
+        """
+        Formats the report for a single dialog or console message.
+
+        Parameters:
+        - limit (int): Maximum number of individual errors to list.
+        """
+        lines = [f"{self.rows_read} rows read from {os.path.basename(self.path)}: "
+                 f"{self.rows_valid} valid, {self.rows_rejected} rejected, {self.rows_saved} saved."]
+        for reason, count in self.reasons().items():
+            lines.append(f"  {reason}: {count}")
+        for line, field, value, reason in sorted(self.errors)[:limit]:
+            lines.append(f"  Line {line}, {field} {value!r}: {reason}")
+        if len(self.errors) > limit:
+            lines.append(f"  ... and {len(self.errors) - limit} more.")
+        return "\n".join(lines)
+
+    def write_errors(self, path):
+        """
+        Writes every error to a CSV file for correction in a spreadsheet.
+        """
+        with open(path, mode='w', newline='') as file:
+            writer = csv.writer(file)
+            writer.writerow(["Line", "Field", "Value", "Problem"])
+            writer.writerows(sorted(self.errors))
+        return path
+
+    def as_dict(self):
+        return {"path": self.path, "rows_read": self.rows_read, "rows_valid": self.rows_valid,
+                "rows_saved": self.rows_saved, "saved": self.saved, "reasons": self.reasons(),
+                "errors": [list(error) for error in sorted(self.errors)]}
+
+
+def _iter_csv(path):
+    with open(path, mode='r', newline='', encoding='utf-8-sig') as file:
+        yield from csv.reader(file)
+
+
+def _iter_excel(path):
+    try:
+        from openpyxl import load_workbook
+    except ImportError:
+        raise ValueError("Excel import needs the openpyxl package (pip install openpyxl).") from None
+    workbook = load_workbook(path, read_only=True, data_only=True)
+    try:
+        for row in workbook.active.iter_rows(values_only=True):
+            yield ["" if value is None else value for value in row]
+    finally:
+        workbook.close()
+
+
+def read_timesheet(path):
+    """
+    Streams the raw rows of a timesheet export, header first.
+    .xlsx/.xlsm files are read with openpyxl; anything else as CSV.
+    """
+    if os.path.splitext(path)[1].lower() in (".xlsx", ".xlsm"):
+        return _iter_excel(path)
+    return _iter_csv(path)
+
+
+def _find_columns(header):
+    names = [str(name).strip().lower() for name in header]
+    columns = {}
+    for field, aliases in COLUMN_ALIASES.items():
+        for alias in aliases:
+            if alias in names:
+                columns[field] = names.index(alias)
+                break
+    missing = [field for field in ("date", "hours") if field not in columns]
+    if missing:
+        raise ValueError(f"The timesheet has no {' or '.join(missing)} column.")
+    return columns
+
+
+def _parse_date(value):
+    if isinstance(value, datetime):
+        return value.date().toordinal()
+    if isinstance(value, date):
+        return value.toordinal()
+    text = str(value).strip()
+    for date_format in DATE_FORMATS:
+        try:
+            return datetime.strptime(text, date_format).date().toordinal()
+        except ValueError:
+            continue
+    return None
+
+
+def parse_dates(values):
+    """
+    Converts a column of dates to ordinals in one pass; unparseable entries become -1.
+    ISO strings are parsed by NumPy in C; other layouts fall back to DATE_FORMATS.
+    """
+    text = np.char.strip(np.array(values, dtype=str))
+    # NumPy also accepts '2024' or '2024-10', so only complete YYYY-MM-DD columns take the fast path
+    if len(text) and (np.char.str_len(text) == 10).all():
+        try:
+            days = text.astype("datetime64[D]")
+            if not np.isnat(days).any():
+                return days.astype(np.int64) + UNIX_EPOCH_ORDINAL
+        except ValueError:
+            pass
+    parsed = [_parse_date(value) for value in values]
+    return np.array([-1 if ordinal is None else ordinal for ordinal in parsed], dtype=np.int64)
+
+
+def parse_numbers(values):
+    """
+    Converts a column to float64 in one pass; unparseable entries become NaN.
+    """
+    try:
+        return np.array(values, dtype=np.float64)
+    except (ValueError, TypeError):
+        pass
+    numbers = np.empty(len(values), dtype=np.float64)
+    for position, value in enumerate(values):
+        try:
+            numbers[position] = float(value)
+        except (ValueError, TypeError):
+            numbers[position] = np.nan
+    return numbers
+
+
+def _rates_from_roster(roster, employees, dates):
+    # Each row's rate is the employee's rate in effect on its date, found by binary search
+    rates = np.full(len(dates), np.nan)
+    keys = np.array(employees, dtype=object)
+    for key in set(employees):
+        employee = roster.get(key) if key else None
+        if employee is None or not employee.rates:
+            continue
+        rows = keys == key
+        starts = np.array([ordinal for ordinal, _ in employee.rates])
+        values = np.array([rate for _, rate in employee.rates])
+        position = np.searchsorted(starts, dates[rows], side="right") - 1
+        rates[rows] = np.where(position >= 0, values[np.maximum(position, 0)], np.nan)
+    return rates
+
+
+def _validate_chunk(report, lines, columns, chunk, employee, roster, default_rate, require_employee=False):
+    """
+    Parses and checks one chunk of raw rows with whole-column operations.
+    lines holds the file line number of each row, for the error report.
+    With require_employee, rows that belong to no employee are rejected.
+
+    Returns:
+    - tuple: (employee ids, date ordinals, hours, rates, valid mask).
+    """
+    count = len(chunk)
+
+    def column(field):
+        index = columns[field]
+        return [row[index] if index < len(row) else "" for row in chunk]
+
+    raw_dates = column("date")
+    raw_hours = column("hours")
+    dates = parse_dates(raw_dates)
+    hours = parse_numbers(raw_hours)
+
+    if "employee" in columns:
+        raw_employees = column("employee")
+        employees = []
+        for name in raw_employees:
+            try:
+                employees.append(employee_id(str(name)) if str(name).strip() else employee)
+            except ValueError:
+                employees.append(False)  # Reported below
+    else:
+        raw_employees = None
+        employees = [employee] * count
+
+    if "rate" in columns:
+        raw_rates = column("rate")
+        rates = parse_numbers(raw_rates)
+    else:
+        raw_rates = None
+        rates = _rates_from_roster(roster, employees, dates)
+        if default_rate is not None:
+            rates = np.where(np.isnan(rates), float(default_rate), rates)
+
+    checks = [
+        (dates < 0, "date", raw_dates, "Not a valid date"),
+        (~np.isfinite(hours), "hours", raw_hours, "Not a number"),
+        (np.isfinite(hours) & (hours <= 0), "hours", raw_hours, "Hours must be positive"),
+        (np.isfinite(hours) & (hours > MAX_DAILY_HOURS), "hours", raw_hours,
+         f"More than {MAX_DAILY_HOURS} hours in one day"),
+        (np.isfinite(rates) & (rates <= 0), "rate", raw_rates, "Rate must be positive"),
+        (np.isfinite(rates) & (rates > MAX_HOURLY_RATE), "rate", raw_rates,
+         f"Rate above the {MAX_HOURLY_RATE:g} plausibility limit"),
+    ]
+    if raw_rates is not None:
+        checks.append((~np.isfinite(rates), "rate", raw_rates, "Not a number"))
+    else:
+        checks.append((np.isnan(rates), "rate", [""] * count, "No rate column and no known rate for this date"))
+    if raw_employees is not None:
+        checks.append((np.array([key is False for key in employees]), "employee", raw_employees,
+                       "Not a valid employee name"))
+        if require_employee:
+            checks.append((np.array([key is None for key in employees]), "employee", raw_employees,
+                           "No employee for this row"))
+
+    valid = np.ones(count, dtype=bool)
+    for failed, field, raw, reason in checks:
+        valid &= ~failed
+        for position in np.flatnonzero(failed):
+            report.add_error(lines[position], field, raw[position], reason)
+    return employees, dates, hours, rates, valid
+
+
+def import_timesheet(path, employee=None, default_rate=None, commit=True, report=None, roster_file=ROSTER_FILE):
+    """
+    Validates a timesheet export and saves its valid rows.
+
+    Parameters:
+    - path (str): CSV or Excel file to import.
+    - employee (str, optional): Name or id the rows belong to when the file has no
+      employee column (or leaves it blank). Without one, rows go to the shared file,
+      which is only possible before it has been split by employee.
+    - default_rate (float, optional): Rate for rows with no rate column and no roster rate.
+    - commit (bool): Save the valid rows; False only validates (a dry run).
+    - report (callable, optional): Called as report(rows done, None) every
+      data_handler.CHECKPOINT_ROWS rows read and after each chunk.
+      It is not called once saving starts, so raising from it cancels cleanly.
+    - roster_file (str): Roster used for rates and to register imported employees.
+
+    Returns:
+    - ImportReport: Counts and every validation error.
+
+    Raises:
+    - ValueError: If the file has no date or hours column, has no employee column and
+      no employee is given once the data is partitioned, names employees before it is
+      partitioned, or is an Excel file and openpyxl is missing.
+    """
+    result = ImportReport(path)
+    roster = load_roster(roster_file)
+    if employee is not None:
+        employee = roster.get(employee).id if employee in roster else employee_id(employee)
+
+    rows = read_timesheet(path)
+    header = next(rows, None)
+    if header is None:
+        return result
+    columns = _find_columns(header)
+    # Once the shared file is split, every row needs an employee partition to go to;
+    # until then rows can only go to the shared file
+    split = data_handler.is_split()
+    require_employee = employee is None and split
+    if require_employee and "employee" not in columns:
+        raise ValueError("The hours data is split by employee: choose the employee this timesheet belongs to.")
+    if not split and (employee is not None or "employee" in columns):
+        raise ValueError("The hours data has not been split by employee yet: run the partition command "
+                         "first, or import the timesheet without employees.")
+
+    batches = {}  # employee id -> EntryStore of valid rows
+    names = {}  # employee id -> name as first written in the file
+    numbered = enumerate(rows, start=2)  # Spreadsheet line numbers; the header is line 1
+    while True:
+        chunk, lines = [], []
+        for line, row in numbered:
+            if any(str(value).strip() for value in row):
+                chunk.append(row)
+                lines.append(line)
+                if len(chunk) == CHUNK_ROWS:
+                    break
+                if report and len(chunk) % data_handler.CHECKPOINT_ROWS == 0:
+                    # Reading rows (from Excel especially) is slow, so Cancel is checked here too
+                    report(result.rows_read + len(chunk), None)
+        if not chunk:
+            break
+        employees, dates, hours, rates, valid = _validate_chunk(
+            result, lines, columns, chunk, employee, roster, default_rate, require_employee)
+        result.rows_read += len(chunk)
+        result.rows_valid += int(valid.sum())
+
+        keys = np.array(employees, dtype=object)
+        for key in set(keys[valid]):
+            rows_for_key = valid & (keys == key)
+            batches.setdefault(key, EntryStore()).extend_columns(
+                dates[rows_for_key], hours[rows_for_key], rates[rows_for_key])
+        if "employee" in columns:
+            index = columns["employee"]
+            for row, key in zip(chunk, employees):
+                if key and key not in names and index < len(row) and str(row[index]).strip():
+                    names[key] = str(row[index]).strip()
+        if report:
+            report(result.rows_read, None)
+
+    if not commit:
+        return result
+    for key, entries in batches.items():
+        saved = data_handler.save_entries(entries, key)
+        result.saved[key] = saved
+        result.rows_saved += saved
+    if names:
+        for key, name in names.items():
+            if key not in roster and result.saved.get(key):
+                roster.add(name)
+        roster.save(roster_file)
+    return result
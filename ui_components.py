@@ -1,7 +1,10 @@
+from bisect import bisect_right
 from tkinter import ttk
 from tkcalendar import DateEntry
 import tkinter as tk
 
+from entry_store import EntryStore, from_ordinal, to_ordinal
+
 def create_widgets(root):
     """
     Creates and configures UI components for the main application window.
@@ -18,7 +21,8 @@ def create_widgets(root):
     widgets['name_prompt_frame'] = name_prompt_frame
 
     ttk.Label(name_prompt_frame, text="Enter Your Name:", font=("Helvetica", 12)).pack(anchor="w", pady=(0, 5))
-    widgets['name_entry'] = ttk.Entry(name_prompt_frame, width=30)
+    # Editable: pick someone from the roster or type a new name
+    widgets['name_entry'] = ttk.Combobox(name_prompt_frame, width=28)
     widgets['name_entry'].pack(pady=(0, 10))
 
     ttk.Label(name_prompt_frame, text="Enter Hourly Rate (€):", font=("Helvetica", 12)).pack(anchor="w", pady=(10, 5))
@@ -71,7 +75,19 @@ def create_widgets(root):
     widgets['data_display_label'] = ttk.Label(root, text="Saved Entries", font=("Helvetica", 14, "underline"))
     widgets['data_display_label'].pack(pady=(10, 5))
 
-    widgets['data_display'] = tk.Text(root, height=10, width=60, wrap="word", bg="#f9f9f9", font=("Helvetica", 9))
+    # Date filter for the saved entries list
+    filter_frame = ttk.Frame(root)
+    filter_frame.pack(pady=(0, 5))
+    ttk.Label(filter_frame, text="From:").grid(row=0, column=0, padx=(0, 5))
+    widgets['filter_start_entry'] = ttk.Entry(filter_frame, width=12)
+    widgets['filter_start_entry'].grid(row=0, column=1)
+    ttk.Label(filter_frame, text="To:").grid(row=0, column=2, padx=(10, 5))
+    widgets['filter_end_entry'] = ttk.Entry(filter_frame, width=12)
+    widgets['filter_end_entry'].grid(row=0, column=3)
+    widgets['filter_button'] = ttk.Button(filter_frame, text="Filter")
+    widgets['filter_button'].grid(row=0, column=4, padx=(10, 0))
+
+    widgets['data_display'] = EntriesView(root, height=10)
     widgets['data_display'].pack(pady=(0, 15), padx=15)
 
     # Bottom frame with Save, Load, and Clear Buttons
@@ -94,17 +110,151 @@ def create_widgets(root):
     widgets['export_button'] = ttk.Button(bottom_frame, text="Export Summary to PDF", style="Accent.TButton")
     widgets['export_button'].grid(row=1, column=1, padx=5, pady=5)
 
+    widgets['payslips_button'] = ttk.Button(bottom_frame, text="Export Weekly Payslips", style="Accent.TButton")
+    widgets['payslips_button'].grid(row=1, column=2, padx=5, pady=5)
+
+    widgets['import_button'] = ttk.Button(bottom_frame, text="Import Timesheet", style="Accent.TButton")
+    widgets['import_button'].grid(row=2, column=0, padx=5, pady=5)
+
+    # Progress of background saves, loads and exports
+    status_frame = ttk.Frame(bottom_frame)
+    status_frame.grid(row=3, column=0, columnspan=3, sticky="ew", pady=(10, 0))
+    widgets['progress_bar'] = ttk.Progressbar(status_frame, length=300, mode="determinate", maximum=100)
+    widgets['progress_bar'].grid(row=0, column=0, padx=5)
+    widgets['cancel_button'] = ttk.Button(status_frame, text="Cancel", state="disabled")
+    widgets['cancel_button'].grid(row=0, column=1, padx=5)
+    widgets['status_label'] = ttk.Label(status_frame, text="", font=("Helvetica", 10, "italic"))
+    widgets['status_label'].grid(row=1, column=0, columnspan=2, sticky="w", padx=5)
+
     return widgets
 
-def display_data_entry(data_display, date, hours, rate):
+class EntriesView(ttk.Frame):
     """
-    Inserts a new entry into the data display text area.
-
-    Parameters:
-    - data_display (Text): The Text widget to display saved entries.
-    - date (str): The date of the entry.
-    - hours (float): Hours worked.
-    - rate (float): Hourly rate.
+    Virtualized list of saved entries backed by an EntryStore.
+    Only the rows in the visible window exist as Treeview items, so loading or
+    scrolling a long history costs the same as showing a handful of rows.
+    Clicking a column heading sorts by it; set_filter() limits the date range.
     """
-    entry_text = f"Date: {date}, Hours: {hours}, Rate: €{rate}\n"
-    data_display.insert(tk.END, entry_text)
+    COLUMNS = (("date", "Date", 110), ("hours", "Hours", 90), ("rate", "Rate", 90))
+
+    def __init__(self, parent, height=10):
+        super().__init__(parent)
+        self.height = height
+        self.tree = ttk.Treeview(self, columns=[name for name, _, _ in self.COLUMNS],
+                                 show="headings", height=height, selectmode="browse")
+        for name, title, width in self.COLUMNS:
+            self.tree.heading(name, text=title, command=lambda column=name: self.sort_by(column))
+            self.tree.column(name, width=width, anchor="center")
+        self.scrollbar = ttk.Scrollbar(self, orient="vertical", command=self._on_scroll)
+        self.tree.pack(side="left", fill="both", expand=True)
+        self.scrollbar.pack(side="right", fill="y")
+        for sequence in ("<MouseWheel>", "<Button-4>", "<Button-5>"):
+            self.tree.bind(sequence, self._on_wheel)
+
+        self.store = EntryStore()
+        self.sort_column = None
+        self.sort_reverse = False
+        self.start = None
+        self.end = None
+        self._order = []
+        self._top = 0
+
+    def set_entries(self, store):
+        """
+        Shows a new store, keeping the current sort and filter.
+        """
+        self.store = store
+        self._rebuild()
+
+    def entry_added(self):
+        """
+        Adds the store's last entry to the view without rebuilding the list.
+        """
+        index = len(self.store) - 1
+        if index < 0 or not self._matches(index):
+            return
+        if self.sort_column is None:
+            position = len(self._order)
+        else:
+            key = self._sort_key()
+            position = bisect_right(self._order, key(index), key=key)
+        self._order.insert(position, index)
+        # Scroll just enough to bring the new row into view
+        if position < self._top:
+            self._top = position
+        elif position >= self._top + self.height:
+            self._top = position - self.height + 1
+        self._render()
+
+    def clear(self):
+        self.set_entries(EntryStore())
+
+    def sort_by(self, column):
+        """
+        Sorts by a column; choosing the same column again reverses the order.
+        """
+        if self.sort_column == column:
+            self.sort_reverse = not self.sort_reverse
+        else:
+            self.sort_column, self.sort_reverse = column, False
+        self._rebuild()
+
+    def set_filter(self, start=None, end=None):
+        """
+        Shows only entries dated within [start, end]; None leaves that side open.
+        """
+        self.start = to_ordinal(start) if start else None
+        self.end = to_ordinal(end) if end else None
+        self._rebuild()
+
+    def _matches(self, index):
+        ordinal = self.store.column("date")[index]
+        return (self.start is None or ordinal >= self.start) and (self.end is None or ordinal <= self.end)
+
+    def _sort_key(self):
+        values = self.store.column(self.sort_column)
+        if self.sort_reverse:
+            return lambda index: -values[index]
+        return values.__getitem__
+
+    def _rebuild(self):
+        if self.start is None and self.end is None:
+            order = list(range(len(self.store)))
+        else:
+            order = [index for index in range(len(self.store)) if self._matches(index)]
+        if self.sort_column is not None:
+            order.sort(key=self._sort_key())
+        self._order = order
+        self._top = 0
+        self._render()
+
+    def _render(self):
+        self._top = max(0, min(self._top, len(self._order) - self.height))
+        self.tree.delete(*self.tree.get_children())
+        dates, hours, rates = (self.store.column(name) for name, _, _ in self.COLUMNS)
+        for index in self._order[self._top:self._top + self.height]:
+            self.tree.insert("", tk.END, values=(from_ordinal(dates[index]), hours[index], f"€{rates[index]}"))
+        if self._order:
+            self.scrollbar.set(self._top / len(self._order),
+                               min(self._top + self.height, len(self._order)) / len(self._order))
+        else:
+            self.scrollbar.set(0, 1)
+
+    def _scroll_to(self, top):
+        self._top = top
+        self._render()
+
+    def _on_scroll(self, action, amount, unit=None):
+        if action == "moveto":
+            self._scroll_to(int(float(amount) * len(self._order)))
+        elif unit == "pages":
+            self._scroll_to(self._top + int(amount) * self.height)
+        else:
+            self._scroll_to(self._top + int(amount))
+
+    def _on_wheel(self, event):
+        if event.num == 4 or event.delta > 0:
+            self._scroll_to(self._top - 3)
+        else:
+            self._scroll_to(self._top + 3)
+        return "break"
@@ -1,15 +1,24 @@
 from datetime import datetime
+from functools import lru_cache
+
+from holiday_calendar import HolidayCalendar
+from instrumentation import instrumented
+from tax_tables import TaxTable, compile_tax_table, get_tax_table
 
 # Constants for payroll calculations
 STANDARD_RATE_LIMIT = 44000
+STANDARD_TAX_RATE = 0.20  # Income tax rate up to STANDARD_RATE_LIMIT
+HIGHER_TAX_RATE = 0.40  # Income tax rate above STANDARD_RATE_LIMIT
 OVERTIME_THRESHOLD = 40  # Standard weekly hours before overtime
 OVERTIME_RATE_MULTIPLIER = 1.5  # Overtime rate (e.g., 1.5x regular rate)
 HOLIDAY_RATE_MULTIPLIER = 2.0  # Holiday rate (e.g., 2x regular rate)
+
 PERSONAL_TAX_CREDIT = 2000
 EMPLOYEE_TAX_CREDIT = 2000
 USC_BANDS = [
     (12012, 0.005), (27382, 0.02), (70044, 0.03), (float('inf'), 0.08)
 ]
+TAX_CACHE_SIZE = 4096  # Distinct (hours, rate) / gross amounts kept by the tax caches
 
 def calculate_gross_pay(hours, rate):
     """
@@ -29,50 +38,54 @@ def calculate_gross_pay(hours, rate):
     gross_pay = regular_pay + overtime_pay
     return {"regular_pay": regular_pay, "overtime_pay": overtime_pay, "gross": gross_pay}
 
-def calculate_tax(gross_pay):
+def holiday_premium(hours, rate):
     """
-    Calculates total tax based on income brackets and personal credits.
+    Returns the extra pay for hours worked on a holiday. The hours are already
+    paid at the regular rate, so only the part above it is added, bringing them
+    to HOLIDAY_RATE_MULTIPLIER times the regular rate in total.
 
     Parameters:
-    - gross_pay (float): Gross pay for the period.
+    - hours (float or ndarray): Hours worked on the holiday.
+    - rate (float or ndarray): Hourly rate of pay.
 
     Returns:
-    - float: Total tax deducted from gross pay.
+    - float or ndarray: The holiday pay on top of the regular pay.
     """
-    if gross_pay <= STANDARD_RATE_LIMIT:
-        income_tax = gross_pay * 0.20
-    else:
-        income_tax = (STANDARD_RATE_LIMIT * 0.20) + ((gross_pay - STANDARD_RATE_LIMIT) * 0.40)
-
-    # USC calculation
-    usc = 0
-    previous_band_limit = 0
-    for limit, usc_rate in USC_BANDS:
-        if gross_pay > previous_band_limit:
-            taxable_amount = min(gross_pay, limit) - previous_band_limit
-            usc += taxable_amount * usc_rate
-            previous_band_limit = limit
-        else:
-            break
+    return hours * rate * (HOLIDAY_RATE_MULTIPLIER - 1)
 
-    # Apply tax credits
-    total_tax = max(income_tax + usc - (PERSONAL_TAX_CREDIT + EMPLOYEE_TAX_CREDIT), 0)
-    return total_tax
+def current_tax_table():
+    """
+    Returns the TaxTable compiled from the module-level constants.
+    The table is recompiled only when one of those constants changes.
+    """
+    return compile_tax_table(STANDARD_RATE_LIMIT, STANDARD_TAX_RATE, HIGHER_TAX_RATE,
+                             tuple(USC_BANDS), PERSONAL_TAX_CREDIT + EMPLOYEE_TAX_CREDIT)
 
-def calculate_net_pay(hours, rate):
+def resolve_tax_table(tax_year=None):
     """
-    Calculates net pay by deducting taxes from gross pay.
+    Returns the TaxTable to use for a calculation.
 
     Parameters:
-    - hours (float): Number of hours worked.
-    - rate (float): Hourly rate of pay.
+    - tax_year (int or TaxTable, optional): A year from tax_tables.TAX_YEARS, an
+      already compiled table, or None for the module-level constants.
 
     Returns:
-    - dict: Comprehensive breakdown of net pay calculation.
+    - TaxTable: The compiled schedule.
     """
+    if tax_year is None:
+        return current_tax_table()
+    if isinstance(tax_year, TaxTable):
+        return tax_year
+    return get_tax_table(tax_year)
+
+def _compute_tax(gross_pay, tax_year=None):
+    return resolve_tax_table(tax_year).tax(gross_pay)
+
+def _compute_net_pay(hours, rate, tax_year=None, holiday=False):
     gross_info = calculate_gross_pay(hours, rate)
-    gross_pay = gross_info["gross"]
-    total_tax = calculate_tax(gross_pay)
+    holiday_pay = holiday_premium(hours, rate) if holiday else 0
+    gross_pay = gross_info["gross"] + holiday_pay
+    total_tax = _compute_tax(gross_pay, tax_year)
     net_pay = gross_pay - total_tax
 
     return {
@@ -80,11 +93,128 @@ def calculate_net_pay(hours, rate):
         "overtime_hours": max(hours - OVERTIME_THRESHOLD, 0),
         "regular_pay": gross_info["regular_pay"],
         "overtime_pay": gross_info["overtime_pay"],
+        "holiday_pay": holiday_pay,
         "gross": gross_pay,
         "income_tax": total_tax,
         "net": net_pay
     }
 
+# Tax results are memoized on cent-exact inputs. Inputs that are not exact to the
+# cent bypass the cache, so cached and uncached results are always identical.
+_tax_cache_settings = None
+_uncached_calls = 0
+
+def _tax_settings():
+    return (STANDARD_RATE_LIMIT, STANDARD_TAX_RATE, HIGHER_TAX_RATE, OVERTIME_THRESHOLD,
+            OVERTIME_RATE_MULTIPLIER, HOLIDAY_RATE_MULTIPLIER, PERSONAL_TAX_CREDIT, EMPLOYEE_TAX_CREDIT, tuple(USC_BANDS))
+
+def _check_tax_settings():
+    # Drop cached results as soon as any payroll constant has been changed
+    global _tax_cache_settings
+    settings = _tax_settings()
+    if settings != _tax_cache_settings:
+        clear_tax_cache()
+        _tax_cache_settings = settings
+
+@lru_cache(maxsize=TAX_CACHE_SIZE)
+def _cached_tax(gross_pay, tax_year):
+    return _compute_tax(gross_pay, tax_year)
+
+@lru_cache(maxsize=TAX_CACHE_SIZE)
+def _cached_net_pay(hours, rate, tax_year, holiday):
+    return _compute_net_pay(hours, rate, tax_year, holiday)
+
+@lru_cache(maxsize=TAX_CACHE_SIZE)
+def _cached_cumulative_tax(ytd_gross, period, periods, tax_year):
+    fraction = period / periods
+    return fraction * _compute_tax(ytd_gross / fraction, tax_year)
+
+def calculate_tax(gross_pay, tax_year=None):
+    """
+    Calculates total tax based on income brackets and personal credits.
+    Uses the precompiled tax table; results are cached per cent-exact gross amount.
+
+    Parameters:
+    - gross_pay (float): Gross pay for the period.
+    - tax_year (int or TaxTable, optional): Tax year to apply; defaults to the module constants.
+
+    Returns:
+    - float: Total tax deducted from gross pay.
+    """
+    global _uncached_calls
+    if round(gross_pay, 2) != gross_pay:
+        _uncached_calls += 1
+        return _compute_tax(gross_pay, tax_year)
+    _check_tax_settings()
+    return _cached_tax(gross_pay, tax_year)
+
+def calculate_net_pay(hours, rate, tax_year=None, holiday=False):
+    """
+    Calculates net pay by deducting taxes from gross pay.
+    Results are cached per cent-exact (hours, rate) pair.
+
+    Parameters:
+    - hours (float): Number of hours worked.
+    - rate (float): Hourly rate of pay.
+    - tax_year (int or TaxTable, optional): Tax year to apply; defaults to the module constants.
+    - holiday (bool): Add the holiday premium (see holiday_premium) to gross.
+
+    Returns:
+    - dict: Comprehensive breakdown of net pay calculation.
+    """
+    global _uncached_calls
+    if round(hours, 2) != hours or round(rate, 2) != rate:
+        _uncached_calls += 1
+        return _compute_net_pay(hours, rate, tax_year, holiday)
+    _check_tax_settings()
+    # Copy so callers can't modify the cached breakdown
+    return dict(_cached_net_pay(hours, rate, tax_year, bool(holiday)))
+
+def calculate_cumulative_tax(ytd_gross, period, periods, tax_year=None):
+    """
+    Calculates year-to-date tax on the cumulative basis: the annual bands and
+    credits pro-rated to the pay period, which is the annual table applied to the
+    annualised year-to-date gross. This is the tax of every payroll ledger week.
+    Results are cached on the exact inputs, so employees with the same pay, or a
+    ledger built again over the same rows, reuse them.
+
+    Parameters:
+    - ytd_gross (float): Gross pay from the start of the tax year to this period.
+    - period (int): Pay period number within the tax year, from 1.
+    - periods (int): Pay periods in the tax year.
+    - tax_year (int, optional): Year from tax_tables.TAX_YEARS; defaults to the module constants.
+
+    Returns:
+    - float: Total tax due for the year to date.
+    """
+    _check_tax_settings()
+    return _cached_cumulative_tax(float(ytd_gross), period, periods, tax_year)
+
+def clear_tax_cache():
+    """
+    Empties the tax caches and resets their counters.
+    """
+    global _uncached_calls
+    _cached_tax.cache_clear()
+    _cached_net_pay.cache_clear()
+    _cached_cumulative_tax.cache_clear()
+    _uncached_calls = 0
+
+def tax_cache_info():
+    """
+    Reports how well the tax caches are paying off.
+
+    Returns:
+    - dict: lru_cache statistics (hits, misses, maxsize, currsize) for the
+      'tax', 'net_pay' and 'cumulative_tax' caches, plus 'uncached' calls that bypassed them.
+    """
+    return {
+        "tax": _cached_tax.cache_info(),
+        "net_pay": _cached_net_pay.cache_info(),
+        "cumulative_tax": _cached_cumulative_tax.cache_info(),
+        "uncached": _uncached_calls
+    }
+
 def format_currency(value):
     """
     Formats a float value as currency, rounded to two decimal places.
@@ -97,55 +227,45 @@ def format_currency(value):
     """
     return f"€{value:.2f}"
 
-def calculate_weekly_totals(work_entries):
+@instrumented("calculate_weekly_totals", input_rows=True)
+def calculate_weekly_totals(work_entries, holidays=None):
     """
-    Calculates total hours, gross, and net pay for a given week.
+    Calculates total hours, gross, and net pay for the weeks of the given entries.
+    Overtime applies above OVERTIME_THRESHOLD hours per week and tax is worked out
+    per weekly pay period, exactly as in payroll_periods.PayrollLedger.
 
     Parameters:
-    - work_entries (list of dict): List containing daily entries with 'hours' and 'rate'.
+    - work_entries (list of dict): List containing daily entries with 'date', 'hours' and 'rate'.
+    - holidays (HolidayCalendar or set of str, optional): Dates that earn holiday pay.
 
     Returns:
     - dict: Detailed weekly breakdown including gross and net pay.
     """
-    total_hours = 0
-    total_gross = 0
-    total_net = 0
-    total_overtime_pay = 0
-    total_regular_pay = 0
-
-    for entry in work_entries:
-        hours = entry.get("hours", 0)
-        rate = entry.get("rate", 0)
-        breakdown = calculate_net_pay(hours, rate)
+    # Imported here because payroll_periods builds on this module
+    from entry_store import to_ordinal
+    from payroll_periods import PayrollLedger
 
-        total_hours += breakdown["regular_hours"] + breakdown["overtime_hours"]
-        total_regular_pay += breakdown["regular_pay"]
-        total_overtime_pay += breakdown["overtime_pay"]
-        total_gross += breakdown["gross"]
-        total_net += breakdown["net"]
-
-    return {
-        "total_hours": total_hours,
-        "total_regular_pay": total_regular_pay,
-        "total_overtime_pay": total_overtime_pay,
-        "total_gross": total_gross,
-        "total_net": total_net,
-        "total_deductions": total_gross - total_net
-    }
+    if not isinstance(holidays, HolidayCalendar):
+        holidays = HolidayCalendar(holidays or ())  # The ledger looks dates up as ordinals
+    rows = ((to_ordinal(entry["date"]), entry["hours"], entry["rate"]) for entry in work_entries)
+    return PayrollLedger(rows, holidays).totals()
 
+@instrumented("calculate_holiday_pay", input_rows=True)
 def calculate_holiday_pay(work_entries, holidays):
     """
     Calculates additional holiday pay for specified holidays.
 
     Parameters:
     - work_entries (list of dict): List containing daily entries with 'date', 'hours', and 'rate'.
-    - holidays (list of str): List of dates (in 'YYYY-MM-DD' format) recognized as holidays.
+    - holidays (HolidayCalendar or iterable of str): Dates (in 'YYYY-MM-DD' format) recognized as holidays.
 
     Returns:
-    - float: The total holiday pay.
+    - float: The total holiday pay on top of the regular pay for those hours.
     """
+    if not isinstance(holidays, (set, frozenset, HolidayCalendar)):
+        holidays = set(holidays)  # O(1) lookups instead of scanning a list per entry
     holiday_pay = 0
     for entry in work_entries:
         if entry['date'] in holidays:
-            holiday_pay += entry['hours'] * entry['rate'] * HOLIDAY_RATE_MULTIPLIER
+            holiday_pay += holiday_premium(entry['hours'], entry['rate'])
     return holiday_pay
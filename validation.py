@@ -1,4 +1,10 @@
-from tkinter import messagebox
+MAX_DAILY_HOURS = 24  # No single day's entry can exceed this many hours
+MAX_HOURLY_RATE = 200.0  # Rates above this are treated as typing mistakes
+
+def _show_error(title, message):
+    # Imported lazily so the checks can be used without a display
+    from tkinter import messagebox
+    messagebox.showerror(title, message)
 
 def is_positive_number(value):
     """
@@ -21,16 +27,16 @@ def validate_name(name):
     - bool: True if the name is valid, False otherwise.
     """
     if not name.strip():
-        messagebox.showerror("Invalid Input", "Name cannot be empty.")
+        _show_error("Invalid Input", "Name cannot be empty.")
         return False
     elif any(char.isdigit() for char in name):
-        messagebox.showerror("Invalid Input", "Name should not contain numbers.")
+        _show_error("Invalid Input", "Name should not contain numbers.")
         return False
     return True
 
 def validate_hourly_rate(rate):
     """
-    Validates that the hourly rate is a positive float.
+    Validates that the hourly rate is a positive float of at most MAX_HOURLY_RATE.
 
     Parameters:
     - rate (str): The hourly rate input as a string.
@@ -39,13 +45,16 @@ def validate_hourly_rate(rate):
     - bool: True if the rate is valid, False otherwise.
     """
     if not is_positive_number(rate):
-        messagebox.showerror("Invalid Input", "Hourly rate must be a positive number.")
+        _show_error("Invalid Input", "Hourly rate must be a positive number.")
+        return False
+    if float(rate) > MAX_HOURLY_RATE:
+        _show_error("Invalid Input", f"Hourly rate cannot exceed €{MAX_HOURLY_RATE:.2f}.")
         return False
     return True
 
 def validate_hours_worked(hours):
     """
-    Validates that hours worked is a positive float.
+    Validates that hours worked is a positive float of at most MAX_DAILY_HOURS.
 
     Parameters:
     - hours (str): The hours worked input as a string.
@@ -54,7 +63,10 @@ def validate_hours_worked(hours):
     - bool: True if the hours worked is valid, False otherwise.
     """
     if not is_positive_number(hours):
-        messagebox.showerror("Invalid Input", "Please enter a positive number for hours worked.")
+        _show_error("Invalid Input", "Please enter a positive number for hours worked.")
+        return False
+    if float(hours) > MAX_DAILY_HOURS:
+        _show_error("Invalid Input", f"Hours worked cannot exceed {MAX_DAILY_HOURS} in one day.")
         return False
     return True
 
@@ -71,7 +83,7 @@ def validate_all_fields(date_entry, hours, rate):
     - bool: True if all fields are valid, False otherwise.
     """
     if not date_entry.get_date():
-        messagebox.showerror("Invalid Input", "Please select a valid date.")
+        _show_error("Invalid Input", "Please select a valid date.")
         return False
     if not validate_hours_worked(hours):
         return False